@@ -0,0 +1,5 @@
+"""Extract numerical data from plot images."""
+
+from .conversion import format, pixel2coordinate, transform_axis, transform_value
+
+__all__ = ["format", "pixel2coordinate", "transform_axis", "transform_value"]
@@ -0,0 +1,41 @@
+import argparse
+import sys
+
+from . import batch, benchmark, server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m data_from_plot",
+        description="Extract numerical data from plot images.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    batch.add_arguments(
+        subparsers.add_parser("batch", help="digitize a directory of images")
+    )
+    benchmark.add_arguments(
+        subparsers.add_parser(
+            "benchmark", help="time the processing steps on synthetic plots"
+        )
+    )
+    server.add_arguments(
+        subparsers.add_parser("serve", help="digitize over a local HTTP API")
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "batch":
+        return 1 if batch.main(args) else 0
+    if args.command == "benchmark":
+        return 1 if benchmark.main(args) else 0
+    if args.command == "serve":
+        return server.main(args)
+
+    # Without a subcommand, start the graphical app (the only tkinter import)
+    from .app import main as run_app
+
+    run_app()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1848 @@
+import os
+import threading
+import tkinter as tk
+from array import array
+from tkinter import ttk
+from tkinter import filedialog
+from tkinter import messagebox
+
+from .batch import find_images
+from .cache import CalibrationCache
+from .calibration import Calibration, save_calibration
+from .conversion import format
+from .decimate import simplify_points
+from .detect import detect_plot_area
+from .export import point_columns, write_columns
+from .extract import extract_curve, extract_series
+from .instrument import SessionProfiler, metrics
+from .markers import MAX_VERTICES, MarkerLayer
+from .points import PointStore
+from .prefetch import IMAGE_EXTENSIONS, PREFETCH, ImageLoader
+from .scatter import detect_markers, marker_template
+from .session import (
+    AUTOSAVE_PATH,
+    Journal,
+    image_hash,
+    load_project,
+    read_journal,
+    replay_points,
+    save_project,
+)
+from .spatial import PointIndex
+from .trace import trace_curve
+from .vector import SNAP_DISTANCE, snap_plot_area, vector_curves
+from .viewer import TiledImageView
+
+REPROJECT_DELAY_MS = 150  # Pause in typing before the points are recomputed
+EXPORT_POLL_MS = 100  # Progress bar update interval during exports
+JOURNAL_SYNC_MS = 1000  # Journal entries are fsynced at most this often
+LOAD_POLL_MS = 50  # Check interval while an image decodes in the background
+MAX_DISPLAY_WIDTH = 1400  # Images are zoomed out to fit this size
+MAX_DISPLAY_HEIGHT = 900
+TRACE_STEP_MS = 1  # Pause between traced chunks, for Tk to handle events
+STATUS_REFRESH_MS = 500  # Status bar update interval while timing is on
+CURSOR_FRAME_MS = 16  # Mouse moves are drawn at most once per frame
+LOUPE_RADIUS = 10  # Original image pixels shown around the cursor
+LOUPE_ZOOM = 8  # Screen pixels per image pixel in the magnifier
+LOUPE_OFFSET = 24  # Distance of the magnifier from the cursor
+
+
+class DataFromPlotApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Data From Plot App")
+
+        # Status bar along the bottom of the window
+        self.status_frame = tk.Frame(self.root, relief=tk.SUNKEN, bd=1)
+        self.status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_var = tk.StringVar(value="")
+        tk.Label(self.status_frame, textvariable=self.status_var, anchor="w").pack(
+            side=tk.LEFT
+        )
+        self.metrics_var = tk.StringVar(value="")
+        tk.Label(self.status_frame, textvariable=self.metrics_var, anchor="e").pack(
+            side=tk.RIGHT
+        )
+        self.profiler = SessionProfiler()
+        self.create_menu()
+
+        # Create main frame to hold both image and controls
+        self.main_frame = tk.Frame(self.root)
+        self.main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Create frame for the image
+        self.image_frame = tk.Frame(self.main_frame)
+        self.image_frame.pack(side=tk.LEFT, padx=10, pady=10)
+
+        # Create frame for controls
+        self.control_frame = tk.Frame(self.main_frame, bg="lightgray", width=200)
+        self.control_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
+        self.control_frame.pack_propagate(False)  # Maintain fixed width
+
+        # Create a label to display an image in the image frame
+        self.label = tk.Label(self.image_frame, text="Image will be displayed here")
+        self.label.pack()
+
+        # Create a canvas for drawing markers on top of the image
+        self.canvas = tk.Canvas(self.image_frame, highlightthickness=0)
+        self.canvas.pack()
+        # Crosshair, data readout and magnifier following the mouse
+        self.cursor_xy = None  # Widget position of the last mouse move
+        self.cursor_pending = None
+        self.cursor_items = None  # Canvas items, created on the first move
+        self.loupe_image = None
+        self.loupe_key = None  # Image region the magnifier shows
+        self.canvas.bind("<Motion>", self.on_motion)
+        self.canvas.bind("<Leave>", self.on_leave)
+
+        self.points = PointStore()
+        self.point_index = PointIndex(self.points)  # Hit-testing for edits
+        self.marker_layer = MarkerLayer(self.canvas, self.points, self.point_index)
+        self.edit = None  # (kind, point index or lasso, canvas item) of a drag
+        self.display_points_pending = None
+        self.calibration = None  # Cached pixel-to-data mapping
+        self.reproject_pending = None  # Debounced reprojection after axis edits
+        self.export_thread = None  # Worker thread of a running export
+        self.pixels = None  # Decoded pixel buffer of the current image
+        self.vectors = None  # Paths of an SVG or PDF image, in image pixels
+        self.view = None  # Tiled, zoomable view of the current image
+        self.curve_color = None  # Colour picked for automatic extraction
+        self.color_tolerance = 40
+        self.trace = None  # (chunks, series, seed column) of a running trace
+        self.trace_job = None
+
+        # Initialize plot area selection variables
+        self.plot_area = None
+        self.selecting_plot_area = False
+        self.selection_rect = None
+        self.plot_area_rect = None
+
+        # Every change is journaled so a crashed session can be restored
+        self.journal = Journal(AUTOSAVE_PATH)
+        self.project_path = None  # Project file the session is saved to
+        self.sync_pending = None
+        self.points.listeners.append(self.on_points_change)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Calibrations used before, to skip selecting the same layout again
+        self.calibration_cache = CalibrationCache()
+        self.image_key = None  # (content hash, layout fingerprint) of the image
+
+        # Images are decoded on a worker thread, the next ones ahead of time
+        self.image_loader = ImageLoader(MAX_DISPLAY_WIDTH, MAX_DISPLAY_HEIGHT)
+        self.queue_paths = []  # Images of the opened folder
+        self.queue_index = 0
+        self.loading_path = None  # Image being decoded for display
+
+        # Create controls in the control frame
+        self.create_controls()
+
+        # Restore the previous session if it did not end cleanly, otherwise
+        # load and display the image
+        entries = read_journal(AUTOSAVE_PATH)
+        if (
+            entries
+            and entries[-1]["op"] != "close"
+            and messagebox.askyesno(
+                "Restore Session",
+                "The previous session did not end cleanly.\n\nRestore it?",
+            )
+        ):
+            self.restore_session(entries)
+        else:
+            self.open_image("example.png")
+
+    def load_image(self, file_path=None, select_plot_area=True):
+        """Display an image. Returns False if it could not be loaded.
+
+        This waits for the image to be decoded; open_image calls it once
+        the image has been decoded in the background.
+        """
+        with metrics.span("load_image"):
+            if not self._load_image(file_path):
+                return False
+            prompt = select_plot_area and not self.apply_cached_calibration()
+        # Outside the span, which would otherwise time how long the
+        # dialog stays open
+        if prompt:
+            if self.queue_paths:
+                # Don't interrupt a folder session with a dialog
+                self.update_queue_label("drag to select the plot area")
+            else:
+                messagebox.showinfo(
+                    "Select Plot Area",
+                    "Please drag to select the plot area (inside axes).",
+                )
+        return True
+
+    def _load_image(self, file_path):
+        self.cancel_trace()
+        try:
+            # Use provided file_path or default to example.png
+            if file_path is None:
+                file_path = "example.png"
+            prepared = self.image_loader.get(file_path).result()
+            image = prepared.image
+            self.remember_calibration()  # Of the previous image
+            self.image_path = file_path
+            self.pixels = image
+            self.vectors = prepared.vectors
+            self.image_key = (prepared.digest, prepared.fingerprint)
+
+            # A new image starts a new session journal
+            self.project_path = None
+            self.start_journal(
+                AUTOSAVE_PATH, {"op": "image", "path": os.path.abspath(file_path)}
+            )
+
+            # Replace the previous image and its cached tiles
+            if self.view is not None:
+                self.view.close()
+            self.view = TiledImageView(
+                self.canvas,
+                image,
+                on_change=self.redraw_overlay,
+                pyramid=prepared.pyramid,
+            )
+            self.view.bind_navigation()
+
+            # Zoom to fit within max dimensions; tiles are resampled from the
+            # original image, so any zoom factor keeps the full resolution
+            self.view.fit(MAX_DISPLAY_WIDTH, MAX_DISPLAY_HEIGHT)
+            self.original_width = image.width
+            self.original_height = image.height
+            self.display_width = self.view.display_width
+            self.display_height = self.view.display_height
+
+            # Scale marker size with image size (e.g., 1% of min dimension, min 6px, max 24px)
+            min_dim = min(self.display_width, self.display_height)
+            self.marker_layer.attach(self.view, max(6, min(24, int(min_dim * 0.01))))
+
+            # Hide the label since we're using canvas now
+            self.label.pack_forget()
+
+            # Resize window to match displayed image size plus control panel
+            window_width = self.display_width + 200 + 40
+            window_height = max(
+                self.display_height + 40, 660
+            )  # Ensure minimum height for controls
+            self.root.geometry(f"{window_width}x{window_height}")
+
+            # Remove previous plot area rectangle if it exists
+            if hasattr(self, "plot_area_rect") and self.plot_area_rect:
+                self.canvas.delete(self.plot_area_rect)
+                self.plot_area_rect = None
+
+            # Reset plot area selection
+            self.plot_area = None
+            self.calibration = None
+            self.selecting_plot_area = False
+            self.selection_rect = None
+            self.plot_area_rect = None
+            self.canvas.bind("<Button-1>", self.start_plot_area_selection)
+            self.canvas.bind("<B1-Motion>", self.update_plot_area_selection)
+            self.canvas.bind("<ButtonRelease-1>", self.finish_plot_area_selection)
+            self.points.reset()  # Points and undo history belong to the image
+            self.clear_points()
+            self.update_queue_label()
+            return True
+        except Exception as e:
+            print(f"Error loading image: {e}")
+            self.label.config(text="Failed to load image")
+            # Show label again if image loading fails
+            self.label.pack()
+            return False
+
+    def create_menu(self):
+        """Tools menu with the performance instrumentation."""
+        menubar = tk.Menu(self.root)
+        tools = tk.Menu(menubar, tearoff=False)
+        self.timing_var = tk.BooleanVar(value=False)
+        tools.add_checkbutton(
+            label="Show Timings",
+            variable=self.timing_var,
+            command=self.toggle_timing,
+        )
+        tools.add_command(label="Save Timings...", command=self.save_timings)
+        tools.add_command(label="Reset Timings", command=metrics.reset)
+        tools.add_separator()
+        self.profile_var = tk.BooleanVar(value=False)
+        tools.add_checkbutton(
+            label="Profile Session",
+            variable=self.profile_var,
+            command=self.toggle_profiling,
+        )
+        menubar.add_cascade(label="Tools", menu=tools)
+        view = tk.Menu(menubar, tearoff=False)
+        self.loupe_var = tk.BooleanVar(value=False)
+        view.add_checkbutton(
+            label="Magnifier",
+            variable=self.loupe_var,
+            command=self.schedule_cursor_update,
+        )
+        menubar.add_cascade(label="View", menu=view)
+        self.root.config(menu=menubar)
+
+    def toggle_timing(self):
+        metrics.enabled = self.timing_var.get()
+        if metrics.enabled:
+            self.refresh_timings()
+        else:
+            self.metrics_var.set("")
+
+    def refresh_timings(self):
+        if not metrics.enabled:
+            return
+        self.metrics_var.set(metrics.summary() or "Timing on")
+        self.root.after(STATUS_REFRESH_MS, self.refresh_timings)
+
+    def save_timings(self):
+        """Write the collected counters and histograms to a JSON file."""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title="Save timings",
+        )
+        if not file_path:
+            return
+        try:
+            metrics.dump(file_path)
+            print(f"Timings saved to: {file_path}")
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Error saving timings:\n{e}")
+
+    def toggle_profiling(self):
+        """Start profiling, or stop and save the profile as a .prof file."""
+        if self.profile_var.get():
+            self.profiler.start()
+            print("Profiling started")
+            return
+        if not self.profiler.running:
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".prof",
+            filetypes=[("Profiles", "*.prof"), ("All files", "*.*")],
+            title="Save profile",
+        )
+        try:
+            self.profiler.stop(file_path)
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Error saving profile:\n{e}")
+            return
+        if file_path:
+            print(f"Profile saved to: {file_path}")
+
+    def create_controls(self):
+        """Create control panel with buttons and dropdown menus"""
+        # Title for the control panel
+        title_label = tk.Label(
+            self.control_frame,
+            text="Controls",
+            font=("Arial", 12, "bold"),
+            bg="lightgray",
+        )
+        title_label.pack(pady=(10, 20))
+
+        # Dropdown menu for X-axis type
+        x_axis_label = tk.Label(self.control_frame, text="X-Axis Type:", bg="lightgray")
+        x_axis_label.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.x_axis_var = tk.StringVar(value="Linear")
+        x_axis_dropdown = ttk.Combobox(
+            self.control_frame,
+            textvariable=self.x_axis_var,
+            values=["Linear", "Log10"],
+        )
+        x_axis_dropdown.pack(fill="x", padx=10, pady=(0, 10))
+
+        # Dropdown menu for Y-axis type
+        y_axis_label = tk.Label(self.control_frame, text="Y-Axis Type:", bg="lightgray")
+        y_axis_label.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.y_axis_var = tk.StringVar(value="Linear")
+        y_axis_dropdown = ttk.Combobox(
+            self.control_frame,
+            textvariable=self.y_axis_var,
+            values=["Linear", "Log10"],
+        )
+        y_axis_dropdown.pack(fill="x", padx=10, pady=(0, 15))
+
+        # Axis limits section
+        limits_label = tk.Label(
+            self.control_frame,
+            text="Axis Limits:",
+            font=("Arial", 10, "bold"),
+            bg="lightgray",
+        )
+        limits_label.pack(anchor="w", padx=10, pady=(10, 5))
+
+        # Create frame for axis limits inputs
+        limits_frame = tk.Frame(self.control_frame, bg="lightgray")
+        limits_frame.pack(fill="x", padx=10, pady=5)
+
+        # X min
+        xmin_frame = tk.Frame(limits_frame, bg="lightgray")
+        xmin_frame.pack(fill="x", pady=2)
+        tk.Label(xmin_frame, text="X min:", bg="lightgray", width=8).pack(side="left")
+        self.xmin_var = tk.StringVar(value="0.15")
+        self.xmin_entry = tk.Entry(xmin_frame, textvariable=self.xmin_var, width=12)
+        self.xmin_entry.pack(side="right", fill="x", expand=True)
+
+        # X max
+        xmax_frame = tk.Frame(limits_frame, bg="lightgray")
+        xmax_frame.pack(fill="x", pady=2)
+        tk.Label(xmax_frame, text="X max:", bg="lightgray", width=8).pack(side="left")
+        self.xmax_var = tk.StringVar(value="0.55")
+        self.xmax_entry = tk.Entry(xmax_frame, textvariable=self.xmax_var, width=12)
+        self.xmax_entry.pack(side="right", fill="x", expand=True)
+
+        # Y min
+        ymin_frame = tk.Frame(limits_frame, bg="lightgray")
+        ymin_frame.pack(fill="x", pady=2)
+        tk.Label(ymin_frame, text="Y min:", bg="lightgray", width=8).pack(side="left")
+        self.ymin_var = tk.StringVar(value="-5")
+        self.ymin_entry = tk.Entry(ymin_frame, textvariable=self.ymin_var, width=12)
+        self.ymin_entry.pack(side="right", fill="x", expand=True)
+
+        # Y max
+        ymax_frame = tk.Frame(limits_frame, bg="lightgray")
+        ymax_frame.pack(fill="x", pady=2)
+        tk.Label(ymax_frame, text="Y max:", bg="lightgray", width=8).pack(side="left")
+        self.ymax_var = tk.StringVar(value="4")
+        self.ymax_entry = tk.Entry(ymax_frame, textvariable=self.ymax_var, width=12)
+        self.ymax_entry.pack(side="right", fill="x", expand=True)
+
+        # Recompute the points whenever an axis setting changes
+        for var in (
+            self.x_axis_var,
+            self.y_axis_var,
+            self.xmin_var,
+            self.xmax_var,
+            self.ymin_var,
+            self.ymax_var,
+        ):
+            var.trace_add("write", self.on_axis_change)
+
+        # CSV Headers section
+        headers_label = tk.Label(
+            self.control_frame,
+            text="CSV Headers:",
+            font=("Arial", 10, "bold"),
+            bg="lightgray",
+        )
+        headers_label.pack(anchor="w", padx=10, pady=(15, 5))
+
+        # Create frame for CSV header inputs
+        headers_frame = tk.Frame(self.control_frame, bg="lightgray")
+        headers_frame.pack(fill="x", padx=10, pady=5)
+
+        # X header
+        x_header_frame = tk.Frame(headers_frame, bg="lightgray")
+        x_header_frame.pack(fill="x", pady=2)
+        tk.Label(x_header_frame, text="X header:", bg="lightgray", width=8).pack(
+            side="left"
+        )
+        self.x_header_var = tk.StringVar(value="x")
+        self.x_header_entry = tk.Entry(
+            x_header_frame, textvariable=self.x_header_var, width=12
+        )
+        self.x_header_entry.pack(side="right", fill="x", expand=True)
+
+        # Y header
+        y_header_frame = tk.Frame(headers_frame, bg="lightgray")
+        y_header_frame.pack(fill="x", pady=2)
+        tk.Label(y_header_frame, text="Y header:", bg="lightgray", width=8).pack(
+            side="left"
+        )
+        self.y_header_var = tk.StringVar(value="y")
+        self.y_header_entry = tk.Entry(
+            y_header_frame, textvariable=self.y_header_var, width=12
+        )
+        self.y_header_entry.pack(side="right", fill="x", expand=True)
+
+        # Header changes are journaled like the axis settings
+        for var in (self.x_header_var, self.y_header_var):
+            var.trace_add("write", self.on_settings_change)
+
+        # Buttons section
+        buttons_label = tk.Label(
+            self.control_frame,
+            text="Actions:",
+            font=("Arial", 10, "bold"),
+            bg="lightgray",
+        )
+        buttons_label.pack(anchor="w", padx=10, pady=(20, 5))
+
+        # Clear points button
+        clear_btn = tk.Button(
+            self.control_frame,
+            text="Clear Points",
+            command=self.clear_points,
+            bg="white",
+        )
+        clear_btn.pack(fill="x", padx=10, pady=2)
+
+        # Undo and redo edits of the points, side by side
+        undo_frame = tk.Frame(self.control_frame, bg="lightgray")
+        undo_frame.pack(fill="x", padx=10, pady=2)
+        tk.Button(undo_frame, text="Undo", command=self.undo, bg="white").pack(
+            side="left", fill="x", expand=True
+        )
+        tk.Button(undo_frame, text="Redo", command=self.redo, bg="white").pack(
+            side="right", fill="x", expand=True
+        )
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+
+        # Toggle marker visibility without deleting the points
+        self.show_markers_var = tk.BooleanVar(value=True)
+        show_markers_check = tk.Checkbutton(
+            self.control_frame,
+            text="Show Markers",
+            variable=self.show_markers_var,
+            command=self.toggle_markers,
+            bg="lightgray",
+        )
+        show_markers_check.pack(anchor="w", padx=10, pady=2)
+
+        # Drag points to move them, or draw a lasso to delete points
+        self.edit_points_var = tk.BooleanVar(value=False)
+        edit_points_check = tk.Checkbutton(
+            self.control_frame,
+            text="Edit Points",
+            variable=self.edit_points_var,
+            command=self.toggle_edit_points,
+            bg="lightgray",
+        )
+        edit_points_check.pack(anchor="w", padx=10, pady=2)
+
+        # Thin out dense curves for drawing and export
+        simplify_label = tk.Label(
+            self.control_frame,
+            text="Simplify Curves:",
+            font=("Arial", 10, "bold"),
+            bg="lightgray",
+        )
+        simplify_label.pack(anchor="w", padx=10, pady=(10, 5))
+        simplify_frame = tk.Frame(self.control_frame, bg="lightgray")
+        simplify_frame.pack(fill="x", padx=10, pady=2)
+
+        # Vertices drawn per curve, 0 draws all
+        shown_frame = tk.Frame(simplify_frame, bg="lightgray")
+        shown_frame.pack(fill="x", pady=2)
+        tk.Label(shown_frame, text="Points shown:", bg="lightgray", width=14).pack(
+            side="left"
+        )
+        self.display_points_var = tk.StringVar(value=str(MAX_VERTICES))
+        tk.Entry(shown_frame, textvariable=self.display_points_var, width=8).pack(
+            side="right", fill="x", expand=True
+        )
+        self.display_points_var.trace_add("write", self.on_display_points_change)
+
+        # Max. y error of dropped points (decades on a Log10 axis), 0 keeps all
+        tolerance_frame = tk.Frame(simplify_frame, bg="lightgray")
+        tolerance_frame.pack(fill="x", pady=2)
+        tk.Label(
+            tolerance_frame, text="Export tolerance:", bg="lightgray", width=14
+        ).pack(side="left")
+        self.export_tolerance_var = tk.StringVar(value="0")
+        tk.Entry(tolerance_frame, textvariable=self.export_tolerance_var, width=8).pack(
+            side="right", fill="x", expand=True
+        )
+
+        # Export data button
+        export_btn = tk.Button(
+            self.control_frame, text="Export Data", command=self.export_data, bg="white"
+        )
+        export_btn.pack(fill="x", padx=10, pady=2)
+
+        # Write the series id of every point as an extra first column
+        self.series_column_var = tk.BooleanVar(value=False)
+        series_column_check = tk.Checkbutton(
+            self.control_frame,
+            text="Export Series Column",
+            variable=self.series_column_var,
+            bg="lightgray",
+        )
+        series_column_check.pack(anchor="w", padx=10, pady=2)
+
+        # Write every series as its own x/y column pair
+        self.split_series_var = tk.BooleanVar(value=True)
+        split_series_check = tk.Checkbutton(
+            self.control_frame,
+            text="Column Pair per Series",
+            variable=self.split_series_var,
+            bg="lightgray",
+        )
+        split_series_check.pack(anchor="w", padx=10, pady=2)
+
+        # Progress of a running export
+        self.export_progress_bar = ttk.Progressbar(
+            self.control_frame, mode="determinate", maximum=100
+        )
+        self.export_progress_bar.pack(fill="x", padx=10, pady=2)
+
+        # Save calibration button, for reuse in batch mode
+        save_calibration_btn = tk.Button(
+            self.control_frame,
+            text="Save Calibration",
+            command=self.save_calibration,
+            bg="white",
+        )
+        save_calibration_btn.pack(fill="x", padx=10, pady=2)
+
+        # Load image button
+        load_btn = tk.Button(
+            self.control_frame,
+            text="Load New Image",
+            command=self.load_new_image,
+            bg="white",
+        )
+        load_btn.pack(fill="x", padx=10, pady=2)
+
+        # Work through a folder of images with Previous and Next
+        open_folder_btn = tk.Button(
+            self.control_frame,
+            text="Open Folder",
+            command=self.open_folder,
+            bg="white",
+        )
+        open_folder_btn.pack(fill="x", padx=10, pady=2)
+
+        queue_frame = tk.Frame(self.control_frame, bg="lightgray")
+        queue_frame.pack(fill="x", padx=10, pady=2)
+        tk.Button(
+            queue_frame, text="< Previous", command=self.previous_image, bg="white"
+        ).pack(side="left", fill="x", expand=True)
+        tk.Button(queue_frame, text="Next >", command=self.next_image, bg="white").pack(
+            side="left", fill="x", expand=True
+        )
+
+        self.queue_var = tk.StringVar(value="")
+        queue_label = tk.Label(
+            self.control_frame,
+            textvariable=self.queue_var,
+            bg="lightgray",
+            wraplength=180,
+            justify="left",
+        )
+        queue_label.pack(anchor="w", padx=10)
+
+        # Runs while an image decodes in the background
+        self.load_progress_bar = ttk.Progressbar(
+            self.control_frame, mode="indeterminate"
+        )
+        self.load_progress_bar.pack(fill="x", padx=10, pady=2)
+
+        # Save the image reference, calibration and points as a project
+        save_project_btn = tk.Button(
+            self.control_frame,
+            text="Save Project",
+            command=self.save_project,
+            bg="white",
+        )
+        save_project_btn.pack(fill="x", padx=10, pady=2)
+
+        open_project_btn = tk.Button(
+            self.control_frame,
+            text="Open Project",
+            command=self.open_project,
+            bg="white",
+        )
+        open_project_btn.pack(fill="x", padx=10, pady=2)
+
+        # Extract a whole curve by clicking on a pixel of its colour
+        extract_btn = tk.Button(
+            self.control_frame,
+            text="Extract Curve by Colour",
+            command=self.start_color_pick,
+            bg="white",
+        )
+        extract_btn.pack(fill="x", padx=10, pady=2)
+
+        # Follow one curve from a clicked point, also through crossings
+        trace_btn = tk.Button(
+            self.control_frame,
+            text="Trace Curve from Point",
+            command=self.start_trace_pick,
+            bg="white",
+        )
+        trace_btn.pack(fill="x", padx=10, pady=2)
+
+        # Find every scatter marker like a clicked one
+        markers_btn = tk.Button(
+            self.control_frame,
+            text="Detect Markers",
+            command=self.start_marker_pick,
+            bg="white",
+        )
+        markers_btn.pack(fill="x", padx=10, pady=2)
+
+        # Separate all coloured curves at once
+        extract_all_btn = tk.Button(
+            self.control_frame,
+            text="Extract All Curves",
+            command=self.extract_all_curves,
+            bg="white",
+        )
+        extract_all_btn.pack(fill="x", padx=10, pady=2)
+
+        # Propose the plot area from the axis lines of the image
+        detect_area_btn = tk.Button(
+            self.control_frame,
+            text="Auto-detect Plot Area",
+            command=self.auto_detect_plot_area,
+            bg="white",
+        )
+        detect_area_btn.pack(fill="x", padx=10, pady=2)
+
+        # Add button to clear plot area selection
+        clear_area_btn = tk.Button(
+            self.control_frame,
+            text="Clear Plot Area",
+            command=self.clear_plot_area,
+            bg="white",
+        )
+        clear_area_btn.pack(fill="x", padx=10, pady=(5, 10))
+
+    def clear_points(self):
+        """Clear all collected points"""
+        self.cancel_trace()
+        self.points.clear()
+
+        # Remove all markers from canvas
+        self.marker_layer.clear()
+
+        print("Points cleared")
+
+    def undo(self):
+        self.cancel_trace()
+        if self.points.undo():
+            # Restored points may predate the current axis settings
+            self.reproject_points()
+            self.marker_layer.redraw()
+        else:
+            print("Nothing to undo")
+
+    def redo(self):
+        self.cancel_trace()
+        if self.points.redo():
+            self.reproject_points()
+            self.marker_layer.redraw()
+        else:
+            print("Nothing to redo")
+
+    def toggle_markers(self):
+        self.marker_layer.set_hidden(not self.show_markers_var.get())
+
+    def on_display_points_change(self, *args):
+        # Redraw once typing pauses, not for every digit
+        if self.display_points_pending is not None:
+            self.root.after_cancel(self.display_points_pending)
+        self.display_points_pending = self.root.after(
+            REPROJECT_DELAY_MS, self.apply_display_points
+        )
+
+    def apply_display_points(self):
+        self.display_points_pending = None
+        try:
+            max_vertices = int(self.display_points_var.get())
+        except ValueError:
+            return
+        if max_vertices != self.marker_layer.max_vertices and max_vertices >= 0:
+            self.marker_layer.max_vertices = max_vertices
+            if self.view is not None:
+                self.marker_layer.redraw()
+
+    def toggle_edit_points(self):
+        self.canvas.config(cursor="hand2" if self.edit_points_var.get() else "")
+
+    def export_data(self):
+        """Export collected data points to a CSV or binary file"""
+        if not len(self.points):
+            print("No data points to export")
+            messagebox.showwarning(
+                "No Data",
+                "No data points to export. Please click on the image to collect points first.",
+            )
+            return
+        if self.export_thread is not None:
+            messagebox.showwarning(
+                "Export Running", "Please wait for the current export to finish."
+            )
+            return
+        try:
+            tolerance = float(self.export_tolerance_var.get().strip() or 0)
+        except ValueError:
+            messagebox.showerror(
+                "Invalid Tolerance", "The export tolerance must be a number."
+            )
+            return
+
+        # Open file dialog to choose save location
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("NumPy arrays", "*.npy"),
+                ("Packed float64", "*.f64"),
+                ("All files", "*.*"),
+            ],
+            title="Save data points",
+        )
+
+        if not file_path:  # User cancelled the dialog
+            print("Export cancelled")
+            return
+
+        # Use user-defined column names
+        layout = (
+            self.x_header_var.get().strip() or "x",
+            self.y_header_var.get().strip() or "y",
+            self.split_series_var.get(),
+            self.series_column_var.get(),
+        )
+        simplify = None
+        if tolerance > 0:
+            simplify = (
+                tolerance,
+                self.x_axis_var.get() == "Log10",
+                self.y_axis_var.get() == "Log10",
+            )
+        # Copy the columns so points added during the export don't race the writer
+        points = (self.points.xs[:], self.points.ys[:], self.points.series[:])
+
+        self.remember_calibration()
+
+        # Write on a worker thread; the Tk thread polls its progress
+        self.export_progress = (0, len(points[0]))
+        self.export_error = None
+        self.export_thread = threading.Thread(
+            target=self.run_export,
+            args=(file_path, points, layout, simplify),
+            daemon=True,
+        )
+        self.export_thread.start()
+        self.root.after(EXPORT_POLL_MS, self.poll_export, file_path)
+
+    def run_export(self, file_path, points, layout, simplify):
+        """Worker thread body: simplify and write the points, never touching Tk."""
+
+        def progress(done, total):
+            self.export_progress = (done, total)
+
+        try:
+            with metrics.span("export"):
+                if simplify is not None:
+                    points = simplify_points(*points, *simplify)
+                columns, headers = point_columns(*points, *layout)
+                write_columns(file_path, columns, headers, progress)
+        except Exception as e:
+            self.export_error = e
+
+    def poll_export(self, file_path):
+        done, total = self.export_progress
+        self.export_progress_bar["value"] = 100 * done / total if total else 100
+        if self.export_thread.is_alive():
+            self.root.after(EXPORT_POLL_MS, self.poll_export, file_path)
+            return
+        self.export_thread = None
+        self.export_progress_bar["value"] = 0
+
+        if self.export_error is not None:
+            e = self.export_error
+            print(f"Error saving file: {e}")
+            messagebox.showerror("Export Error", f"Error saving file:\n{e}")
+            return
+        print(f"Successfully exported {total} data points to: {file_path}")
+        messagebox.showinfo(
+            "Export Successful",
+            f"Successfully exported {total} data points to:\n{file_path}",
+        )
+
+    def get_calibration_settings(self):
+        """Collect the current plot area and axis settings as a calibration.
+
+        The plot area is stored in original image pixels so the calibration
+        can be applied to full-resolution images in batch mode.
+        """
+        return {
+            "plot_area": list(self.plot_area) if self.plot_area else None,
+            "x_axis_type": self.x_axis_var.get(),
+            "y_axis_type": self.y_axis_var.get(),
+            "x_min": float(self.xmin_var.get()),
+            "x_max": float(self.xmax_var.get()),
+            "y_min": float(self.ymin_var.get()),
+            "y_max": float(self.ymax_var.get()),
+            "x_header": self.x_header_var.get().strip() or "x",
+            "y_header": self.y_header_var.get().strip() or "y",
+            "color": self.curve_color,
+            "tolerance": self.color_tolerance,
+        }
+
+    def save_calibration(self):
+        """Save the plot area and axis settings to a JSON file"""
+        if self.plot_area is None:
+            messagebox.showwarning(
+                "Plot Area Not Set", "Please select the plot area first."
+            )
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Calibration files", "*.json"), ("All files", "*.*")],
+            title="Save calibration",
+        )
+        if not file_path:  # User cancelled the dialog
+            return
+
+        try:
+            save_calibration(file_path, self.get_calibration_settings())
+            self.remember_calibration()
+            print(f"Calibration saved to: {file_path}")
+        except ValueError as e:
+            messagebox.showerror(
+                "Invalid Axis Limits", f"Error parsing axis limits:\n{e}"
+            )
+        except Exception as e:
+            print(f"Error saving file: {e}")
+            messagebox.showerror("Save Error", f"Error saving file:\n{e}")
+
+    def get_calibration(self):
+        """Return the pixel-to-data mapping for the current settings.
+
+        The axis limits are parsed once and the result is cached until the
+        plot area or any axis setting changes.
+        """
+        if self.calibration is None:
+            self.calibration = Calibration(
+                self.plot_area,
+                float(self.xmin_var.get()),
+                float(self.xmax_var.get()),
+                float(self.ymin_var.get()),
+                float(self.ymax_var.get()),
+                self.x_axis_var.get(),
+                self.y_axis_var.get(),
+            )
+        return self.calibration
+
+    def on_axis_change(self, *args):
+        """Drop the cached calibration and reproject the points once typing pauses."""
+        self.calibration = None
+        self.on_settings_change()
+
+    def on_settings_change(self, *args):
+        if self.reproject_pending is not None:
+            self.root.after_cancel(self.reproject_pending)
+        self.reproject_pending = self.root.after(
+            REPROJECT_DELAY_MS, self.settings_settled
+        )
+
+    def settings_settled(self):
+        self.journal_settings()
+        self.reproject_points()
+
+    def reproject_points(self):
+        """Recompute the data coordinates of all points from their pixels.
+
+        All points are converted in one vectorized pass. While the axis
+        limits don't parse (e.g. halfway through typing "1e-3") or put
+        points out of range, the points keep their previous values.
+        """
+        self.reproject_pending = None
+        if self.plot_area is None or not len(self.points):
+            return
+        try:
+            xs, ys = self.get_calibration().to_data(self.points.Xs, self.points.Ys)
+        except (ValueError, OverflowError, ZeroDivisionError):
+            return
+        self.points.set_data(xs, ys)
+        print(f"Updated {len(self.points)} points for the new axis settings")
+
+    def load_new_image(self):
+        filetypes = [
+            ("Images", " ".join("*" + extension for extension in IMAGE_EXTENSIONS)),
+            ("PNG files", "*.png"),
+            ("Vector figures", "*.svg *.pdf"),
+        ]
+        file_path = filedialog.askopenfilename(
+            title="Select Image File", filetypes=filetypes
+        )
+        if file_path:
+            self.queue_paths = []  # Leave a folder session
+            self.open_image(file_path)
+
+    def open_folder(self):
+        """Open all images of a folder as a queue to work through."""
+        folder = filedialog.askdirectory(title="Select Image Folder")
+        if not folder:
+            return
+        paths = find_images(folder, IMAGE_EXTENSIONS)
+        if not paths:
+            messagebox.showwarning("No Images", f"No images found in:\n{folder}")
+            return
+        self.queue_paths = paths
+        self.queue_index = 0
+        self.open_image(paths[0])
+
+    def next_image(self):
+        if self.queue_index + 1 < len(self.queue_paths):
+            self.queue_index += 1
+            self.open_image(self.queue_paths[self.queue_index])
+
+    def previous_image(self):
+        if self.queue_index > 0:
+            self.queue_index -= 1
+            self.open_image(self.queue_paths[self.queue_index])
+
+    def update_queue_label(self, note=""):
+        if not self.queue_paths:
+            self.queue_var.set("")
+            return
+        name = os.path.basename(self.queue_paths[self.queue_index])
+        text = f"{self.queue_index + 1} / {len(self.queue_paths)}: {name}"
+        self.queue_var.set(f"{text}\n{note}" if note else text)
+
+    def open_image(self, file_path, select_plot_area=True, then=None):
+        """Load an image without blocking the UI while it decodes.
+
+        `then` is called with the result of load_image once the image is
+        shown or failed to load, and reports the failure itself. It isn't
+        called if another image is opened before this one is decoded.
+        """
+        try:
+            future = self.image_loader.get(file_path)
+        except OSError as e:
+            if then is not None:
+                then(False)
+            else:
+                messagebox.showerror("Load Error", f"Error loading image:\n{e}")
+            return
+        # Decode the next images of the folder while this one is worked on
+        start = self.queue_index + 1
+        self.image_loader.prefetch(self.queue_paths[start : start + PREFETCH])
+        self.loading_path = file_path
+        self.load_progress_bar.stop()
+        if future.done():
+            self.finish_loading(file_path, select_plot_area, then)
+            return
+        self.update_queue_label("loading...")
+        self.load_progress_bar.start()
+        self.root.after(
+            LOAD_POLL_MS, self.poll_loading, file_path, future, select_plot_area, then
+        )
+
+    def poll_loading(self, file_path, future, select_plot_area, then):
+        if self.loading_path != file_path:
+            return  # Another image was requested meanwhile
+        if not future.done():
+            self.root.after(
+                LOAD_POLL_MS,
+                self.poll_loading,
+                file_path,
+                future,
+                select_plot_area,
+                then,
+            )
+            return
+        self.load_progress_bar.stop()
+        self.finish_loading(file_path, select_plot_area, then)
+
+    def finish_loading(self, file_path, select_plot_area=True, then=None):
+        self.loading_path = None
+        loaded = self.load_image(file_path, select_plot_area)
+        if then is not None:
+            then(loaded)
+
+    def on_click(self, event):
+        # Only allow marking points if plot area is set and click is inside it
+        if not hasattr(self, "plot_area") or self.plot_area is None:
+            messagebox.showwarning(
+                "Plot Area Not Set", "Please select the plot area first."
+            )
+            return
+        if self.edit_points_var.get():
+            self.start_edit(event)
+            return
+        started = metrics.start()
+        X, Y = self.view.event_to_image(event)
+        try:
+            x, y = self.get_calibration().point_to_data(X, Y)
+
+            # Store both pixel and converted coordinates
+            index = self.points.append(X, Y, x, y)
+
+            print(f"Coordinate: (x={format(x)}, y={format(y)})")
+
+            # Draw a marker at the clicked point
+            self.marker_layer.add_points(index, index + 1)
+            if started is not None:
+                # Tk draws the marker when idle, so the span ends after that
+                self.root.after_idle(metrics.stop, "click_to_marker", started)
+
+        except ValueError as e:
+            print(f"Error parsing axis limits: {e}")
+            print("Please check your axis limit values for valid expressions")
+        except Exception as e:
+            print(f"Error converting coordinates: {e}")
+            print("Make sure the image is loaded and axis limits are valid")
+            import traceback
+
+            traceback.print_exc()
+
+    def start_edit(self, event):
+        """Grab the point under the mouse, or start a lasso if there is none."""
+        self.cancel_trace()
+        X, Y = self.view.event_to_image(event)
+        with metrics.span("hit_test"):
+            index = self.point_index.nearest(
+                X, Y, self.marker_layer.radius / self.view.zoom
+            )
+        x, y = self.view.event_to_canvas(event)
+        if index is not None:
+            x, y = self.view.image_to_canvas(
+                self.points.Xs[index], self.points.Ys[index]
+            )
+            r = self.marker_layer.radius
+            item = self.canvas.create_oval(
+                x - r, y - r, x + r, y + r, outline="orange", width=3
+            )
+            # Remember where the point was grabbed, it moves by the drag
+            self.edit = ("move", (index, X, Y), item)
+        else:
+            item = self.canvas.create_line(x, y, x, y, fill="orange", dash=(4, 2))
+            self.edit = ("lasso", [(X, Y)], item)
+
+    def drag_edit(self, event):
+        """Follow the mouse with the grabbed point or the lasso."""
+        if self.edit is None:
+            return
+        kind, target, item = self.edit
+        if kind == "move":
+            x, y = self.view.image_to_canvas(*self.moved_point(target, event))
+            r = self.marker_layer.radius
+            self.canvas.coords(item, x - r, y - r, x + r, y + r)
+            return
+        target.append(self.view.event_to_image(event))
+        coords = []
+        for vertex in target:
+            coords.extend(self.view.image_to_canvas(*vertex))
+        coords.extend(coords[:2])  # Close the lasso
+        self.canvas.coords(item, *coords)
+
+    def finish_edit(self, event):
+        """Move the grabbed point, or delete the points inside the lasso."""
+        if self.edit is None:
+            return
+        kind, target, item = self.edit
+        self.edit = None
+        self.canvas.delete(item)
+        if kind == "move":
+            index = target[0]
+            X, Y = self.moved_point(target, event)
+            if (X, Y) == (self.points.Xs[index], self.points.Ys[index]):
+                return  # A click without a drag, nothing to undo
+            try:
+                x, y = self.get_calibration().point_to_data(X, Y)
+            except (ValueError, OverflowError, ZeroDivisionError) as e:
+                print(f"Error converting the point: {e}")
+                return
+            self.points.set_point(index, X, Y, x, y)
+            print(f"Moved point {index + 1} to (x={format(x)}, y={format(y)})")
+        else:
+            with metrics.span("hit_test"):
+                indices = self.point_index.in_polygon(target)
+            if not indices:
+                return
+            self.points.delete_indices(indices)
+            print(f"Deleted {len(indices)} points")
+        self.marker_layer.redraw()
+
+    def moved_point(self, target, event):
+        """Image position of a grabbed point, moved by the drag so far."""
+        index, grab_X, grab_Y = target
+        X, Y = self.view.event_to_image(event)
+        return (
+            self.points.Xs[index] + X - grab_X,
+            self.points.Ys[index] + Y - grab_Y,
+        )
+
+    def redraw_overlay(self):
+        """Move the plot area and markers after the view was zoomed or panned."""
+        if self.plot_area_rect:
+            x0, y0, x1, y1 = self.plot_area
+            self.canvas.coords(
+                self.plot_area_rect,
+                *self.view.image_to_canvas(x0, y0),
+                *self.view.image_to_canvas(x1, y1),
+            )
+        self.marker_layer.on_view_change()
+        if self.cursor_xy is not None:
+            self.schedule_cursor_update()  # The image moved under the mouse
+
+    def on_motion(self, event):
+        self.cursor_xy = (event.x, event.y)
+        self.schedule_cursor_update()
+
+    def on_leave(self, event):
+        self.cursor_xy = None
+        self.schedule_cursor_update()
+
+    def schedule_cursor_update(self):
+        # Coalesce bursts of mouse moves, only the last position is drawn
+        if self.cursor_pending is None:
+            self.cursor_pending = self.root.after(CURSOR_FRAME_MS, self.update_cursor)
+
+    def update_cursor(self):
+        """Move the crosshair and magnifier and show the data under the mouse."""
+        self.cursor_pending = None
+        with metrics.span("cursor"):
+            self._update_cursor()
+
+    def _update_cursor(self):
+        canvas = self.canvas
+        if self.cursor_items is None:
+            # Created once and then only moved, shown and hidden
+            self.loupe_image = tk.PhotoImage(master=canvas)
+            self.cursor_items = (
+                canvas.create_line(0, 0, 0, 0, fill="gray40", dash=(4, 4)),
+                canvas.create_line(0, 0, 0, 0, fill="gray40", dash=(4, 4)),
+                canvas.create_image(0, 0, anchor="nw", image=self.loupe_image),
+                canvas.create_rectangle(0, 0, 0, 0, outline="black", width=2),
+                canvas.create_rectangle(0, 0, 0, 0, outline="red"),
+            )
+            for item in self.cursor_items:
+                canvas.itemconfigure(item, state="hidden", tags=("cursor",))
+        view = self.view
+        if self.cursor_xy is None or view is None:
+            canvas.itemconfigure("cursor", state="hidden")
+            self.status_var.set("")
+            return
+        x, y = canvas.canvasx(self.cursor_xy[0]), canvas.canvasy(self.cursor_xy[1])
+        X, Y = x / view.zoom, y / view.zoom
+        if not (0 <= X < view.width and 0 <= Y < view.height):
+            canvas.itemconfigure("cursor", state="hidden")
+            self.status_var.set("")
+            return
+
+        horizontal, vertical, loupe, frame, pixel = self.cursor_items
+        left, top = canvas.canvasx(0), canvas.canvasy(0)
+        right = left + canvas.winfo_width()
+        bottom = top + canvas.winfo_height()
+        canvas.coords(horizontal, left, y, right, y)
+        canvas.coords(vertical, x, top, x, bottom)
+        canvas.itemconfigure(horizontal, state="normal")
+        canvas.itemconfigure(vertical, state="normal")
+
+        status = f"Pixel ({int(X)}, {int(Y)})"
+        if self.plot_area is not None:
+            try:
+                data_x, data_y = self.get_calibration().point_to_data(X, Y)
+                status = f"x = {format(data_x)}, y = {format(data_y)}   {status}"
+            except (ValueError, OverflowError, ZeroDivisionError):
+                pass  # Axis limits being typed, show the pixel only
+        self.status_var.set(status)
+
+        if self.loupe_var.get():
+            self._update_loupe(X, Y, x, y, right, bottom)
+        else:
+            for item in (loupe, frame, pixel):
+                canvas.itemconfigure(item, state="hidden")
+        canvas.tag_raise("cursor")
+
+    def _update_loupe(self, X, Y, x, y, right, bottom):
+        """Show the original pixels around image pixel X, Y next to canvas x, y."""
+        view = self.view
+        _, _, loupe, frame, pixel = self.cursor_items
+        size = 2 * LOUPE_RADIUS + 1
+        # Keep the region inside the image, the cursor then isn't centred
+        X0 = max(0, min(int(X) - LOUPE_RADIUS, view.width - size))
+        Y0 = max(0, min(int(Y) - LOUPE_RADIUS, view.height - size))
+        width = min(size, view.width) * LOUPE_ZOOM
+        height = min(size, view.height) * LOUPE_ZOOM
+        if self.loupe_key != (view, X0, Y0):
+            # Only rendered again when the mouse moves to another region
+            self.loupe_key = (view, X0, Y0)
+            self.loupe_image.configure(
+                data=view.pyramid.tile(
+                    LOUPE_ZOOM, X0 * LOUPE_ZOOM, Y0 * LOUPE_ZOOM, width, height
+                ),
+                width=width,
+                height=height,
+            )
+        # Below right of the cursor, flipped where it would leave the view
+        lx = x + LOUPE_OFFSET
+        ly = y + LOUPE_OFFSET
+        if lx + width > right:
+            lx = x - LOUPE_OFFSET - width
+        if ly + height > bottom:
+            ly = y - LOUPE_OFFSET - height
+        canvas = self.canvas
+        canvas.coords(loupe, lx, ly)
+        canvas.coords(frame, lx, ly, lx + width, ly + height)
+        px = lx + (int(X) - X0) * LOUPE_ZOOM
+        py = ly + (int(Y) - Y0) * LOUPE_ZOOM
+        canvas.coords(pixel, px, py, px + LOUPE_ZOOM, py + LOUPE_ZOOM)
+        for item in (loupe, frame, pixel):
+            canvas.itemconfigure(item, state="normal")
+
+    def start_plot_area_selection(self, event):
+        self.selecting_plot_area = True
+        # Keep the corner in image pixels so zooming mid-drag is harmless
+        self.plot_area_start = self.view.event_to_image(event)
+        if self.selection_rect:
+            self.canvas.delete(self.selection_rect)
+        x, y = self.view.event_to_canvas(event)
+        self.selection_rect = self.canvas.create_rectangle(
+            x,
+            y,
+            x,
+            y,
+            outline="blue",
+            width=2,
+            dash=(2, 2),
+        )
+
+    def update_plot_area_selection(self, event):
+        if self.selecting_plot_area and self.selection_rect:
+            self.canvas.coords(
+                self.selection_rect,
+                *self.view.image_to_canvas(*self.plot_area_start),
+                *self.view.event_to_canvas(event),
+            )
+
+    def finish_plot_area_selection(self, event):
+        if not self.selecting_plot_area:
+            return
+        self.selecting_plot_area = False
+        x0, y0 = self.plot_area_start
+        x1, y1 = self.view.event_to_image(event)
+        # Remove the temporary selection rectangle
+        if self.selection_rect:
+            self.canvas.delete(self.selection_rect)
+            self.selection_rect = None
+        self.set_plot_area((min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+        messagebox.showinfo(
+            "Plot Area Selected",
+            "Plot area selected!\n\nNow set the axis limits and types in the control panel, then click inside the selected area to mark data points.",
+        )
+
+    def set_plot_area(self, plot_area):
+        """Use a plot area given in image pixels and start marking points."""
+        if self.vectors is not None:
+            # Vector figures have exact axis lines to snap the selection to
+            plot_area = snap_plot_area(
+                self.vectors, plot_area, SNAP_DISTANCE / self.view.zoom
+            )
+        self.plot_area = tuple(plot_area)
+        self.calibration = None
+        self.reproject_points()
+        self.journal_settings()
+        # Remove previous permanent plot area rectangle if it exists
+        if hasattr(self, "plot_area_rect") and self.plot_area_rect:
+            self.canvas.delete(self.plot_area_rect)
+        # Draw a permanent shaded rectangle for the selected plot area
+        x0, y0, x1, y1 = self.plot_area
+        self.plot_area_rect = self.canvas.create_rectangle(
+            *self.view.image_to_canvas(x0, y0),
+            *self.view.image_to_canvas(x1, y1),
+            outline="blue",
+            width=2,
+            dash=(2, 2),
+        )
+        # Place the plot area rectangle above the image tiles
+        self.canvas.tag_raise(self.plot_area_rect)
+        self.canvas.unbind("<Button-1>")
+        self.canvas.bind("<Button-1>", self.on_click)
+        # Only used to drag points and lassos while editing points
+        self.canvas.bind("<B1-Motion>", self.drag_edit)
+        self.canvas.bind("<ButtonRelease-1>", self.finish_edit)
+
+    def auto_detect_plot_area(self):
+        """Find the plot area from the axis lines instead of dragging it."""
+        if self.pixels is None:
+            return
+        try:
+            plot_area = detect_plot_area(self.pixels)
+        except ValueError as e:
+            print(f"Plot area detection failed: {e}")
+            messagebox.showwarning(
+                "No Plot Area Found",
+                f"{e}.\n\nPlease drag to select the plot area by hand.",
+            )
+            return
+        if self.selection_rect:
+            self.canvas.delete(self.selection_rect)
+            self.selection_rect = None
+        self.selecting_plot_area = False
+        self.set_plot_area(plot_area)
+        print(f"Detected plot area: {plot_area}")
+        messagebox.showinfo(
+            "Plot Area Detected",
+            "Plot area detected from the axis lines.\n\nCheck the rectangle; if it is wrong, use Clear Plot Area and drag it by hand.",
+        )
+
+    def start_color_pick(self):
+        if self.plot_area is None:
+            messagebox.showwarning(
+                "Plot Area Not Set", "Please select the plot area first."
+            )
+            return
+        self.canvas.bind("<Button-1>", self.pick_curve_color)
+        messagebox.showinfo(
+            "Pick Curve Colour", "Click on the curve you want to extract."
+        )
+
+    def pixel_color(self, X, Y):
+        """RGB colour of the image pixel at X, Y."""
+        pixels = self.pixels
+        X = min(int(X), pixels.width - 1)
+        Y = min(int(Y), pixels.height - 1)
+        i = (Y * pixels.width + X) * pixels.channels
+        color = tuple(pixels.data[i : i + pixels.channels])
+        if pixels.channels < 3:
+            color = (color[0],) * 3
+        return color[:3]
+
+    def pick_curve_color(self, event):
+        """Pick the curve colour under the click and extract the whole curve."""
+        self.canvas.bind("<Button-1>", self.on_click)
+        try:
+            self.curve_color = self.pixel_color(*self.view.event_to_image(event))
+            print(f"Picked curve colour: {self.curve_color}")
+            self.extract_curve_points()
+        except Exception as e:
+            print(f"Error extracting curve: {e}")
+            messagebox.showerror("Extraction Error", f"Error extracting curve:\n{e}")
+
+    def extract_curve_points(self):
+        """Scan the plot area for the picked colour and store the curve."""
+        # The scan runs at the original resolution of the image
+        with metrics.span("extract"):
+            if self.vectors is not None:
+                Xs, Ys = array("d"), array("d")
+                for _, curve_Xs, curve_Ys in vector_curves(
+                    self.vectors,
+                    self.plot_area,
+                    self.curve_color,
+                    self.color_tolerance,
+                ):
+                    Xs.extend(curve_Xs)
+                    Ys.extend(curve_Ys)
+            else:
+                Xs, Ys = extract_curve(
+                    self.pixels, self.plot_area, self.curve_color, self.color_tolerance
+                )
+        if not Xs:
+            messagebox.showwarning(
+                "No Curve Found", "No pixels of the picked colour in the plot area."
+            )
+            return
+        xs, ys = self.get_calibration().to_data(Xs, Ys)
+
+        start, stop = self.points.extend(
+            Xs, Ys, xs, ys, series=self.points.new_series()
+        )
+        self.marker_layer.add_points(start, stop)
+        print(f"Extracted {len(Xs)} points")
+
+    def start_marker_pick(self):
+        if self.plot_area is None:
+            messagebox.showwarning(
+                "Plot Area Not Set", "Please select the plot area first."
+            )
+            return
+        self.canvas.bind("<Button-1>", self.detect_marker_points)
+        messagebox.showinfo(
+            "Detect Markers", "Click on a marker that doesn't touch any other."
+        )
+
+    def detect_marker_points(self, event):
+        """Find all markers like the clicked one and store their centres."""
+        self.canvas.bind("<Button-1>", self.on_click)
+        try:
+            with metrics.span("detect_markers"):
+                template = marker_template(
+                    self.pixels, *self.view.event_to_image(event), self.color_tolerance
+                )
+                Xs, Ys = detect_markers(
+                    self.pixels, self.plot_area, template, self.color_tolerance
+                )
+            xs, ys = self.get_calibration().to_data(Xs, Ys)
+        except ValueError as e:
+            print(f"Error detecting markers: {e}")
+            messagebox.showwarning("Marker Detection Failed", f"{e}.")
+            return
+        # A series of its own, drawn in one batch like an extracted curve
+        series = self.points.new_series()
+        start, stop = self.points.extend(Xs, Ys, xs, ys, series=series)
+        self.marker_layer.add_points(start, stop)
+        print(
+            f"Detected {len(Xs)} markers of colour {template.color}, "
+            f"{template.width}x{template.height} pixels"
+        )
+
+    def start_trace_pick(self):
+        if self.plot_area is None:
+            messagebox.showwarning(
+                "Plot Area Not Set", "Please select the plot area first."
+            )
+            return
+        self.canvas.bind("<Button-1>", self.start_trace)
+        messagebox.showinfo("Trace Curve", "Click on the curve you want to trace.")
+
+    def start_trace(self, event):
+        """Trace the curve under the click, adding its points in chunks."""
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.cancel_trace()
+        X, Y = self.view.event_to_image(event)
+        color = self.pixel_color(X, Y)
+        chunks = trace_curve(
+            self.pixels, self.plot_area, (X, Y), color, self.color_tolerance
+        )
+        self.trace = (chunks, self.points.new_series(), int(X))
+        print(f"Tracing curve of colour {color}")
+        self.trace_step()
+
+    def trace_step(self):
+        """Store the next traced chunk, then give Tk a chance to run."""
+        self.trace_job = None
+        chunks, series, seed_X = self.trace
+        try:
+            with metrics.span("trace_chunk"):
+                Xs, Ys = next(chunks)
+            xs, ys = self.get_calibration().to_data(Xs, Ys)
+        except StopIteration:
+            self.trace = None
+            count = self.points.series.count(series)
+            print(f"Traced {count} points as series {series}")
+            return
+        except ValueError as e:
+            self.trace = None
+            print(f"Error tracing curve: {e}")
+            messagebox.showwarning("Tracing Failed", f"{e}.")
+            return
+        if Xs[0] >= seed_X:
+            start, stop = self.points.extend(Xs, Ys, xs, ys, series=series)
+            self.marker_layer.add_points(start, stop)
+        else:
+            # Points left of the seed go before the series, in increasing X
+            start = self.points.series.index(series)
+            stop = start + len(Xs)
+            self.points.insert(
+                start, Xs[::-1], Ys[::-1], xs[::-1], ys[::-1], [series] * len(Xs)
+            )
+            self.marker_layer.insert_points(start, stop)
+        self.trace_job = self.root.after(TRACE_STEP_MS, self.trace_step)
+
+    def cancel_trace(self):
+        """Stop a running trace, keeping the points traced so far."""
+        if self.trace_job is not None:
+            self.root.after_cancel(self.trace_job)
+            self.trace_job = None
+        if self.trace is not None:
+            self.trace[0].close()
+            self.trace = None
+
+    def extract_all_curves(self):
+        """Find the dominant curve colours and store each curve as a series."""
+        if self.plot_area is None:
+            messagebox.showwarning(
+                "Plot Area Not Set", "Please select the plot area first."
+            )
+            return
+        try:
+            calibration = self.get_calibration()
+            with metrics.span("extract"):
+                if self.vectors is not None:
+                    found = vector_curves(self.vectors, self.plot_area)
+                else:
+                    found = extract_series(
+                        self.pixels, self.plot_area, tolerance=self.color_tolerance
+                    )
+        except ValueError as e:
+            print(f"Error extracting curves: {e}")
+            messagebox.showerror("Extraction Error", f"Error extracting curves:\n{e}")
+            return
+        if not found:
+            messagebox.showwarning(
+                "No Curves Found", "No coloured curves found in the plot area."
+            )
+            return
+        for color, Xs, Ys in found:
+            if not Xs:
+                continue
+            xs, ys = calibration.to_data(Xs, Ys)
+            series = self.points.new_series()
+            start, stop = self.points.extend(Xs, Ys, xs, ys, series=series)
+            self.marker_layer.add_points(start, stop)
+            print(f"Extracted {len(Xs)} points of colour {color} as series {series}")
+
+    def clear_plot_area(self):
+        """Clear the selected plot area and its rectangle, and require reselection."""
+        self.clear_points()
+        self.plot_area = None
+        self.calibration = None
+        self.journal_settings()
+        if hasattr(self, "plot_area_rect") and self.plot_area_rect:
+            self.canvas.delete(self.plot_area_rect)
+            self.plot_area_rect = None
+        # Re-enable plot area selection
+        self.selecting_plot_area = False
+        self.selection_rect = None
+        self.canvas.bind("<Button-1>", self.start_plot_area_selection)
+        self.canvas.bind("<B1-Motion>", self.update_plot_area_selection)
+        self.canvas.bind("<ButtonRelease-1>", self.finish_plot_area_selection)
+        messagebox.showinfo(
+            "Plot Area Cleared", "Please drag to select a new plot area (inside axes)."
+        )
+
+    def apply_settings(self, settings):
+        """Set the axis settings, headers and plot area from a calibration."""
+        self.x_axis_var.set(settings["x_axis_type"])
+        self.y_axis_var.set(settings["y_axis_type"])
+        self.xmin_var.set(str(settings["x_min"]))
+        self.xmax_var.set(str(settings["x_max"]))
+        self.ymin_var.set(str(settings["y_min"]))
+        self.ymax_var.set(str(settings["y_max"]))
+        self.x_header_var.set(settings.get("x_header") or "x")
+        self.y_header_var.set(settings.get("y_header") or "y")
+        color = settings.get("color")
+        self.curve_color = tuple(color) if color else None
+        self.color_tolerance = settings.get("tolerance", 40)
+        if settings.get("plot_area"):
+            self.set_plot_area(settings["plot_area"])
+
+    def remember_calibration(self):
+        """Store the calibration of the current image in the cache."""
+        if self.plot_area is None or self.image_key is None:
+            return
+        try:
+            settings = self.get_calibration_settings()
+        except ValueError:
+            return
+        try:
+            self.calibration_cache.store(
+                *self.image_key, self.original_width, self.original_height, settings
+            )
+        except OSError as e:
+            print(f"Error writing the calibration cache: {e}")
+
+    def apply_cached_calibration(self):
+        """Calibrate from a cached image or layout. Returns False on a miss."""
+        try:
+            cached = self.calibration_cache.lookup(
+                *self.image_key, self.original_width, self.original_height
+            )
+        except OSError as e:
+            print(f"Error reading the calibration cache: {e}")
+            return False
+        if cached is None:
+            return False
+        self.apply_settings(cached)
+        print(f"Using the cached calibration, plot area {self.plot_area}")
+        return True
+
+    def start_journal(self, file_path, first_entry=None, resume=False):
+        """Switch journaling to another file."""
+        self.journal.close()
+        self.journal = Journal(file_path)
+        try:
+            if resume:
+                self.journal.resume()
+            else:
+                self.journal.start(first_entry)
+                self.journal.sync()
+        except OSError as e:
+            # Keep working without a journal rather than failing the image
+            print(f"Session journal disabled: {e}")
+            self.journal = Journal(file_path)
+
+    def write_autosave(self, entry, start=False):
+        """Write one entry to the autosave journal while a project is open."""
+        autosave = Journal(AUTOSAVE_PATH)
+        try:
+            if start:
+                autosave.start(entry)
+            else:
+                autosave.resume()
+                autosave.write(entry)
+            autosave.close()
+        except OSError as e:
+            print(f"Error writing the session journal: {e}")
+
+    def on_points_change(self, event, *args):
+        self.journal.record_points(self.points, event, *args)
+        self.schedule_sync()
+
+    def journal_settings(self):
+        try:
+            settings = self.get_calibration_settings()
+        except ValueError:
+            return  # Limits that don't parse are journaled once they do
+        self.journal.write({"op": "settings", "settings": settings})
+        self.schedule_sync()
+
+    def schedule_sync(self):
+        # Batch the entries of bursts of edits into one fsync
+        if self.sync_pending is None:
+            self.sync_pending = self.root.after(JOURNAL_SYNC_MS, self.sync_journal)
+
+    def sync_journal(self):
+        self.sync_pending = None
+        try:
+            self.journal.sync()
+        except OSError as e:
+            print(f"Error writing the session journal: {e}")
+
+    def replay_journal(self, entries):
+        """Apply the settings and point changes recorded in a journal."""
+        settings = [entry["settings"] for entry in entries if entry["op"] == "settings"]
+        if settings:
+            self.apply_settings(settings[-1])
+        replay_points(entries, self.points)
+
+    def restore_session(self, entries):
+        """Rebuild the session recorded in the autosave journal."""
+        first = entries[0]
+        if first["op"] == "project":
+            self.open_project(first["path"])
+            return
+        self.open_image(
+            first["path"],
+            select_plot_area=False,
+            then=lambda loaded: self.finish_restore(entries, loaded),
+        )
+
+    def finish_restore(self, entries, loaded):
+        """Replay the autosave journal once its image is shown."""
+        if not loaded:
+            messagebox.showerror(
+                "Restore Error", f"Could not load the image:\n{entries[0]['path']}"
+            )
+            return
+        # The replayed changes are journaled again into the new journal
+        self.replay_journal(entries)
+        self.reproject_points()
+        self.marker_layer.redraw()
+        print(f"Restored {len(self.points)} points")
+        if self.plot_area is None:
+            messagebox.showinfo(
+                "Select Plot Area", "Please drag to select the plot area (inside axes)."
+            )
+
+    def save_project(self):
+        """Save the image reference, calibration and points to a project file."""
+        if self.view is None:
+            messagebox.showwarning("No Image", "Please load an image first.")
+            return
+        file_path = self.project_path or filedialog.asksaveasfilename(
+            defaultextension=".dfp",
+            filetypes=[("Projects", "*.dfp"), ("All files", "*.*")],
+            title="Save project",
+        )
+        if not file_path:  # User cancelled the dialog
+            return
+        try:
+            snapshot = save_project(
+                file_path, self.image_path, self.get_calibration_settings(), self.points
+            )
+        except ValueError as e:
+            messagebox.showerror(
+                "Invalid Axis Limits", f"Error parsing axis limits:\n{e}"
+            )
+            return
+        except Exception as e:
+            print(f"Error saving project: {e}")
+            messagebox.showerror("Save Error", f"Error saving project:\n{e}")
+            return
+        # Changes after the snapshot go to a journal next to the project
+        self.start_journal(file_path + ".journal", {"op": "base", "snapshot": snapshot})
+        self.project_path = file_path
+        self.write_autosave({"op": "project", "path": os.path.abspath(file_path)}, True)
+        self.remember_calibration()
+        print(f"Project saved to: {file_path}")
+
+    def open_project(self, file_path=None):
+        """Open a project file and replay the changes journaled since it was saved."""
+        if file_path is None:
+            file_path = filedialog.askopenfilename(
+                title="Open Project",
+                filetypes=[("Projects", "*.dfp"), ("All files", "*.*")],
+            )
+            if not file_path:
+                return
+        try:
+            header, columns = load_project(file_path)
+            image_path = header["image_path"]
+            changed = image_hash(image_path) != header["image_sha256"]
+        except Exception as e:
+            print(f"Error opening project: {e}")
+            messagebox.showerror("Open Error", f"Error opening project:\n{e}")
+            return
+        if changed and not messagebox.askyesno(
+            "Image Changed",
+            f"The image changed since the project was saved:\n{image_path}\n\nOpen anyway?",
+        ):
+            return
+        self.open_image(
+            image_path,
+            select_plot_area=False,
+            then=lambda loaded: self.finish_open_project(
+                file_path, header, columns, loaded
+            ),
+        )
+
+    def finish_open_project(self, file_path, header, columns, loaded):
+        """Restore the points and settings of a project once its image is shown."""
+        if not loaded:
+            messagebox.showerror(
+                "Open Error", f"Could not load the image of the project:\n{file_path}"
+            )
+            return
+        # Nothing is journaled until the project journal is resumed below
+        journal_path = file_path + ".journal"
+        entries = read_journal(journal_path)
+        self.journal.close()
+        self.journal = Journal(journal_path)
+        self.apply_settings(header["calibration"])
+        n = header["points"]
+        nan = array("d", [float("nan")]) * n
+        self.points.reset(
+            (columns["Xs"], columns["Ys"], nan, nan[:], columns["series"]),
+            header["next_series"],
+        )
+        # Only replay a journal that continues this snapshot
+        if entries and entries[0] == {"op": "base", "snapshot": header["snapshot"]}:
+            self.replay_journal(entries)
+            self.start_journal(journal_path, resume=True)
+        else:
+            self.start_journal(
+                journal_path, {"op": "base", "snapshot": header["snapshot"]}
+            )
+        self.project_path = file_path
+        self.write_autosave({"op": "project", "path": os.path.abspath(file_path)}, True)
+
+        self.reproject_points()
+        self.marker_layer.redraw()
+        print(f"Opened project with {len(self.points)} points: {file_path}")
+
+    def on_close(self):
+        """Flush the journal and mark the session as ended cleanly."""
+        if self.reproject_pending is not None:
+            self.journal_settings()
+        self.journal.close()
+        self.write_autosave({"op": "close"})
+        self.cancel_trace()
+        self.remember_calibration()
+        self.image_loader.close()
+        if self.profiler.running:
+            self.profiler.stop("session.prof")
+            print("Profile saved to: session.prof")
+        self.root.destroy()
+
+
+def main():
+    parent = tk.Tk()
+    app = DataFromPlotApp(parent)
+    parent.mainloop()
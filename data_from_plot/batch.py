@@ -0,0 +1,132 @@
+"""Headless batch digitizing of a directory of images.
+
+Every image is processed in its own worker process with a shared saved
+calibration, and the extracted curve is written to one file per image.
+The plot area can also be detected per image from its axis lines.
+Nothing in here imports tkinter.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .calibration import Calibration, load_calibration
+from .detect import detect_plot_area
+from .export import write_columns
+from .extract import extract_curve
+from .png import read_png
+
+PNG_EXTENSIONS = (".png",)  # Batch mode decodes PNGs only
+
+
+def digitize_image(image_path, calibration, detect=False):
+    """Extract the calibrated curve from one image as data coordinates.
+
+    With `detect`, the plot area is found from the axis lines of the
+    image instead of taken from the calibration.
+    """
+    if calibration["color"] is None:
+        raise ValueError("Calibration has no curve colour to extract")
+    image = read_png(image_path)
+    if detect:
+        calibration = dict(calibration, plot_area=detect_plot_area(image))
+    Xs, Ys = extract_curve(
+        image, calibration["plot_area"], calibration["color"], calibration["tolerance"]
+    )
+    return Calibration.from_dict(calibration).to_data(Xs, Ys)
+
+
+def process_image(image_path, calibration, output_dir, extension=".csv", detect=False):
+    """Digitize one image and write its points. Returns (path, n_points)."""
+    xs, ys = digitize_image(image_path, calibration, detect)
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    output_path = os.path.join(output_dir, name + extension)
+    headers = [calibration["x_header"] or "x", calibration["y_header"] or "y"]
+    write_columns(output_path, [xs, ys], headers)
+    return output_path, len(xs)
+
+
+def find_images(image_dir, extensions=PNG_EXTENSIONS):
+    return sorted(
+        os.path.join(image_dir, name)
+        for name in os.listdir(image_dir)
+        if name.lower().endswith(extensions)
+    )
+
+
+def run_batch(
+    image_dir,
+    calibration_path,
+    output_dir=None,
+    workers=None,
+    extension=".csv",
+    detect=False,
+):
+    """Digitize every image in `image_dir` using a process pool.
+
+    Returns the number of images that failed.
+    """
+    calibration = load_calibration(calibration_path, require_plot_area=not detect)
+    output_dir = output_dir or image_dir
+    os.makedirs(output_dir, exist_ok=True)
+    image_paths = find_images(image_dir)
+    if not image_paths:
+        print(f"No images found in {image_dir}")
+        return 0
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                process_image, path, calibration, output_dir, extension, detect
+            )
+            for path in image_paths
+        ]
+        for path, future in zip(image_paths, futures):
+            try:
+                output_path, n_points = future.result()
+                print(f"{path}: exported {n_points} data points to {output_path}")
+            except Exception as e:
+                failures += 1
+                print(f"{path}: error digitizing image: {e}")
+    return failures
+
+
+def add_arguments(parser):
+    parser.add_argument("image_dir", help="directory with the images to digitize")
+    parser.add_argument(
+        "-c", "--calibration", required=True, help="saved calibration JSON file"
+    )
+    parser.add_argument(
+        "-o", "--output", help="directory for the output files (default: image_dir)"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["csv", "npy", "f64"],
+        default="csv",
+        help="output file format (default: csv)",
+    )
+    parser.add_argument(
+        "-a",
+        "--detect-plot-area",
+        action="store_true",
+        help="detect the plot area of every image from its axis lines",
+    )
+
+
+def main(args):
+    return run_batch(
+        args.image_dir,
+        args.calibration,
+        args.output,
+        args.workers,
+        "." + args.format,
+        args.detect_plot_area,
+    )
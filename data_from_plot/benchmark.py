@@ -0,0 +1,343 @@
+"""Benchmarks of loading, conversion, drawing, extraction and export.
+
+Synthetic plots with known curves are generated for every size and axis
+type, so each run also measures how far the extracted points are from the
+ground truth. Results are written as JSON; pass an earlier result file
+with --compare to list what got slower or less accurate.
+
+Marker drawing needs a display and is skipped without one. Nothing else
+in here imports tkinter.
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from .calibration import Calibration
+from .conversion import pixel2coordinate
+from .detect import detect_plot_area
+from .export import write_columns
+from .extract import extract_curve, extract_series
+from .png import PNGImage, read_png
+from .pyramid import ImagePyramid
+from .synthetic import CURVE_COLORS, SyntheticPlot
+
+DEFAULT_SIZES = (500, 2000, 8000)
+AXIS_TYPES = (("Linear", "Linear"), ("Log10", "Log10"))
+N_CURVES = 3
+MARKER_COUNTS = (1000, 10000, 100000)
+CONVERSION_POINTS = 100000
+EXPORT_POINTS = 1000000
+FIT_SIZE = (1400, 900)  # Display size the app fits images into
+TILE_SIZE = 256
+
+# A comparison flags times that grew by this fraction, and errors that
+# grew by this many pixels
+SLOWDOWN_THRESHOLD = 0.10
+ERROR_THRESHOLD_PX = 0.1
+
+
+def _timed(function, repeat):
+    """Best wall time of `repeat` calls, and the result of the last one."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_load(image_path, repeat):
+    """Decode the image, build the level shown at fit zoom and its tiles."""
+    read_s, image = _timed(lambda: read_png(image_path), repeat)
+
+    def downscale():
+        pyramid = ImagePyramid(image)
+        zoom = min(1.0, FIT_SIZE[0] / image.width, FIT_SIZE[1] / image.height)
+        pyramid.level(pyramid.level_for_zoom(zoom))
+        return pyramid, zoom
+
+    downscale_s, (pyramid, zoom) = _timed(downscale, repeat)
+    width = round(image.width * zoom)
+    height = round(image.height * zoom)
+
+    def tiles():
+        for y in range(0, height, TILE_SIZE):
+            for x in range(0, width, TILE_SIZE):
+                pyramid.tile(
+                    zoom, x, y, min(TILE_SIZE, width - x), min(TILE_SIZE, height - y)
+                )
+
+    tiles_s, _ = _timed(tiles, repeat)
+    return image, {"read_png_s": read_s, "downscale_s": downscale_s, "tiles_s": tiles_s}
+
+
+def curve_errors(plot, k, calibration, Xs, Ys):
+    """Pixel errors of points extracted for curve k against the ground truth.
+
+    The points go through the calibration to data coordinates, and the
+    true value at each x is mapped back to pixels, so axis transforms are
+    part of what is measured.
+    """
+    xs, ys = calibration.to_data(Xs, Ys)
+    errors = []
+    for x, y in zip(xs, ys):
+        _, Y = calibration.point_to_pixel(x, y)
+        _, Y_true = calibration.point_to_pixel(x, plot.truth(k, x))
+        errors.append(abs(Y - Y_true))
+    return errors
+
+
+def _nearest_curve(color):
+    return min(
+        range(N_CURVES),
+        key=lambda k: sum((a - b) ** 2 for a, b in zip(CURVE_COLORS[k], color)),
+    )
+
+
+def bench_extraction(image, plot, repeat):
+    calibration = Calibration.from_dict(plot.calibration())
+    area = plot.plot_area
+    curve_s, _ = _timed(lambda: extract_curve(image, area, CURVE_COLORS[0]), repeat)
+    series_s, found = _timed(lambda: extract_series(image, area), repeat)
+
+    errors = []
+    points = 0
+    for color, Xs, Ys in found:
+        errors += curve_errors(plot, _nearest_curve(color), calibration, Xs, Ys)
+        points += len(Xs)
+    columns = (area[2] - area[0] - 1) * N_CURVES
+    result = {
+        "curve_s": curve_s,
+        "series_s": series_s,
+        "series_found": len(found),
+        "coverage": points / columns,
+    }
+    if errors:
+        result["rms_error_px"] = (sum(e * e for e in errors) / len(errors)) ** 0.5
+        result["max_error_px"] = max(errors)
+    return result
+
+
+def bench_detection(image, plot, repeat):
+    seconds, detected = _timed(lambda: detect_plot_area(image), repeat)
+    error = max(abs(a - b) for a, b in zip(detected, plot.plot_area))
+    return {"seconds_s": seconds, "corner_error_px": error}
+
+
+def bench_conversion(n, repeat):
+    """Throughput of the per-point and the vectorized pixel conversion."""
+    plot = SyntheticPlot(2000, 1500, "Log10", "Log10")
+    x0, y0, x1, y1 = plot.plot_area
+    rng = random.Random(0)
+    Xs = [rng.uniform(x0, x1) for _ in range(n)]
+    Ys = [rng.uniform(y0, y1) for _ in range(n)]
+    cal = plot.calibration()
+
+    def per_point():
+        for X, Y in zip(Xs, Ys):
+            pixel2coordinate(
+                X - x0,
+                Y - y0,
+                cal["x_min"],
+                cal["x_max"],
+                cal["y_min"],
+                cal["y_max"],
+                x1 - x0,
+                y1 - y0,
+                cal["x_axis_type"],
+                cal["y_axis_type"],
+            )
+
+    calibration = Calibration.from_dict(cal)
+    pixel2coordinate_s, _ = _timed(per_point, repeat)
+    to_data_s, _ = _timed(lambda: calibration.to_data(Xs, Ys), repeat)
+    return {
+        "points": n,
+        "pixel2coordinate_s": pixel2coordinate_s,
+        "pixel2coordinate_points_per_s": n / pixel2coordinate_s,
+        "to_data_s": to_data_s,
+        "to_data_points_per_s": n / to_data_s,
+    }
+
+
+def bench_export(n, repeat, directory):
+    rng = random.Random(0)
+    columns = [[rng.random() for _ in range(n)] for _ in range(2)]
+    result = {"points": n}
+    for extension in (".csv", ".npy", ".f64"):
+        path = os.path.join(directory, "export" + extension)
+        seconds, _ = _timed(lambda: write_columns(path, columns, ["x", "y"]), repeat)
+        result[extension[1:] + "_s"] = seconds
+        result[extension[1:] + "_bytes"] = os.path.getsize(path)
+    return result
+
+
+def bench_markers(counts, repeat):
+    """Time drawing clicked points and extracted curves on a Tk canvas."""
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+    except Exception as e:  # No tkinter or no display
+        return {"skipped": str(e)}
+
+    from .markers import MarkerLayer
+    from .points import PointStore
+    from .viewer import TiledImageView
+
+    try:
+        canvas = tk.Canvas(root, highlightthickness=0)
+        canvas.pack()
+        width, height = FIT_SIZE
+        blank = PNGImage(width, height, 3, bytearray(b"\xff" * (width * height * 3)))
+        view = TiledImageView(canvas, blank)
+        view.fit(width, height)
+        rng = random.Random(0)
+        result = {}
+        for n in counts:
+            Xs = [rng.uniform(0, width) for _ in range(n)]
+            Ys = [rng.uniform(0, height) for _ in range(n)]
+            nan = [float("nan")] * n
+            for name, series in (("points", 0), ("curve", 1)):
+                points = PointStore()
+                points.extend(sorted(Xs), Ys, nan, nan, series=series)
+                layer = MarkerLayer(canvas, points)
+                layer.attach(view, 8)
+
+                def draw():
+                    layer.redraw()
+                    root.update_idletasks()
+
+                result[f"{name}_{n}_s"], _ = _timed(draw, repeat)
+                layer.clear()
+        return result
+    finally:
+        root.destroy()
+
+
+def run_benchmarks(
+    sizes=DEFAULT_SIZES, repeat=3, markers=True, export_points=EXPORT_POINTS
+):
+    results = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "plots": [],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            for x_axis_type, y_axis_type in AXIS_TYPES:
+                plot = SyntheticPlot(size, size * 3 // 4, x_axis_type, y_axis_type)
+                path = os.path.join(directory, f"plot_{size}.png")
+                write_s, _ = _timed(lambda: plot.write(path, N_CURVES), 1)
+                image, load = bench_load(path, repeat)
+                entry = {
+                    "name": f"{size} {x_axis_type}-{y_axis_type}",
+                    "width": plot.width,
+                    "height": plot.height,
+                    "generate_s": write_s,
+                    "load": load,
+                    "detect": bench_detection(image, plot, repeat),
+                    "extract": bench_extraction(image, plot, repeat),
+                }
+                print(f"{entry['name']}: {json.dumps(entry)}")
+                results["plots"].append(entry)
+                del image
+        results["conversion"] = bench_conversion(CONVERSION_POINTS, repeat)
+        print(f"conversion: {json.dumps(results['conversion'])}")
+        results["export"] = bench_export(export_points, repeat, directory)
+        print(f"export: {json.dumps(results['export'])}")
+    if markers:
+        results["markers"] = bench_markers(MARKER_COUNTS, repeat)
+        print(f"markers: {json.dumps(results['markers'])}")
+    return results
+
+
+def flatten(results):
+    """Numeric results keyed by paths like "plots/500 Linear-Linear/load/read_png_s"."""
+    flat = {}
+
+    def visit(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                visit(f"{prefix}/{key}" if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = value
+
+    for key, value in results.items():
+        if key == "plots":
+            for plot in value:
+                visit(f"plots/{plot['name']}", plot)
+        else:
+            visit(key, value)
+    return flat
+
+
+def compare(new, old):
+    """Lines describing the regressions of `new` results against `old` ones."""
+    new = flatten(new)
+    old = flatten(old)
+    regressions = []
+    for key in sorted(new.keys() & old.keys()):
+        before, after = old[key], new[key]
+        if key.endswith("_s") and after > before * (1 + SLOWDOWN_THRESHOLD):
+            regressions.append(f"{key}: {before:.4g} s -> {after:.4g} s")
+        elif key.endswith("_px") and after > before + ERROR_THRESHOLD_PX:
+            regressions.append(f"{key}: {before:.3g} px -> {after:.3g} px")
+    return regressions
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="plot widths in pixels, 500 to 20000 (default: 500 2000 8000)",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3, help="runs per timing, the best counts"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="benchmark.json",
+        help="JSON file for the results (default: benchmark.json)",
+    )
+    parser.add_argument(
+        "-c", "--compare", help="earlier results file to check for regressions"
+    )
+    parser.add_argument(
+        "--no-markers", action="store_true", help="skip the Tk marker drawing"
+    )
+    parser.add_argument(
+        "--export-points",
+        type=int,
+        default=EXPORT_POINTS,
+        help=f"points written by the export benchmark (default: {EXPORT_POINTS})",
+    )
+
+
+def main(args):
+    """Run the benchmarks. Returns the number of regressions found."""
+    results = run_benchmarks(
+        args.sizes, args.repeat, not args.no_markers, args.export_points
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f))
+    for line in regressions:
+        print(f"Regression: {line}")
+    if not regressions:
+        print(f"No regressions against {args.compare}")
+    return len(regressions)
@@ -0,0 +1,133 @@
+"""Persistent cache of calibrations, keyed by image content and layout.
+
+Figures from the same journal or instrument share their plot area and
+axes. The cache remembers the calibration used for an image under its
+content hash and a coarse layout fingerprint, so an identical image, or
+another figure of the same template, can be calibrated without selecting
+the plot area again.
+
+The cache is one JSON file holding the entries in least to most recently
+used order; the oldest entries are dropped beyond a fixed count.
+"""
+
+import json
+import os
+
+from .detect import dark_mask
+
+CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".data_from_plot", "calibrations.json"
+)
+MAX_ENTRIES = 256
+GRID = 16  # The fingerprint has GRID x GRID cells, one bit each
+MAX_DISTANCE = 24  # Differing bits for two images to share a layout
+
+# Only the layout is cached, the curve colour belongs to one figure
+CACHED_KEYS = (
+    "plot_area",
+    "x_axis_type",
+    "y_axis_type",
+    "x_min",
+    "x_max",
+    "y_min",
+    "y_max",
+    "x_header",
+    "y_header",
+)
+
+
+def layout_fingerprint(image):
+    """Fingerprint of where the dark ink of an image is.
+
+    The image is cut into a GRID x GRID grid and every cell with more
+    dark pixels than the average cell sets one bit. Axes, ticks and labels
+    of figures made from the same template land in the same cells.
+    """
+    width, height = image.width, image.height
+    mask = dark_mask(image)
+    edges = [c * width // GRID for c in range(GRID + 1)]
+    cells = [0] * (GRID * GRID)
+    for y in range(height):
+        start = y * width
+        base = y * GRID // height * GRID
+        for c in range(GRID):
+            cells[base + c] += mask.count(1, start + edges[c], start + edges[c + 1])
+    mean = sum(cells) / len(cells)
+    bits = 0
+    for count in cells:
+        bits = bits << 1 | (count > mean)
+    return bits
+
+
+class CalibrationCache:
+    """LRU cache of calibrations stored in a JSON file."""
+
+    def __init__(self, file_path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.file_path, encoding="utf-8") as f:
+                return json.load(f)["entries"]
+        except (OSError, ValueError, KeyError):
+            return []  # A missing or damaged cache starts empty
+
+    def _write(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f)
+        os.replace(tmp_path, self.file_path)
+
+    def lookup(self, digest, fingerprint, width, height):
+        """Calibration for an image, or None.
+
+        An entry with the same content hash wins. Otherwise the entry with
+        the nearest layout fingerprint is used if it is close enough, with
+        its plot area scaled to the size of the image.
+        """
+        best = None
+        best_distance = MAX_DISTANCE + 1
+        for entry in self.entries:
+            if entry["sha256"] == digest:
+                best = entry
+                break
+            distance = (int(entry["fingerprint"], 16) ^ fingerprint).bit_count()
+            if distance < best_distance:
+                best, best_distance = entry, distance
+        if best is None:
+            return None
+
+        # Mark the entry as the most recently used
+        self.entries.remove(best)
+        self.entries.append(best)
+        self._write()
+
+        calibration = dict(best["calibration"])
+        x_scale = width / best["width"]
+        y_scale = height / best["height"]
+        x0, y0, x1, y1 = calibration["plot_area"]
+        calibration["plot_area"] = [
+            x0 * x_scale,
+            y0 * y_scale,
+            x1 * x_scale,
+            y1 * y_scale,
+        ]
+        return calibration
+
+    def store(self, digest, fingerprint, width, height, calibration):
+        """Remember the calibration used for an image."""
+        entry = {
+            "sha256": digest,
+            "fingerprint": format(fingerprint, "x"),
+            "width": width,
+            "height": height,
+            "calibration": {key: calibration[key] for key in CACHED_KEYS},
+        }
+        self.entries = [e for e in self.entries if e["sha256"] != digest]
+        self.entries.append(entry)
+        # Drop the least recently used entries beyond the cap
+        del self.entries[: -self.max_entries]
+        self._write()
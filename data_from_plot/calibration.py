@@ -0,0 +1,169 @@
+"""Saved calibrations: plot area, axis settings and CSV headers."""
+
+import json
+from array import array
+from math import log10
+
+from .conversion import transform_axis
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, array('d') is used without it
+    np = None
+
+DEFAULT_CALIBRATION = {
+    "plot_area": None,  # (x0, y0, x1, y1) in original image pixels
+    "x_axis_type": "Linear",
+    "y_axis_type": "Linear",
+    "x_min": 0.0,
+    "x_max": 1.0,
+    "y_min": 0.0,
+    "y_max": 1.0,
+    "x_header": "x",
+    "y_header": "y",
+    "color": None,  # (r, g, b) of the curve to extract
+    "tolerance": 40,
+}
+
+
+def load_calibration(file_path, require_plot_area=True):
+    """Read a calibration JSON file, filling in defaults for missing keys."""
+    with open(file_path, encoding="utf-8") as f:
+        return parse_calibration(
+            json.load(f), require_plot_area, f"Calibration {file_path}"
+        )
+
+
+def parse_calibration(data, require_plot_area=True, name="Calibration"):
+    """Fill in defaults for the keys missing from a calibration dictionary."""
+    calibration = dict(DEFAULT_CALIBRATION, **data)
+    if require_plot_area and calibration["plot_area"] is None:
+        raise ValueError(f"{name} has no plot_area")
+    for key in ("x_min", "x_max", "y_min", "y_max"):
+        calibration[key] = float(calibration[key])
+    return calibration
+
+
+def save_calibration(file_path, calibration):
+    """Write a calibration to a JSON file."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=2)
+
+
+class Calibration:
+    """Precomputed mapping between image pixels and data coordinates.
+
+    The axis limits are parsed and transformed once, so converting a
+    point is a single multiply-add per axis (plus a power of ten on log
+    axes). Pixel coordinates are absolute image coordinates, the plot
+    area offset is folded into the transform.
+    """
+
+    def __init__(
+        self,
+        plot_area,
+        x_min,
+        x_max,
+        y_min,
+        y_max,
+        x_axis_type="Linear",
+        y_axis_type="Linear",
+    ):
+        plot_x_min, plot_y_min, plot_x_max, plot_y_max = plot_area
+        if plot_x_max == plot_x_min or plot_y_max == plot_y_min:
+            raise ValueError("Plot area has zero width or height")
+        self.plot_area = tuple(plot_area)
+        self.limits = (float(x_min), float(x_max), float(y_min), float(y_max))
+        self.x_axis_type = x_axis_type
+        self.y_axis_type = y_axis_type
+        self.x_log = x_axis_type == "Log10"
+        self.y_log = y_axis_type == "Log10"
+
+        x_min = transform_axis(float(x_min), x_axis_type)
+        x_max = transform_axis(float(x_max), x_axis_type)
+        y_min = transform_axis(float(y_min), y_axis_type)
+        y_max = transform_axis(float(y_max), y_axis_type)
+
+        # linear = scale * pixel + offset on both axes (y grows downwards)
+        self.x_scale = (x_max - x_min) / (plot_x_max - plot_x_min)
+        self.x_offset = x_min - plot_x_min * self.x_scale
+        self.y_scale = -(y_max - y_min) / (plot_y_max - plot_y_min)
+        self.y_offset = y_max - plot_y_min * self.y_scale
+
+    @classmethod
+    def from_dict(cls, calibration):
+        """Build from a saved calibration dictionary."""
+        return cls(
+            calibration["plot_area"],
+            calibration["x_min"],
+            calibration["x_max"],
+            calibration["y_min"],
+            calibration["y_max"],
+            calibration["x_axis_type"],
+            calibration["y_axis_type"],
+        )
+
+    def point_to_data(self, X, Y):
+        """Convert a single pixel coordinate to data coordinates."""
+        x = self.x_scale * X + self.x_offset
+        y = self.y_scale * Y + self.y_offset
+        return (10**x if self.x_log else x), (10**y if self.y_log else y)
+
+    def point_to_pixel(self, x, y):
+        """Convert a single data coordinate to pixel coordinates."""
+        x = log10(x) if self.x_log else x
+        y = log10(y) if self.y_log else y
+        return (x - self.x_offset) / self.x_scale, (y - self.y_offset) / self.y_scale
+
+    def to_data(self, Xs, Ys):
+        """Convert arrays of pixel coordinates to data coordinates.
+
+        NumPy arrays come back as NumPy arrays, anything else as array('d').
+        """
+        return (
+            _forward(Xs, self.x_scale, self.x_offset, self.x_log),
+            _forward(Ys, self.y_scale, self.y_offset, self.y_log),
+        )
+
+    def to_pixel(self, xs, ys):
+        """Convert arrays of data coordinates to pixel coordinates."""
+        return (
+            _inverse(xs, self.x_scale, self.x_offset, self.x_log),
+            _inverse(ys, self.y_scale, self.y_offset, self.y_log),
+        )
+
+
+def _as_numpy(values):
+    if isinstance(values, array) and values.typecode == "d":
+        return np.frombuffer(values, dtype=np.float64)  # Zero-copy view
+    return np.asarray(values, dtype=np.float64)
+
+
+def _to_output(result, values):
+    if isinstance(values, np.ndarray):
+        return result
+    out = array("d")
+    out.frombytes(result.tobytes())
+    return out
+
+
+def _forward(values, scale, offset, log):
+    if np is not None:
+        result = _as_numpy(values) * scale + offset
+        if log:
+            np.power(10.0, result, out=result)
+        return _to_output(result, values)
+    if log:
+        return array("d", [10 ** (v * scale + offset) for v in values])
+    return array("d", [v * scale + offset for v in values])
+
+
+def _inverse(values, scale, offset, log):
+    if np is not None:
+        result = _as_numpy(values)
+        result = (np.log10(result) if log else result) - offset
+        result /= scale
+        return _to_output(result, values)
+    if log:
+        return array("d", [(log10(v) - offset) / scale for v in values])
+    return array("d", [(v - offset) / scale for v in values])
@@ -0,0 +1,53 @@
+from math import log10
+
+
+def transform_value(value, type):
+    if type == "Log10":
+        return 10**value
+    else:
+        return value
+
+
+def transform_axis(axis_value, axis_type):
+    if axis_type == "Log10":
+        return log10(axis_value)  # Use log10 for logarithmic axis
+    else:
+        return axis_value
+
+
+def format(val):
+    if val == 0:
+        return "0"
+    if abs(val) >= 1e5 or abs(val) < 1e-3:
+        return f"{val:.3e}"
+    else:
+        return f"{val:.4f}".rstrip("0").rstrip(".")
+
+
+def pixel2coordinate(
+    x,
+    y,
+    x_min,
+    x_max,
+    y_min,
+    y_max,
+    image_width,
+    image_height,
+    x_axis_type,
+    y_axis_type,
+):
+    """Convert pixel coordinates to linear coordinates based on axis limits."""
+    x_min = transform_axis(x_min, x_axis_type)
+    x_max = transform_axis(x_max, x_axis_type)
+    y_min = transform_axis(y_min, y_axis_type)
+    y_max = transform_axis(y_max, y_axis_type)
+
+    # Calculate linear coordinates based on pixel position
+    x_linear = x_min + (x / image_width) * (x_max - x_min)
+    y_linear = y_min + (1 - (y / image_height)) * (y_max - y_min)
+
+    # Apply transformation based on axis type
+    x = transform_value(x_linear, x_axis_type)
+    y = transform_value(y_linear, y_axis_type)
+
+    return x, y
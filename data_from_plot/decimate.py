@@ -0,0 +1,120 @@
+"""Thinning out dense curves for drawing and export.
+
+Largest-triangle-three-buckets (LTTB) picks a fixed number of points that
+keep the visual shape of a curve, for drawing. A tolerance band keeps the
+points needed so no dropped point is further than a tolerance from the
+simplified curve, for export, in a single pass over the points.
+"""
+
+from array import array
+from itertools import compress
+from math import inf, log10
+
+from .points import MANUAL_SERIES
+
+
+def lttb(xs, ys, n_out):
+    """Indices of n_out points of a curve that keep its visual shape.
+
+    The first and last points are kept. The others are split into n_out - 2
+    buckets, and from each bucket the point forming the largest triangle
+    with the previously kept point and the mean of the next bucket is
+    kept. Peaks and dips survive, unlike with plain striding.
+    """
+    n = len(xs)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+    buckets = n_out - 2
+    bounds = [1 + k * (n - 2) // buckets for k in range(buckets + 1)]
+    bounds.append(n)  # The last "next bucket" is the last point
+    indices = [0]
+    a = 0
+    for k in range(buckets):
+        start, stop, next_stop = bounds[k], bounds[k + 1], bounds[k + 2]
+        # The sums run in C over slices of the columns
+        m = next_stop - stop
+        mean_x = sum(xs[stop:next_stop]) / m
+        mean_y = sum(ys[stop:next_stop]) / m
+        ax, ay = xs[a], ys[a]
+        dx, dy = ax - mean_x, mean_y - ay
+        best = -1.0
+        for i in range(start, stop):
+            # Twice the triangle area, the constant part left out
+            area = abs(dx * (ys[i] - ay) + (xs[i] - ax) * dy)
+            if area > best:
+                best, a = area, i
+        indices.append(a)
+    indices.append(n - 1)
+    return indices
+
+
+def tolerance_band(xs, ys, tolerance):
+    """Indices of the points kept by a single-pass tolerance band, in order.
+
+    From the last kept point, the range of slopes that pass within the
+    tolerance of every point since is narrowed point by point. The point
+    before the first one outside that range is kept and starts a new
+    range, so each point is looked at once. The distance is measured
+    vertically, in the units of ys, so the tolerance has the meaning of
+    the y data. Where x doesn't increase, both points are kept.
+    """
+    n = len(xs)
+    if n < 3:
+        return list(range(n))
+    keep = [0]
+    a = 0
+    xa, ya = xs[0], ys[0]
+    low, high = -inf, inf
+    for i in range(1, n):
+        x, y = xs[i], ys[i]
+        dx = x - xa
+        if dx <= 0 or not low <= (y - ya) / dx <= high:
+            if a != i - 1:
+                a = i - 1
+                keep.append(a)
+                xa, ya = xs[a], ys[a]
+                dx = x - xa
+            low, high = -inf, inf
+            if dx <= 0:
+                a = i
+                keep.append(a)
+                xa, ya = x, y
+                continue
+        low = max(low, (y - tolerance - ya) / dx)
+        high = min(high, (y + tolerance - ya) / dx)
+    if a != n - 1:
+        keep.append(n - 1)
+    return keep
+
+
+def _axis_values(values, log):
+    if not log:
+        return values
+    nan = float("nan")
+    return array("d", (log10(v) if v > 0 else nan for v in values))
+
+
+def simplify_points(xs, ys, series, tolerance, x_log=False, y_log=False):
+    """Tolerance band simplification of every series but the clicked points.
+
+    On a Log10 axis the tolerance is in decades. Returns new (xs, ys,
+    series) arrays with the points kept, in their original order.
+    """
+    positions = {}  # Series -> indices of its points
+    for i, s in enumerate(series):
+        positions.setdefault(s, []).append(i)
+    keep = bytearray(len(xs))
+    for s, indices in positions.items():
+        if s == MANUAL_SERIES:
+            for i in indices:
+                keep[i] = 1
+            continue
+        sx = _axis_values(array("d", (xs[i] for i in indices)), x_log)
+        sy = _axis_values(array("d", (ys[i] for i in indices)), y_log)
+        for k in tolerance_band(sx, sy, tolerance):
+            keep[indices[k]] = 1
+    return (
+        array("d", compress(xs, keep)),
+        array("d", compress(ys, keep)),
+        array("i", compress(series, keep)),
+    )
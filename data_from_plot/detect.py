@@ -0,0 +1,128 @@
+"""Automatic detection of the plot area from the axis lines."""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the mask is built from bytes without it
+    np = None
+
+DARK_THRESHOLD = 128  # Colour channels below this count as dark
+MIN_LINE_FRACTION = 0.5  # Axis lines are at least this part of the longest line
+LINE_GAP = 3  # Pixels a line may miss a corner by and still meet it
+
+_RUN = re.compile(b"\x01+")
+
+
+def dark_mask(image, threshold=DARK_THRESHOLD):
+    """One byte per pixel, 1 where every colour channel is below `threshold`.
+
+    Transparent pixels never count as dark. Without NumPy, each channel
+    is a strided slice of the pixel buffer mapped to 0/1 with
+    bytes.translate, and the channels are combined with a single integer
+    AND.
+    """
+    channels = image.channels
+    # Greyscale+alpha and RGBA have the alpha in the last channel
+    has_alpha = channels in (2, 4)
+    if np is not None:
+        pixels = np.frombuffer(image.data, dtype=np.uint8).reshape(-1, channels)
+        n_colors = channels - 1 if has_alpha else channels
+        mask = (pixels[:, :n_colors] < threshold).all(axis=1)
+        if has_alpha:
+            mask &= pixels[:, -1] >= 128
+        return mask.view(np.uint8).tobytes()
+
+    dark = bytes(1 if v < threshold else 0 for v in range(256))
+    opaque = bytes(1 if v >= 128 else 0 for v in range(256))
+    bits = None
+    for c in range(channels):
+        table = opaque if has_alpha and c == channels - 1 else dark
+        plane = int.from_bytes(image.data[c::channels].translate(table))
+        bits = plane if bits is None else bits & plane
+    return bits.to_bytes(image.width * image.height)
+
+
+def _longest_run(line):
+    """(start, stop) of the longest run of set bytes in a 0/1 mask line."""
+    best = (0, 0)
+    for match in _RUN.finditer(line):
+        if match.end() - match.start() > best[1] - best[0]:
+            best = match.span()
+    return best
+
+
+def _find_lines(lines):
+    """Bands of neighbouring rows (or columns) holding a long straight line.
+
+    `lines` yields one 0/1 mask per row. The projection profile, the count
+    of dark pixels per row, only lets through rows that could hold a long
+    line; those are checked for the longest contiguous run. Returns
+    [(position, start, stop)] with the band centre and the run extent.
+    """
+    lines = list(lines)
+    profile = [line.count(1) for line in lines]
+    if not profile or not max(profile):
+        return []
+    candidates = {}
+    minimum = MIN_LINE_FRACTION * max(profile)
+    for i, count in enumerate(profile):
+        if count >= minimum:
+            candidates[i] = _longest_run(lines[i])
+    longest = max(stop - start for start, stop in candidates.values())
+    minimum = MIN_LINE_FRACTION * longest
+
+    bands = []
+    for i in sorted(candidates):
+        start, stop = candidates[i]
+        if stop - start < minimum:
+            continue
+        if bands and bands[-1][1] == i - 1:
+            # A thick line covers several neighbouring rows
+            band = bands[-1]
+            band[1] = i
+            band[2] = min(band[2], start)
+            band[3] = max(band[3], stop)
+        else:
+            bands.append([i, i, start, stop])
+    return [((first + last) / 2, start, stop) for first, last, start, stop in bands]
+
+
+def detect_plot_area(image, threshold=DARK_THRESHOLD):
+    """Propose a plot area (x0, y0, x1, y1) from the axis lines of an image.
+
+    The left axis is the leftmost long vertical line and the bottom axis
+    the lowest long horizontal line meeting it. The top and right edges
+    are the opposite frame lines of a boxed plot, or the ends of the axes
+    otherwise. The cost is linear in the number of pixels.
+    """
+    width, height = image.width, image.height
+    mask = dark_mask(image, threshold)
+    rows = _find_lines(mask[y * width : (y + 1) * width] for y in range(height))
+    columns = _find_lines(mask[x::width] for x in range(width))
+    if not rows or not columns:
+        raise ValueError("No axis lines found in the image")
+
+    x0, top, bottom = columns[0]
+    # Horizontal lines ending at the left axis, within its vertical extent
+    meeting = [
+        (y, start, stop)
+        for y, start, stop in rows
+        if start - LINE_GAP <= x0 < stop + LINE_GAP
+        and top - LINE_GAP <= y < bottom + LINE_GAP
+    ]
+    if not meeting:
+        raise ValueError("No horizontal axis line meets the vertical axis")
+    y1, left, right = meeting[-1]
+    y0 = meeting[0][0] if len(meeting) > 1 else top
+
+    # A right frame line spans the plot height within the bottom axis
+    frame = [
+        x
+        for x, start, stop in columns[1:]
+        if x < right + LINE_GAP and start - LINE_GAP <= y1 < stop + LINE_GAP
+    ]
+    x1 = frame[-1] if frame else right - 1
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError("The axis lines do not enclose an area")
+    return (x0, y0, x1, y1)
@@ -0,0 +1,147 @@
+"""Writing point columns to CSV and compact binary files.
+
+Columns are written in chunks so exports can report progress, and the
+writers only touch plain sequences so they are safe to run on a worker
+thread.
+
+Binary formats store all columns as float64, one row per point:
+
+- ``.npy``: NumPy's array format, a (points, columns) array written
+  without needing NumPy.
+- ``.f64``: the bare little-endian float64 values, row after row.
+
+Columns may differ in length, e.g. one column pair per series. Missing
+values are empty cells in CSV files and NaN in binary files.
+"""
+
+import csv
+import struct
+import sys
+from array import array
+from itertools import groupby, zip_longest
+
+CHUNK_SIZE = 1 << 16  # Points written per chunk
+
+BINARY_FORMATS = (".npy", ".f64")
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def _chunks(total):
+    for start in range(0, total, CHUNK_SIZE):
+        yield start, min(start + CHUNK_SIZE, total)
+
+
+def _rows(columns):
+    return max((len(column) for column in columns), default=0)
+
+
+def write_columns_csv(file_path, columns, headers, progress=None):
+    """Write columns to a CSV file with a header row."""
+    total = _rows(columns)
+    with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        for start, stop in _chunks(total):
+            chunk = [column[start:stop] for column in columns]
+            writer.writerows(zip_longest(*chunk, fillvalue=""))
+            _report(progress, stop, total)
+
+
+def _interleave(columns, start, stop):
+    """Rows start..stop-1 of the columns as little-endian float64 values."""
+    k = len(columns)
+    rows = array("d", bytes(8 * k * (stop - start)))
+    for c, column in enumerate(columns):
+        values = column[start:stop]
+        if not isinstance(values, array) or values.typecode != "d":
+            values = array("d", values)
+        if len(values) < stop - start:
+            values.extend([float("nan")] * (stop - start - len(values)))
+        rows[c::k] = values
+    if sys.byteorder == "big":
+        rows.byteswap()
+    return rows
+
+
+def _write_rows(f, columns, progress):
+    total = _rows(columns)
+    for start, stop in _chunks(total):
+        f.write(_interleave(columns, start, stop))
+        _report(progress, stop, total)
+
+
+def npy_header(n_rows, n_columns):
+    """Header of a version 1.0 .npy file holding a little-endian float64 array."""
+    header = (
+        f"{{'descr': '<f8', 'fortran_order': False, "
+        f"'shape': ({n_rows}, {n_columns}), }}"
+    )
+    # Magic, version and length take 10 bytes; pad the total to 64 bytes
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header
+
+
+def write_npy(file_path, columns, progress=None):
+    total = _rows(columns)
+    with open(file_path, "wb") as f:
+        f.write(npy_header(total, len(columns)))
+        _write_rows(f, columns, progress)
+
+
+def write_f64(file_path, columns, progress=None):
+    with open(file_path, "wb") as f:
+        _write_rows(f, columns, progress)
+
+
+def write_columns(file_path, columns, headers, progress=None):
+    """Write columns in the format given by the file extension.
+
+    `progress(done, total)` is called after every chunk.
+    """
+    lower = file_path.lower()
+    if lower.endswith(".npy"):
+        write_npy(file_path, columns, progress)
+    elif lower.endswith(".f64"):
+        write_f64(file_path, columns, progress)
+    else:
+        write_columns_csv(file_path, columns, headers, progress)
+
+
+def point_columns(
+    xs, ys, series, x_header, y_header, split_series=True, series_column=False
+):
+    """Columns and headers to export points with.
+
+    With `split_series` and more than one series, every series becomes a
+    column pair with the series number as header suffix, e.g. "x_2" and
+    "y_2". Otherwise there is one pair, after a series column if
+    `series_column` is set.
+    """
+    if not (split_series and len(set(series)) > 1):
+        if series_column:
+            return [series, xs, ys], ["series", x_header, y_header]
+        return [xs, ys], [x_header, y_header]
+    pairs = {}
+    start = 0
+    for s, group in groupby(series):
+        stop = start + sum(1 for _ in group)
+        sx, sy = pairs.setdefault(s, (array("d"), array("d")))
+        sx.extend(xs[start:stop])
+        sy.extend(ys[start:stop])
+        start = stop
+    columns = []
+    headers = []
+    for s, (sx, sy) in pairs.items():
+        columns += [sx, sy]
+        headers += [f"{x_header}_{s}", f"{y_header}_{s}"]
+    return columns, headers
+
+
+def write_csv(file_path, xs, ys, x_header="x", y_header="y"):
+    """Write a pair of data columns to a CSV file with a header row."""
+    write_columns_csv(file_path, [xs, ys], [x_header or "x", y_header or "y"])
@@ -0,0 +1,213 @@
+"""Automatic extraction of curves from decoded plot images."""
+
+import sys
+from array import array
+from collections import Counter
+
+MAX_SERIES = 8  # Colours separated at most by extract_series
+MIN_CHROMA = 64  # Max minus min channel below this is grey: axes, grid, text
+MERGE_DISTANCE = 40  # RGB distance within which colours belong to one curve
+
+# Quantize a channel to its high nibble, in the low or the high half of a byte
+_LOW_NIBBLE = bytes(v >> 4 for v in range(256))
+_HIGH_NIBBLE = bytes(v & 0xF0 for v in range(256))
+
+
+def _match_table(value, tolerance):
+    """Translation table mapping a channel byte to 1 if it matches, else 0."""
+    return bytes(1 if abs(v - value) <= tolerance else 0 for v in range(256))
+
+
+def _median_position(mask, count, start=0, stop=None):
+    """Offset of the median set byte in mask[start:stop], with `count` set bytes."""
+    k = count // 2
+    # Bisect on prefix counts so dense columns stay in C-level byte scans
+    lo, hi = start, (len(mask) if stop is None else stop) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mask.count(1, start, mid + 1) > k:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo - start
+
+
+def extract_curve(image, plot_area, color, tolerance=40):
+    """Find the pixels of one curve inside the plot area by colour.
+
+    A pixel matches when every RGB channel is within `tolerance` of
+    `color`. Each column is collapsed to the median row of its matching
+    pixels. Returns the pixel coordinates as two lists (Xs, Ys).
+
+    The scan works on whole columns at once: every channel of a column is
+    a strided slice of the pixel buffer, mapped to a 0/1 match mask with
+    bytes.translate and combined with integer ANDs.
+    """
+    x0, y0, x1, y1 = _clip_area(image, plot_area)
+    if x1 < x0 or y1 < y0:
+        return [], []
+    channels = image.channels
+    row_stride = image.width * channels
+    data = image.data
+    n_rows = y1 - y0 + 1
+
+    # Greyscale images only have one colour channel to compare
+    n_colors = 3 if channels >= 3 else 1
+    tables = [_match_table(color[c], tolerance) for c in range(n_colors)]
+
+    Xs = []
+    Ys = []
+    for X in range(x0, x1 + 1):
+        start = y0 * row_stride + X * channels
+        stop = start + (n_rows - 1) * row_stride + 1
+        mask = data[start:stop:row_stride].translate(tables[0])
+        if n_colors > 1:
+            if not mask.count(1):
+                continue
+            bits = int.from_bytes(mask)
+            for c in range(1, n_colors):
+                column = data[start + c : stop + c : row_stride]
+                bits &= int.from_bytes(column.translate(tables[c]))
+            mask = bits.to_bytes(n_rows)
+        count = mask.count(1)
+        if count:
+            Xs.append(X)
+            Ys.append(y0 + _median_position(mask, count))
+    return Xs, Ys
+
+
+def _clip_area(image, plot_area):
+    x0, y0, x1, y1 = (int(round(v)) for v in plot_area)
+    x0, y0 = max(x0, 0), max(y0, 0)
+    x1, y1 = min(x1, image.width - 1), min(y1, image.height - 1)
+    return x0, y0, x1, y1
+
+
+def _column_planes(image, x0, y0, x1, y1):
+    """The RGB planes of an area in column-major order, one bytes per channel.
+
+    With every pixel column contiguous, the per-series scans below become
+    single byte operations over whole planes.
+    """
+    channels = image.channels
+    row_stride = image.width * channels
+    data = image.data
+    planes = []
+    for c in range(3):
+        first = y0 * row_stride + c
+        last = y1 * row_stride + c + 1
+        columns = (
+            data[first + X * channels : last + X * channels : row_stride]
+            for X in range(x0, x1 + 1)
+        )
+        planes.append(b"".join(columns))
+    return planes
+
+
+def _color_histogram(planes):
+    """Counter of the colours of all pixels, quantized to 4 bits per channel.
+
+    The 12-bit codes are assembled from translated planes as little-endian
+    uint16 values, so the only per-pixel Python-level work is the count.
+    """
+    n = len(planes[0])
+    high = planes[0].translate(_LOW_NIBBLE)
+    low = int.from_bytes(planes[1].translate(_HIGH_NIBBLE)) | int.from_bytes(
+        planes[2].translate(_LOW_NIBBLE)
+    )
+    interleaved = bytearray(2 * n)
+    interleaved[0::2] = low.to_bytes(n)
+    interleaved[1::2] = high
+    codes = array("H")
+    codes.frombytes(interleaved)
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return Counter(codes)
+
+
+def _bin_color(code):
+    """Centre colour of a quantized histogram bin."""
+    return ((code >> 8) * 16 + 8, (code >> 4 & 15) * 16 + 8, (code & 15) * 16 + 8)
+
+
+def _segment_distance(p, a, b):
+    """Distance of colour p from the line segment between colours a and b."""
+    ab = [bc - ac for ac, bc in zip(a, b)]
+    ap = [pc - ac for ac, pc in zip(a, p)]
+    length = sum(v * v for v in ab)
+    t = 0.0
+    if length:
+        t = min(1.0, max(0.0, sum(u * v for u, v in zip(ap, ab)) / length))
+    return sum((v - t * u) ** 2 for u, v in zip(ab, ap)) ** 0.5
+
+
+def _cluster_colors(histogram, max_colors, min_pixels):
+    """Dominant non-background colours of a histogram, most frequent first.
+
+    The most frequent bin is the background, and grey bins are axes, grid
+    lines and text. Every other bin, from frequent to rare, joins the
+    first cluster it lies close to, counting blends towards the background
+    (anti-aliased curve edges), or starts a new cluster.
+    """
+    ranked = histogram.most_common()
+    background = _bin_color(ranked[0][0])
+    clusters = []  # [colour, pixel count]
+    for code, count in ranked[1:]:
+        color = _bin_color(code)
+        if max(color) - min(color) < MIN_CHROMA:
+            continue
+        for cluster in clusters:
+            if _segment_distance(color, cluster[0], background) <= MERGE_DISTANCE:
+                cluster[1] += count
+                break
+        else:
+            clusters.append([color, count])
+    clusters = [cluster for cluster in clusters if cluster[1] >= min_pixels]
+    clusters.sort(key=lambda cluster: cluster[1], reverse=True)
+    return [cluster[0] for cluster in clusters[:max_colors]]
+
+
+def extract_series(image, plot_area, colors=None, tolerance=40, max_colors=MAX_SERIES):
+    """Find several curves inside the plot area, one per colour.
+
+    Without `colors`, the dominant colours are found from a histogram of
+    the plot area; grey and black curves are not told apart from the axes
+    and are left out. Colours count as curves if they cover at least a
+    quarter of the plot width. Returns a list of (color, Xs, Ys) with the
+    pixels of each curve reduced as in `extract_curve`.
+
+    The plot area is read once into column-major planes. The histogram and
+    the match mask of every colour are computed on whole planes, after
+    which every curve only needs a count per pixel column.
+    """
+    if image.channels < 3:
+        raise ValueError("Separating curves by colour needs a colour image")
+    x0, y0, x1, y1 = _clip_area(image, plot_area)
+    if x1 < x0 or y1 < y0:
+        return []
+    n_rows = y1 - y0 + 1
+    n_columns = x1 - x0 + 1
+    planes = _column_planes(image, x0, y0, x1, y1)
+    if colors is None:
+        colors = _cluster_colors(
+            _color_histogram(planes), max_colors, max(1, n_columns // 4)
+        )
+
+    series = []
+    for color in colors:
+        # Split off this colour's pixels as a 0/1 mask over the planes
+        tables = [_match_table(color[c], tolerance) for c in range(3)]
+        bits = int.from_bytes(planes[0].translate(tables[0]))
+        for c in (1, 2):
+            bits &= int.from_bytes(planes[c].translate(tables[c]))
+        mask = bits.to_bytes(n_rows * n_columns)
+        Xs = []
+        Ys = []
+        for k in range(n_columns):
+            start = k * n_rows
+            count = mask.count(1, start, start + n_rows)
+            if count:
+                Xs.append(x0 + k)
+                Ys.append(y0 + _median_position(mask, count, start, start + n_rows))
+        series.append((tuple(color), Xs, Ys))
+    return series
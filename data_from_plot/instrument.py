@@ -0,0 +1,177 @@
+"""Lightweight performance instrumentation.
+
+Timing spans are aggregated into histograms, and counters count events
+such as rendered tiles. Everything is off by default: a disabled span is
+one attribute check returning a shared do-nothing context manager, so
+the spans can stay in the code paths for good.
+
+Spans may end on worker threads, so recording takes a lock.
+"""
+
+import cProfile
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bounds of the histogram buckets in milliseconds, plus an overflow
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Distribution of durations in fixed logarithmic buckets."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+
+    def add(self, ms):
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        self.last = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile."""
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self):
+        labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "total_ms": self.total,
+            "mean_ms": self.total / self.count if self.count else None,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Counters and duration histograms, collected while enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = Counter()
+            self.histograms = {}
+
+    def span(self, name):
+        """Context manager timing its block into the histogram `name`."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def start(self):
+        """Start time for a span that ends elsewhere, or None while disabled."""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name, start):
+        """End a span begun with start()."""
+        if start is not None:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds * 1000)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += n
+
+    def summary(self):
+        """One line with the latest and 95th percentile time of every span."""
+        with self.lock:
+            parts = [
+                f"{name} {h.last:.1f} ms (p95 {h.percentile(95):g})"
+                for name, h in sorted(self.histograms.items())
+            ]
+        return " | ".join(parts)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: h.to_dict() for name, h in sorted(self.histograms.items())
+                },
+            }
+
+    def dump(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class SessionProfiler:
+    """cProfile of everything the calling thread runs until stopped."""
+
+    def __init__(self):
+        self.profile = None
+
+    @property
+    def running(self):
+        return self.profile is not None
+
+    def start(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, file_path=None):
+        """Stop profiling and write the statistics as a .prof file."""
+        profile, self.profile = self.profile, None
+        profile.disable()
+        if file_path:
+            profile.dump_stats(file_path)
+
+
+metrics = Metrics()  # Shared by all modules of the app
@@ -0,0 +1,221 @@
+"""Canvas layer drawing the collected points."""
+
+from itertools import groupby
+
+from .decimate import lttb
+from .instrument import metrics
+from .points import MANUAL_SERIES
+from .spatial import PointIndex
+
+# Labels and curve dots are only drawn with at most this many points in view
+LABEL_LIMIT = 200
+MAX_VERTICES = 2000  # Dense runs longer than this are thinned out with LTTB
+
+
+class MarkerLayer:
+    """Draw points on the canvas, staying responsive with many points.
+
+    Every item carries the "marker" tag, so clearing or hiding all points
+    is a single canvas call. Clicked points are drawn as individual
+    markers. Dense runs, such as automatically extracted curves, are one
+    polyline, thinned out to `max_vertices` points with LTTB and to a
+    vertex per canvas pixel. Number labels, and dots on dense runs, are
+    only drawn when few points are in view.
+    """
+
+    def __init__(self, canvas, points, index=None):
+        self.canvas = canvas
+        self.points = points  # PointStore shared with the app
+        # Grid of the points, may be shared with the app's hit-testing
+        self.index = index or PointIndex(points)
+        self.view = None
+        self.radius = 8
+        self.runs = []  # [start, stop, dense] slices of the point store
+        self.hidden = False
+        self.drawn_zoom = None
+        self.max_vertices = MAX_VERTICES  # 0 draws every point
+
+    def attach(self, view, radius):
+        """Draw on a new image view with markers of the given radius."""
+        self.view = view
+        self.radius = radius
+        self.drawn_zoom = None  # Redraw on the first view change
+
+    def add_points(self, start, stop):
+        """Draw points start..stop-1, which were just appended.
+
+        Points of the manual series are markers, any other series is dense.
+        """
+        if stop <= start:
+            return
+        dense = self.points.series[start] != MANUAL_SERIES
+        last = self.runs[-1] if self.runs else None
+        if last is not None and not dense and not last[2] and last[1] == start:
+            last[1] = stop  # Extend the current run of clicked points
+        else:
+            self.runs.append([start, stop, dense])
+        if dense:
+            self._draw_polyline(start, stop)
+        else:
+            for i in range(start, stop):
+                self._draw_point(i)
+        self.update_labels()
+
+    def insert_points(self, start, stop):
+        """Draw points start..stop-1, which were inserted before others.
+
+        Only inserts between runs are drawn incrementally; inserting into
+        the middle of a run redraws everything.
+        """
+        n = stop - start
+        for k, run in enumerate(self.runs):
+            if run[0] < start < run[1]:
+                self.redraw()
+                return
+            if run[0] >= start:
+                break
+        else:
+            self.add_points(start, stop)
+            return
+        for run in self.runs[k:]:
+            run[0] += n
+            run[1] += n
+        dense = self.points.series[start] != MANUAL_SERIES
+        self.runs.insert(k, [start, stop, dense])
+        if dense:
+            self._draw_polyline(start, stop)
+        else:
+            for i in range(start, stop):
+                self._draw_point(i)
+        self.update_labels()
+
+    def clear(self):
+        self.canvas.delete("marker")
+        self.runs.clear()
+
+    def set_hidden(self, hidden):
+        self.hidden = hidden
+        self.canvas.itemconfigure("marker", state="hidden" if hidden else "normal")
+
+    def redraw(self):
+        """Draw all points again, after zooming or editing the point store."""
+        with metrics.span("draw_markers"):
+            self._redraw()
+
+    def _redraw(self):
+        self.canvas.delete("marker")
+        self.drawn_zoom = self.view.zoom
+        self.runs = []
+        start = 0
+        for series, group in groupby(self.points.series):
+            stop = start + sum(1 for _ in group)
+            self.runs.append([start, stop, series != MANUAL_SERIES])
+            start = stop
+        for start, stop, dense in self.runs:
+            if dense:
+                self._draw_polyline(start, stop)
+            else:
+                for i in range(start, stop):
+                    self._draw_point(i)
+        self.update_labels()
+
+    def on_view_change(self):
+        """Follow zooming and panning of the image view."""
+        if self.view.zoom != self.drawn_zoom:
+            self.redraw()
+        else:
+            self.update_labels()
+
+    def _state(self):
+        return "hidden" if self.hidden else "normal"
+
+    def _draw_point(self, i):
+        x, y = self.view.image_to_canvas(self.points.Xs[i], self.points.Ys[i])
+        r = self.radius
+        self.canvas.create_oval(
+            x - r,
+            y - r,
+            x + r,
+            y + r,
+            fill="red",
+            outline="black",
+            width=2,
+            state=self._state(),
+            tags=("marker", "marker_point"),
+        )
+
+    def _draw_polyline(self, start, stop):
+        zoom = self.view.zoom
+        Xs = self.points.Xs[start:stop]
+        Ys = self.points.Ys[start:stop]
+        if 0 < self.max_vertices < len(Xs):
+            # Pixel coordinates are linear on log axes too
+            indices = lttb(Xs, Ys, self.max_vertices)
+            Xs = [Xs[i] for i in indices]
+            Ys = [Ys[i] for i in indices]
+        coords = []
+        last = None
+        for X, Y in zip(Xs, Ys):
+            pixel = (int(X * zoom), int(Y * zoom))
+            if pixel != last:  # Skip vertices on the same canvas pixel
+                coords.extend(pixel)
+                last = pixel
+        if len(coords) == 2:
+            coords.extend(coords)  # A line needs two vertices
+        self.canvas.create_line(
+            *coords,
+            fill="red",
+            width=2,
+            state=self._state(),
+            tags=("marker", "marker_curve"),
+        )
+
+    def _visible_points(self):
+        """Indices of the points inside the visible part of the canvas.
+
+        None if there are more than LABEL_LIMIT of them.
+        """
+        canvas = self.canvas
+        zoom = self.view.zoom
+        left = canvas.canvasx(0) / zoom
+        top = canvas.canvasy(0) / zoom
+        right = left + max(canvas.winfo_width(), self.view.display_width) / zoom
+        bottom = top + max(canvas.winfo_height(), self.view.display_height) / zoom
+        indices = self.index.in_box(left, top, right, bottom, limit=LABEL_LIMIT)
+        if indices is None:
+            return None
+        series = self.points.series
+        return [(i, series[i] != MANUAL_SERIES) for i in indices]
+
+    def update_labels(self):
+        """Label the visible points when there are few enough of them."""
+        self.canvas.delete("marker_label")
+        visible = self._visible_points()
+        if not visible:
+            return
+        r = self.radius
+        font = ("Arial", max(10, r), "bold")
+        for i, dense in visible:
+            x, y = self.view.image_to_canvas(self.points.Xs[i], self.points.Ys[i])
+            if dense:
+                # Dots show the individual points of a zoomed-in curve
+                self.canvas.create_oval(
+                    x - 3,
+                    y - 3,
+                    x + 3,
+                    y + 3,
+                    fill="red",
+                    outline="black",
+                    state=self._state(),
+                    tags=("marker", "marker_label"),
+                )
+            # Point number, offset scaled with radius
+            self.canvas.create_text(
+                x + r * 2,
+                y - r * 2,
+                text=str(i + 1),
+                fill="red",
+                font=font,
+                state=self._state(),
+                tags=("marker", "marker_label"),
+            )
@@ -0,0 +1,460 @@
+"""Minimal PNG decoder and encoder using only the standard library.
+
+Tkinter's PhotoImage needs a running display, so the headless code paths
+decode images with this module instead. write_png() streams rows into a
+PNG file, e.g. for generated test images.
+
+IDAT chunks are streamed through a zlib decompressor and unfiltered one
+scanline at a time, so PNGReader.rows() can walk huge scans while only
+holding two scanlines in memory. read_png() collects the rows into one
+bytearray, exposed as a memoryview for zero-copy row slicing.
+"""
+
+import re
+import struct
+import zlib
+from collections import namedtuple
+from itertools import accumulate, repeat
+from operator import add, rshift, sub
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Samples per pixel for each PNG colour type
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}  # Colour type written per channel count
+
+# Bytes read from the file per zlib feed
+READ_SIZE = 1 << 16
+# Average and Paeth rows with changes in more than 1/DENSE_CHANGES of their
+# samples are unfiltered sample by sample instead of run by run
+DENSE_CHANGES = 4
+
+_low_byte = (255).__and__
+_NONZERO = re.compile(b"[^\x00]")
+
+
+class PNGImage(namedtuple("PNGImage", ["width", "height", "channels", "data"])):
+    """Decoded image with 8-bit samples stored row-major in `data`."""
+
+    __slots__ = ()
+
+    @property
+    def stride(self):
+        return self.width * self.channels
+
+    @property
+    def pixels(self):
+        """Zero-copy view of the pixel buffer."""
+        return memoryview(self.data)
+
+    def row(self, y):
+        """Zero-copy view of row `y`."""
+        stride = self.stride
+        return memoryview(self.data)[y * stride : (y + 1) * stride]
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def _unfilter(filter_type, line, prev, bpp):
+    """Undo the PNG filter of one scanline in place."""
+    if filter_type == 0:
+        return
+    n = len(line)
+    if filter_type == 1:
+        # Running sum per byte of the pixel, all done in C
+        for c in range(bpp):
+            line[c::bpp] = bytes(map(_low_byte, accumulate(line[c::bpp])))
+    elif filter_type == 2:
+        # Bytewise add without carries between bytes, on whole-row integers
+        a = int.from_bytes(line)
+        b = int.from_bytes(prev)
+        high = int.from_bytes(b"\x80" * n)
+        low = high ^ int.from_bytes(b"\xff" * n)
+        line[:] = (((a & low) + (b & low)) ^ ((a ^ b) & high)).to_bytes(n)
+    elif filter_type == 3:
+        for c in range(bpp):
+            line[c::bpp] = _unfilter_average(line[c::bpp], prev[c::bpp])
+    elif filter_type == 4:
+        _unfilter_paeth(line, prev, bpp)
+    else:
+        raise ValueError(f"Unknown PNG filter type: {filter_type}")
+
+
+def _changes(raw, up, bpp=1):
+    """Offsets where raw is non-zero or up differs from bpp bytes before.
+
+    Found with whole-row integer operations and a regex scan, so flat
+    parts of an image cost nothing here. Returns None for rows with too
+    many changes to be worth listing.
+    """
+    n = len(up)
+    left = int.from_bytes(up[:-bpp]) if n > bpp else 0
+    mask = (int.from_bytes(raw) | (int.from_bytes(up) ^ left)).to_bytes(n)
+    if (n - mask.count(0)) * DENSE_CHANGES > n:
+        return None
+    return [m.start() for m in _NONZERO.finditer(mask)]
+
+
+def _unfilter_average(raw, up):
+    """Undo the Average filter on the samples of one channel.
+
+    Between changes the row above is constant and nothing is added, so
+    the output halves its distance to that constant every sample and is
+    settled after at most eight; the settled value is filled in C.
+    """
+    n = len(raw)
+    out = bytearray(n)
+    left = 0
+    changes = _changes(raw, up)
+    if changes is None:
+        # Noisy rows, e.g. of scans: one sample at a time is all there is
+        for k, (r, u) in enumerate(zip(raw, up)):
+            left = (r + ((left + u) >> 1)) & 0xFF
+            out[k] = left
+        return out
+    pos = 0
+    for k in changes + [n]:
+        while pos < k:
+            value = (left + up[pos]) >> 1
+            out[pos] = value
+            pos += 1
+            if value == left:
+                out[pos:k] = bytes((value,)) * (k - pos)
+                pos = k
+            left = value
+        if k == n:
+            break
+        left = (raw[k] + ((left + up[k]) >> 1)) & 0xFF
+        out[k] = left
+        pos = k + 1
+    return out
+
+
+def _unfilter_paeth(line, prev, bpp):
+    """Undo the Paeth filter of one scanline in place.
+
+    Where the row above doesn't change, Paeth predicts the pixel to the
+    left, so where nothing is added either the row repeats its last
+    pixel: those runs are filled in C, only changes are computed.
+    """
+    n = len(line)
+    changes = _changes(line, prev, bpp)
+    if changes is None:
+        for c in range(bpp):
+            line[c::bpp] = _unfilter_paeth_samples(line[c::bpp], prev[c::bpp])
+        return
+    pos = 0
+    for k in changes + [n]:
+        # Unchanged samples of the first pixel stay 0
+        start = max(pos, bpp)
+        if k > start:
+            pixel = line[start - bpp : start]
+            line[start:k] = (pixel * ((k - start) // bpp + 1))[: k - start]
+        if k == n:
+            break
+        if k >= bpp:
+            left = line[k - bpp]
+            predictor = _paeth(left, prev[k], prev[k - bpp])
+        else:
+            predictor = prev[k]
+        line[k] = (line[k] + predictor) & 0xFF
+        pos = k + 1
+
+
+def _unfilter_paeth_samples(raw, up):
+    """Undo the Paeth filter on the samples of one channel, one by one."""
+    out = bytearray(len(raw))
+    left = up_left = 0
+    for k, (r, b) in enumerate(zip(raw, up)):
+        # _paeth inlined, with p - a = b - c and so on
+        pa = abs(b - up_left)
+        pb = abs(left - up_left)
+        pc = abs(left + b - up_left - up_left)
+        if pa <= pb and pa <= pc:
+            left = (r + left) & 0xFF
+        elif pb <= pc:
+            left = (r + b) & 0xFF
+        else:
+            left = (r + up_left) & 0xFF
+        out[k] = left
+        up_left = b
+    return out
+
+
+def _filter(filter_type, line, prev, bpp):
+    """Apply a PNG filter to one scanline, the inverse of _unfilter."""
+    if filter_type == 0:
+        return bytes(line)
+    left = bytes(bpp) + line[:-bpp]
+    if filter_type == 1:
+        predictor = left
+    elif filter_type == 2:
+        predictor = prev
+    elif filter_type == 3:
+        predictor = map(rshift, map(add, left, prev), repeat(1))
+    elif filter_type == 4:
+        up_left = bytes(bpp) + prev[:-bpp]
+        # Only where the row above changes does Paeth differ from Sub
+        predictor = bytearray(left)
+        steep = int.from_bytes(prev) ^ int.from_bytes(up_left)
+        for match in _NONZERO.finditer(steep.to_bytes(len(line))):
+            i = match.start()
+            predictor[i] = _paeth(left[i], prev[i], up_left[i])
+    else:
+        raise ValueError(f"Unknown PNG filter type: {filter_type}")
+    return bytes(map(_low_byte, map(sub, line, predictor)))
+
+
+def _unpack_samples(line, bit_depth, count):
+    """Expand 1/2/4-bit packed samples to one byte per sample."""
+    mask = (1 << bit_depth) - 1
+    per_byte = 8 // bit_depth
+    out = bytearray(count)
+    for i in range(count):
+        byte = line[i // per_byte]
+        shift = 8 - bit_depth * (i % per_byte + 1)
+        out[i] = (byte >> shift) & mask
+    return out
+
+
+class PNGReader:
+    """Streaming PNG decoder.
+
+    Opening the reader parses the header chunks only; pixel data is
+    decoded lazily by rows(). Use as a context manager to close the file.
+    """
+
+    def __init__(self, file_path):
+        # Also takes an open binary file, e.g. an io.BytesIO of an upload
+        self.file = file_path if hasattr(file_path, "read") else open(file_path, "rb")
+        try:
+            self._read_header()
+        except Exception:
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def _read_chunk_header(self):
+        header = self.file.read(8)
+        if len(header) < 8:
+            raise ValueError("Truncated PNG file")
+        return struct.unpack(">I4s", header)
+
+    def _read_header(self):
+        if self.file.read(8) != PNG_SIGNATURE:
+            # In-memory uploads have no name to report
+            name = getattr(self.file, "name", None)
+            raise ValueError(f"Not a PNG file: {name}" if name else "Not a PNG file")
+        palette = None
+        transparency = None
+        ihdr = None
+        while True:
+            length, chunk_type = self._read_chunk_header()
+            if chunk_type == b"IDAT":
+                # Leave the file positioned on the first image data chunk
+                self._idat_length = length
+                break
+            if chunk_type == b"IEND":
+                raise ValueError("PNG file has no image data")
+            chunk = self.file.read(length)
+            self.file.read(4)  # CRC
+            if chunk_type == b"IHDR":
+                ihdr = chunk
+            elif chunk_type == b"PLTE":
+                palette = chunk
+            elif chunk_type == b"tRNS":
+                transparency = chunk
+
+        if ihdr is None:
+            raise ValueError("PNG file has no IHDR chunk")
+        if len(ihdr) != 13:
+            raise ValueError("Truncated PNG IHDR chunk")
+        (
+            self.width,
+            self.height,
+            self.bit_depth,
+            self.color_type,
+            _,
+            _,
+            interlace,
+        ) = struct.unpack(">IIBBBBB", ihdr)
+        if interlace:
+            raise ValueError("Interlaced PNG files are not supported")
+        if self.color_type not in CHANNELS:
+            raise ValueError(f"Unsupported PNG colour type: {self.color_type}")
+
+        samples = CHANNELS[self.color_type]
+        bits_per_pixel = samples * self.bit_depth
+        self._samples = samples
+        self._bpp = max(1, bits_per_pixel // 8)
+        self._stride = (self.width * bits_per_pixel + 7) // 8
+
+        self._palette_tables = None
+        if self.color_type == 3:
+            if palette is None:
+                raise ValueError("Palette PNG without a PLTE chunk")
+            # One 256-entry translation table per output channel
+            entries = len(palette) // 3
+            tables = [
+                bytes(palette[3 * i + c] if i < entries else 0 for i in range(256))
+                for c in range(3)
+            ]
+            if transparency:
+                tables.append(
+                    bytes(
+                        transparency[i] if i < len(transparency) else 255
+                        for i in range(256)
+                    )
+                )
+            self._palette_tables = tables
+            self.channels = len(tables)
+        else:
+            self.channels = samples
+
+    def _idat_data(self):
+        """Yield the compressed image data, one file read at a time."""
+        length = self._idat_length
+        while True:
+            while length:
+                block = self.file.read(min(length, READ_SIZE))
+                if not block:
+                    raise ValueError("Truncated PNG file")
+                length -= len(block)
+                yield block
+            self.file.read(4)  # CRC
+            length, chunk_type = self._read_chunk_header()
+            if chunk_type != b"IDAT":
+                return
+
+    def _scanlines(self):
+        """Yield (filter_type, raw scanline) pairs as they decompress."""
+        decompressor = zlib.decompressobj()
+        pending = bytearray()
+        size = self._stride + 1
+        # Cap the output per zlib call so highly compressed scans never
+        # inflate far beyond a few scanlines at once
+        limit = max(size * 8, READ_SIZE)
+        remaining = self.height
+        try:
+            for block in self._idat_data():
+                while block and remaining:
+                    pending += decompressor.decompress(block, limit)
+                    block = decompressor.unconsumed_tail
+                    while remaining and len(pending) >= size:
+                        yield pending[0], pending[1:size]
+                        del pending[:size]  # Amortized O(1) for bytearrays
+                        remaining -= 1
+                if not remaining:
+                    return
+            pending += decompressor.flush()
+        except zlib.error as e:
+            raise ValueError(f"Corrupt PNG image data: {e}") from None
+        while remaining and len(pending) >= size:
+            yield pending[0], pending[1:size]
+            del pending[:size]
+            remaining -= 1
+        if remaining:
+            raise ValueError("Truncated PNG image data")
+
+    def _expand(self, line):
+        """Convert an unfiltered scanline to 8-bit samples per channel."""
+        bit_depth = self.bit_depth
+        if bit_depth == 16:
+            # Keep the most significant byte of every sample
+            line = line[0::2]
+        elif bit_depth < 8:
+            line = _unpack_samples(line, bit_depth, self.width * self._samples)
+            if self.color_type != 3:
+                # Scale low bit depth greyscale to the full 0-255 range
+                scale = 255 // ((1 << bit_depth) - 1)
+                line = bytes(v * scale for v in line)
+        if self._palette_tables is not None:
+            channels = self.channels
+            out = bytearray(self.width * channels)
+            for c, table in enumerate(self._palette_tables):
+                out[c::channels] = line.translate(table)
+            return out
+        return line
+
+    def rows(self):
+        """Yield each decoded row as a memoryview of 8-bit samples."""
+        prev = bytearray(self._stride)
+        bpp = self._bpp
+        for filter_type, line in self._scanlines():
+            _unfilter(filter_type, line, prev, bpp)
+            yield memoryview(self._expand(line))
+            prev = line
+
+
+def read_png(file_path):
+    """Decode a PNG file, given by path or as a binary file, to 8-bit samples.
+
+    Palette images are expanded to RGB (or RGBA when they carry a tRNS
+    chunk). Returns a PNGImage whose rows are written straight into a
+    single preallocated bytearray.
+    """
+    with PNGReader(file_path) as reader:
+        stride = reader.width * reader.channels
+        data = bytearray(stride * reader.height)
+        out = 0
+        for row in reader.rows():
+            data[out : out + stride] = row
+            out += stride
+        return PNGImage(reader.width, reader.height, reader.channels, data)
+
+
+def _write_chunk(f, chunk_type, data):
+    f.write(struct.pack(">I", len(data)))
+    f.write(chunk_type)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def write_png(file_path, width, height, rows, channels=3, level=6, filter_type=0):
+    """Write 8-bit rows to a PNG file, every row with the same filter.
+
+    `rows` yields `height` rows of width * channels bytes each. Rows are
+    compressed as they arrive, so the image never has to be in memory.
+    """
+    with open(file_path, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        header = struct.pack(
+            ">IIBBBBB", width, height, 8, COLOR_TYPES[channels], 0, 0, 0
+        )
+        _write_chunk(f, b"IHDR", header)
+        compressor = zlib.compressobj(level)
+        pending = bytearray()
+        written = 0
+        prev = bytes(width * channels)
+        for row in rows:
+            row = bytes(row)
+            line = _filter(filter_type, row, prev, channels)
+            prev = row
+            pending += compressor.compress(bytes((filter_type,)) + line)
+            if len(pending) >= READ_SIZE:
+                _write_chunk(f, b"IDAT", bytes(pending))
+                pending.clear()
+            written += 1
+        if written != height:
+            raise ValueError(f"Expected {height} rows, got {written}")
+        pending += compressor.flush()
+        _write_chunk(f, b"IDAT", bytes(pending))
+        _write_chunk(f, b"IEND", b"")
@@ -0,0 +1,228 @@
+"""Compact storage for the collected points."""
+
+from array import array
+
+MANUAL_SERIES = 0  # Series id of points clicked by hand
+
+
+class PointStore:
+    """Points in parallel array('d') columns with undo and redo.
+
+    Each point has image pixel coordinates (Xs, Ys), data coordinates
+    (xs, ys) and a series id. Edits are recorded in an operation log that
+    only keeps the points an operation added or removed, never a copy of
+    the whole columns.
+
+    Listeners are called after every change to the points, including
+    undo and redo, with one of ("insert", start, stop), ("remove", start,
+    stop), ("move", index, new_index), ("set", index) or ("reset",).
+    """
+
+    def __init__(self):
+        self._set_columns(self._empty_columns())
+        self.next_series = MANUAL_SERIES + 1
+        self.undo_log = []
+        self.redo_log = []
+        self.listeners = []
+
+    @staticmethod
+    def _empty_columns():
+        return (array("d"), array("d"), array("d"), array("d"), array("i"))
+
+    def _set_columns(self, columns):
+        self.Xs, self.Ys, self.xs, self.ys, self.series = columns
+
+    def _columns(self):
+        return (self.Xs, self.Ys, self.xs, self.ys, self.series)
+
+    def __len__(self):
+        return len(self.Xs)
+
+    def _notify(self, *event):
+        for listener in self.listeners:
+            listener(*event)
+
+    def new_series(self):
+        """Reserve an id for a new series, e.g. an extracted curve."""
+        series = self.next_series
+        self.next_series += 1
+        return series
+
+    def append(self, X, Y, x, y, series=MANUAL_SERIES):
+        """Add one point at the end and return its index."""
+        index = len(self.Xs)
+        for column, value in zip(self._columns(), (X, Y, x, y, series)):
+            column.append(value)
+        self._log(("insert", index, index + 1, None))
+        self._notify("insert", index, index + 1)
+        return index
+
+    def extend(self, Xs, Ys, xs, ys, series=MANUAL_SERIES):
+        """Add many points at the end. Returns their (start, stop) range."""
+        start = len(self.Xs)
+        self.Xs.extend(Xs)
+        self.Ys.extend(Ys)
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        self.series.extend(array("i", [series]) * (len(self.Xs) - start))
+        self._log(("insert", start, len(self.Xs), None))
+        self._notify("insert", start, len(self.Xs))
+        return start, len(self.Xs)
+
+    def insert(self, start, Xs, Ys, xs, ys, series):
+        """Insert points before index `start`; `series` has one id per point."""
+        if not 0 <= start <= len(self.Xs):
+            raise IndexError("Point index out of range")
+        columns = (
+            array("d", Xs),
+            array("d", Ys),
+            array("d", xs),
+            array("d", ys),
+            array("i", series),
+        )
+        self._insert(start, columns)
+        stop = start + len(columns[0])
+        self._log(("insert", start, stop, None))
+
+    def delete(self, start, stop=None):
+        """Delete the point at `start`, or the points in start..stop-1."""
+        if stop is None:
+            stop = start + 1
+        if not 0 <= start < stop <= len(self.Xs):
+            raise IndexError("Point index out of range")
+        removed = self._remove(start, stop)
+        self._log(("remove", start, stop, removed))
+
+    def reset(self, columns=None, next_series=None):
+        """Drop the undo history and replace all points, e.g. for a new image.
+
+        `columns` is an (Xs, Ys, xs, ys, series) tuple of arrays to take
+        over, by default the store is emptied.
+        """
+        self._set_columns(columns or self._empty_columns())
+        if next_series is None:
+            next_series = max(self.series, default=MANUAL_SERIES) + 1
+        self.next_series = next_series
+        self.undo_log.clear()
+        self.redo_log.clear()
+        self._notify("reset")
+
+    def delete_indices(self, indices):
+        """Delete scattered points as one operation, e.g. a lasso selection."""
+        indices = sorted(set(indices), reverse=True)
+        if not indices:
+            return
+        if not 0 <= indices[-1] <= indices[0] < len(self.Xs):
+            raise IndexError("Point index out of range")
+        # Remove runs of consecutive indices from the end, so the indices
+        # of the runs before stay valid
+        ops = []
+        k = 0
+        while k < len(indices):
+            stop = indices[k] + 1
+            while k + 1 < len(indices) and indices[k + 1] == indices[k] - 1:
+                k += 1
+            start = indices[k]
+            ops.append(("remove", start, stop, self._remove(start, stop)))
+            k += 1
+        self._log(("group", None, None, ops))
+
+    def clear(self):
+        if len(self.Xs):
+            self._log(("remove", 0, len(self.Xs), self._remove(0, len(self.Xs))))
+
+    def move(self, index, new_index):
+        """Move one point to another position in the order."""
+        if not (0 <= index < len(self.Xs) and 0 <= new_index < len(self.Xs)):
+            raise IndexError("Point index out of range")
+        self._move(index, new_index)
+        self._log(("move", index, new_index, None))
+
+    def set_point(self, index, X, Y, x, y):
+        """Move one point to new pixel and data coordinates."""
+        if not 0 <= index < len(self.Xs):
+            raise IndexError("Point index out of range")
+        old = self._set(index, (X, Y, x, y))
+        self._log(("set", index, index + 1, old))
+
+    def set_data(self, xs, ys):
+        """Replace the data coordinates, e.g. after the axes changed.
+
+        Derived values are not recorded in the operation log.
+        """
+        self.xs = xs if isinstance(xs, array) else array("d", xs)
+        self.ys = ys if isinstance(ys, array) else array("d", ys)
+
+    def undo(self):
+        """Revert the last operation. Returns False if there is none."""
+        if not self.undo_log:
+            return False
+        op = self.undo_log.pop()
+        self.redo_log.append(self._apply_inverse(op))
+        return True
+
+    def redo(self):
+        """Reapply the last undone operation. Returns False if there is none."""
+        if not self.redo_log:
+            return False
+        op = self.redo_log.pop()
+        self.undo_log.append(self._apply_inverse(op))
+        return True
+
+    def _log(self, op):
+        self.undo_log.append(op)
+        self.redo_log.clear()
+
+    def _apply_inverse(self, op):
+        """Undo `op` and return the operation that redoes it."""
+        kind, start, stop, removed = op
+        if kind == "group":
+            inverses = [self._apply_inverse(sub_op) for sub_op in reversed(removed)]
+            return ("group", None, None, inverses)
+        if kind == "set":
+            return ("set", start, stop, self._set(start, removed))
+        if kind == "insert":
+            return ("remove", start, stop, self._remove(start, stop))
+        if kind == "remove":
+            self._insert(start, removed)
+            return ("insert", start, stop, None)
+        # A move is undone by moving the point back
+        self._move(stop, start)
+        return ("move", stop, start, None)
+
+    def _remove(self, start, stop):
+        """Cut points start..stop-1 out of the columns and return them."""
+        if start == 0 and stop == len(self.Xs):
+            # Hand over the whole columns instead of copying them
+            removed = self._columns()
+            self._set_columns(self._empty_columns())
+            self._notify("remove", start, stop)
+            return removed
+        removed = tuple(column[start:stop] for column in self._columns())
+        for column in self._columns():
+            del column[start:stop]
+        self._notify("remove", start, stop)
+        return removed
+
+    def _insert(self, start, removed):
+        if not len(self.Xs) and start == 0:
+            self._set_columns(removed)
+        else:
+            for column, values in zip(self._columns(), removed):
+                column[start:start] = values
+        self._notify("insert", start, start + len(removed[0]))
+
+    def _set(self, index, values):
+        """Replace the coordinates of a point and return the old ones."""
+        columns = (self.Xs, self.Ys, self.xs, self.ys)
+        old = tuple(column[index] for column in columns)
+        for column, value in zip(columns, values):
+            column[index] = value
+        self._notify("set", index)
+        return old
+
+    def _move(self, index, new_index):
+        for column in self._columns():
+            value = column.pop(index)
+            column.insert(new_index, value)
+        self._notify("move", index, new_index)
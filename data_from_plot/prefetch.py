@@ -0,0 +1,150 @@
+"""Decoding images ahead of time on a worker thread.
+
+Nothing in here touches Tk: the worker only produces plain Python
+objects, and the Tk thread polls the returned futures.
+"""
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import layout_fingerprint
+from .instrument import metrics
+from .png import read_png
+from .pyramid import ImagePyramid
+from .session import image_hash
+from .vector import VECTOR_EXTENSIONS, fit_paths, rasterize
+
+# Files prepare_image can open, for file dialogs and folder queues
+IMAGE_EXTENSIONS = (".png",) + VECTOR_EXTENSIONS
+PREFETCH = 3  # Images decoded ahead of the current one
+CACHE_SIZE = PREFETCH + 2  # Also keep the current and the previous image
+CACHE_BYTES = 1 << 30  # Decoded pixel data kept in the cache
+
+PreparedImage = namedtuple(
+    "PreparedImage",
+    ("path", "image", "pyramid", "digest", "fingerprint", "vectors"),
+    defaults=(None,),
+)
+
+
+def prepare_image(file_path, max_width, max_height):
+    """Decode an image and do all the work that doesn't need Tk.
+
+    Besides decoding, this builds the pyramid level shown when the image
+    is zoomed to fit the given size, and the keys of the calibration cache.
+    The pyramid shows the decoded image itself at full size, so `image`
+    and `pyramid` share one full-resolution buffer.
+    SVG and PDF figures are drawn to fit that size instead, and their
+    paths, in pixels of that image, are returned as `vectors`.
+    """
+    vectors = None
+    with metrics.span("decode"):
+        if file_path.lower().endswith(VECTOR_EXTENSIONS):
+            vectors, size = fit_paths(file_path, max_width, max_height)
+            image = rasterize(vectors, *size)
+        else:
+            image = read_png(file_path)
+    with metrics.span("downscale"):
+        pyramid = ImagePyramid(image)
+        zoom = min(1.0, max_width / image.width, max_height / image.height)
+        pyramid.level(pyramid.level_for_zoom(zoom))
+    with metrics.span("cache_keys"):
+        digest = image_hash(file_path)
+        fingerprint = layout_fingerprint(image)
+    return PreparedImage(file_path, image, pyramid, digest, fingerprint, vectors)
+
+
+def _decoded_bytes(future):
+    """Bytes of pixel and path data of a prepared image, 0 until it is decoded."""
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return 0
+    prepared = future.result()
+    size = sum(len(level.data) for level in prepared.pyramid.levels)
+    if prepared.vectors is not None:
+        size += prepared.vectors.nbytes
+    return size
+
+
+class ImageLoader:
+    """Prepare images on one worker thread, keeping results in an LRU cache.
+
+    The cache holds futures, so an image that is still being decoded is
+    not queued twice. Images are keyed by path and modification time, so
+    a file changed on disk is decoded again. At most `cache_size` images
+    are kept, and at most `max_bytes` of decoded pixel data, but the
+    image last asked for with get() is never dropped.
+    """
+
+    def __init__(
+        self, max_width, max_height, cache_size=CACHE_SIZE, max_bytes=CACHE_BYTES
+    ):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.cache_size = cache_size
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()  # (path, mtime) -> Future of a PreparedImage
+        self.current = None  # Key of the image last asked for with get()
+        self.lock = threading.Lock()  # Decodes finish on the worker thread
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def _submit(self, file_path, current=False):
+        """(key, future) of an image, queueing it unless it is cached."""
+        key = (os.path.abspath(file_path), os.stat(file_path).st_mtime_ns)
+        with self.lock:
+            if current:
+                self.current = key
+            future = self.cache.get(key)
+            if future is not None:
+                self.cache.move_to_end(key)
+                return key, future
+            future = self.executor.submit(
+                prepare_image, file_path, self.max_width, self.max_height
+            )
+            self.cache[key] = future
+        # Trims the cache again once the image takes up memory
+        future.add_done_callback(self._trim)
+        return key, future
+
+    def _trim(self, _future=None):
+        """Drop the least recently used images over the limits."""
+        evicted = []
+        with self.lock:
+            size = sum(_decoded_bytes(future) for future in self.cache.values())
+            for key in list(self.cache):
+                if len(self.cache) <= self.cache_size and size <= self.max_bytes:
+                    break
+                if key != self.current:
+                    evicted.append(self.cache.pop(key))
+                    size -= _decoded_bytes(evicted[-1])
+        # Outside the lock: cancelling runs the done callbacks
+        for future in evicted:
+            future.cancel()  # Only has an effect if it hasn't started yet
+
+    def get(self, file_path):
+        """Future of the prepared image, decoding it if it isn't cached."""
+        _, future = self._submit(file_path, current=True)
+        self._trim()
+        return future
+
+    def prefetch(self, file_paths):
+        """Start decoding images that will probably be needed soon.
+
+        The first of them is the last to be dropped when memory runs short.
+        """
+        keys = []
+        for file_path in file_paths:
+            try:
+                keys.append(self._submit(file_path)[0])
+            except OSError:
+                pass  # Reported when the image is actually opened
+        with self.lock:
+            for key in reversed(keys):
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+        self._trim()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.clear()
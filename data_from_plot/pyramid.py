@@ -0,0 +1,124 @@
+"""Multi-resolution image pyramid for displaying large scans.
+
+Level 0 is the decoded image itself, every further level is RGB and
+halves both dimensions by averaging 2x2 blocks. Levels are only built
+when a zoom needs them, and tiles are resampled from the nearest level on
+request. Pixels of level 0 are converted to RGB as they are read, so the
+pyramid holds no second full-size copy of the image.
+Nothing in here imports tkinter, tiles are returned as binary PPM data.
+"""
+
+from operator import itemgetter
+
+from .png import PNGImage
+
+
+def _avg(a, b, low_bits):
+    """Bytewise floor average of two equally long byte strings."""
+    a = int.from_bytes(a)
+    b = int.from_bytes(b)
+    return (a & b) + (((a ^ b) >> 1) & low_bits)
+
+
+def to_rgb(data, channels, n):
+    """Return `n` pixels of `data` as RGB samples, `data` itself if it is RGB.
+
+    Fully transparent pixels become white, partial alpha is ignored.
+    """
+    if channels == 3:
+        return data
+    out = bytearray(n * 3)
+    if channels >= 3:
+        alpha = data[3::4].translate(bytes([255] + [0] * 255))
+        for c in range(3):
+            values = data[c::channels]
+            # OR with 255 where alpha is zero
+            values = (int.from_bytes(values) | int.from_bytes(alpha)).to_bytes(n)
+            out[c::3] = values
+    else:
+        grey = data[0::channels]
+        for c in range(3):
+            out[c::3] = grey
+    return out
+
+
+def downsample(image):
+    """Halve an image in both directions by averaging 2x2 blocks, as RGB."""
+    width = max(1, image.width // 2)
+    height = max(1, image.height // 2)
+    channels = image.channels
+    stride = image.width * channels
+    data = image.data
+    out = bytearray(width * height * 3)
+    n = width
+    low_bits = int.from_bytes(b"\x7f" * n)
+    for y in range(height):
+        top = data[2 * y * stride : (2 * y + 1) * stride]
+        bottom = data[(2 * y + 1) * stride : (2 * y + 2) * stride] or top
+        top = to_rgb(top, channels, image.width)
+        bottom = to_rgb(bottom, channels, image.width)
+        for c in range(3):
+            left = _avg(top[c : 6 * n : 6], bottom[c : 6 * n : 6], low_bits)
+            right = _avg(top[c + 3 : 6 * n : 6], bottom[c + 3 : 6 * n : 6], low_bits)
+            if len(top) < 6:  # A single pixel column has no right neighbour
+                right = left
+            value = (left & right) + (((left ^ right) >> 1) & low_bits)
+            out[y * width * 3 + c : (y + 1) * width * 3 : 3] = value.to_bytes(n)
+    return PNGImage(width, height, 3, out)
+
+
+class ImagePyramid:
+    def __init__(self, image):
+        self.width = image.width
+        self.height = image.height
+        # Level 0 is the decoded image, not a copy of it
+        self.levels = [image]
+
+    def level(self, k):
+        """Image at 1/2**k of the original size, built on first use."""
+        while len(self.levels) <= k:
+            self.levels.append(downsample(self.levels[-1]))
+        return self.levels[k]
+
+    def level_for_zoom(self, zoom):
+        """Coarsest level that still has at least `zoom` pixels per pixel."""
+        k = 0
+        while zoom * 2 ** (k + 1) <= 1 and min(self.width, self.height) >> (k + 1):
+            k += 1
+        return k
+
+    def tile(self, zoom, x0, y0, width, height):
+        """Render a region of the zoomed image as binary PPM data.
+
+        (x0, y0, width, height) is in zoomed pixels, i.e. original pixels
+        multiplied by `zoom`. Pixels are sampled from the nearest level.
+        """
+        k = self.level_for_zoom(zoom)
+        level = self.level(k)
+        ratio = zoom * 2**k  # Zoomed pixels per level pixel
+        channels = level.channels
+        stride = level.width * channels
+        data = level.data
+
+        columns = [min(int((x0 + i) / ratio), level.width - 1) for i in range(width)]
+        # Only the columns of the tile are read, and converted to RGB
+        first = columns[0]
+        span = columns[-1] + 1 - first
+        if ratio == 1:
+            gather = lambda row: row[: width * 3]
+        else:
+            indices = [3 * (col - first) + c for col in columns for c in range(3)]
+            getter = itemgetter(*indices)
+            gather = lambda row: bytes(getter(row))
+
+        rows = [f"P6 {width} {height} 255\n".encode()]
+        last_y = None
+        for i in range(height):
+            y = min(int((y0 + i) / ratio), level.height - 1)
+            if y != last_y:  # Rows repeat when zoomed in
+                start = y * stride + first * channels
+                row = to_rgb(data[start : start + span * channels], channels, span)
+                row = gather(row)
+                last_y = y
+            rows.append(row)
+        return b"".join(rows)
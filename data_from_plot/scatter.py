@@ -0,0 +1,259 @@
+"""Detection of scatter plot markers from one clicked example.
+
+The clicked marker is cut out as a template: the connected pixels of its
+colour. Every window of the template's size inside the plot area is then
+compared to it on a 3x3 grid of cells, by the number of marker-coloured
+pixels in each cell. Each row of the colour mask is held as an int with
+one byte per pixel, so the column counts of a band of rows are a sum of
+ints, slid down the plot area one row at a time. Along a band, prefix
+sums of those counts are only taken over the runs of columns that hold
+marker-coloured pixels, so the empty parts of the plot cost next to
+nothing. Overlapping windows on one marker are reduced to the best one
+by non-maximum suppression, which also keeps touching markers apart
+where colour thresholding would merge them into one blob.
+"""
+
+import re
+from collections import namedtuple
+from itertools import accumulate, compress
+from operator import add, sub
+
+from .extract import _clip_area, _match_table
+
+MAX_MARKER_SIZE = 64  # Largest template side in pixels
+SEED_RADIUS = 4  # Pixels a click may miss the marker by
+MIN_SCORE = 0.6  # Windows matching the template less than this are no marker
+GRID = 3  # Cells per side compared between a window and the template
+
+_NONZERO_RUN = re.compile(b"[^\x00]+")
+
+MarkerTemplate = namedtuple(
+    "MarkerTemplate", ("color", "width", "height", "mask", "center")
+)
+
+
+def _color_at(image, X, Y):
+    i = (Y * image.width + X) * image.channels
+    color = tuple(image.data[i : i + image.channels])
+    if image.channels < 3:
+        color = (color[0],) * 3
+    return color[:3]
+
+
+def _matches(a, b, tolerance):
+    return all(abs(u - v) <= tolerance for u, v in zip(a, b))
+
+
+def marker_template(image, X, Y, tolerance=40, max_size=MAX_MARKER_SIZE):
+    """Cut out the marker at or next to image pixel X, Y as a template.
+
+    The marker colour is taken from the nearest pixel within SEED_RADIUS
+    that isn't background white, and the marker is the 8-connected region
+    of that colour, limited to max_size pixels on each side.
+    """
+    X, Y = int(X), int(Y)
+    white = (255, 255, 255)
+    seeds = sorted(
+        (dx * dx + dy * dy, X + dx, Y + dy)
+        for dx in range(-SEED_RADIUS, SEED_RADIUS + 1)
+        for dy in range(-SEED_RADIUS, SEED_RADIUS + 1)
+        if 0 <= X + dx < image.width and 0 <= Y + dy < image.height
+    )
+    for _, sx, sy in seeds:
+        color = _color_at(image, sx, sy)
+        if not _matches(color, white, tolerance):
+            break
+    else:
+        raise ValueError("No marker at the clicked point")
+
+    # Flood fill, confined to a box around the seed
+    half = max_size // 2
+    left, top = max(sx - half, 0), max(sy - half, 0)
+    right = min(sx + half, image.width - 1)
+    bottom = min(sy + half, image.height - 1)
+    filled = {(sx, sy)}
+    stack = [(sx, sy)]
+    while stack:
+        px, py = stack.pop()
+        for nx in (px - 1, px, px + 1):
+            for ny in (py - 1, py, py + 1):
+                if (
+                    left <= nx <= right
+                    and top <= ny <= bottom
+                    and (nx, ny) not in filled
+                    and _matches(_color_at(image, nx, ny), color, tolerance)
+                ):
+                    filled.add((nx, ny))
+                    stack.append((nx, ny))
+
+    x0 = min(x for x, _ in filled)
+    y0 = min(y for _, y in filled)
+    width = max(x for x, _ in filled) - x0 + 1
+    height = max(y for _, y in filled) - y0 + 1
+    mask = bytearray(width * height)
+    for x, y in filled:
+        mask[(y - y0) * width + x - x0] = 1
+    # The centroid, relative to the top left corner of the template
+    center = (
+        sum(x for x, _ in filled) / len(filled) - x0,
+        sum(y for _, y in filled) / len(filled) - y0,
+    )
+    return MarkerTemplate(color, width, height, bytes(mask), center)
+
+
+def _color_mask(image, x0, y0, x1, y1, color, tolerance):
+    """Rows of a 0/1 mask of the pixels matching a colour inside an area."""
+    channels = image.channels
+    row_stride = image.width * channels
+    data = image.data
+    n_colors = 3 if channels >= 3 else 1
+    tables = [_match_table(color[c], tolerance) for c in range(n_colors)]
+    width = x1 - x0 + 1
+    rows = []
+    for y in range(y0, y1 + 1):
+        start = y * row_stride + x0 * channels
+        stop = start + width * channels
+        row = data[start:stop:channels].translate(tables[0])
+        if n_colors > 1 and row.count(1):
+            bits = int.from_bytes(row)
+            for c in range(1, n_colors):
+                channel = data[start + c : stop + c : channels]
+                bits &= int.from_bytes(channel.translate(tables[c]))
+            row = bits.to_bytes(width)
+        rows.append(row)
+    return rows
+
+
+def summed_area_table(rows):
+    """Summed-area table of mask rows: table[y][x] sums rows[:y], columns [:x].
+
+    Each row is built from the one above with C-level iterators, the
+    count of any rectangle is then four lookups, see _box_sum.
+    """
+    table = [[0] * (len(rows[0]) + 1 if rows else 1)]
+    for row in rows:
+        prefix = accumulate(row, initial=0)
+        table.append(list(map(add, table[-1], prefix)))
+    return table
+
+
+def _box_sum(table, x0, y0, x1, y1):
+    """Sum over the columns x0..x1-1 of the rows y0..y1-1."""
+    return table[y1][x1] - table[y1][x0] - table[y0][x1] + table[y0][x0]
+
+
+def _cell_bounds(size):
+    return [k * size // GRID for k in range(GRID + 1)]
+
+
+def _grid_counts(table, x, y, xs, ys):
+    return [
+        _box_sum(table, x + xs[i], y + ys[j], x + xs[i + 1], y + ys[j + 1])
+        for j in range(GRID)
+        for i in range(GRID)
+    ]
+
+
+def _runs(counts, gap):
+    """(start, stop) of the runs of nonzero counts, joining runs under gap apart."""
+    start = stop = None
+    for match in _NONZERO_RUN.finditer(counts):
+        if start is not None and match.start() - stop >= gap:
+            yield start, stop
+            start = None
+        if start is None:
+            start = match.start()
+        stop = match.end()
+    if start is not None:
+        yield start, stop
+
+
+def detect_markers(image, plot_area, template, tolerance=40, min_score=MIN_SCORE):
+    """Centroids of the markers like `template` inside the plot area.
+
+    A window scores 1 minus the summed difference of its cell counts from
+    the template's, relative to the template's pixel count. Only windows
+    whose total count allows a score of min_score are scored at all.
+    Returns the image pixel coordinates as two lists (Xs, Ys), by X.
+    """
+    x0, y0, x1, y1 = _clip_area(image, plot_area)
+    w, h = template.width, template.height
+    width, height = x1 - x0 + 1, y1 - y0 + 1
+    if width < w or height < h:
+        return [], []
+    mask = _color_mask(image, x0, y0, x1, y1, template.color, tolerance)
+    row_totals = list(accumulate((row.count(1) for row in mask), initial=0))
+    # One byte per pixel: adding up to MAX_MARKER_SIZE + 1 rows never carries
+    lanes = [int.from_bytes(row) for row in mask]
+    del mask
+    template_table = summed_area_table(
+        [template.mask[k * w : (k + 1) * w] for k in range(h)]
+    )
+    total = template_table[h][w]
+    xs, ys = _cell_bounds(w), _cell_bounds(h)
+    expected = _grid_counts(template_table, 0, 0, xs, ys)
+    # Window counts that allow a score of min_score, as a lookup table
+    possible = bytes(
+        min_score * total <= c <= (2 - min_score) * total for c in range(w * h + 1)
+    )
+    n_windows = width + 1 - w
+
+    hits = []  # (score, x, y) of the windows worth keeping
+    # Column counts of the rows of each row of cells, for the windows at y
+    cells = [sum(lanes[ys[j] : ys[j + 1]]) for j in range(GRID)]
+    for y in range(height + 1 - h):
+        if y:
+            for j in range(GRID):
+                cells[j] += lanes[y - 1 + ys[j + 1]] - lanes[y - 1 + ys[j]]
+        if row_totals[y + h] - row_totals[y] < min_score * total:
+            continue
+        band = sum(cells).to_bytes(width)
+        columns = None
+        for start, stop in _runs(band, w):
+            # The windows overlapping the run, and prefix sums under them
+            first, last = max(start + 1 - w, 0), min(stop, n_windows)
+            if first >= last:
+                continue
+            prefix = list(accumulate(band[first : last - 1 + w], initial=0))
+            counts = map(sub, prefix[w:], prefix[: last - first])
+            candidates = compress(range(first, last), map(possible.__getitem__, counts))
+            cell_prefixes = None
+            for x in candidates:
+                if cell_prefixes is None:
+                    if columns is None:
+                        columns = [c.to_bytes(width) for c in cells]
+                    cell_prefixes = [
+                        list(accumulate(c[first : last - 1 + w], initial=0))
+                        for c in columns
+                    ]
+                k = x - first
+                grid = [
+                    P[k + xs[i + 1]] - P[k + xs[i]]
+                    for P in cell_prefixes
+                    for i in range(GRID)
+                ]
+                score = 1 - sum(map(abs, map(sub, grid, expected))) / total
+                if score >= min_score:
+                    hits.append((score, x, y))
+
+    # Non-maximum suppression: the best windows claim their neighbourhood
+    spacing = max(1.0, min(w, h) / 2)
+    grid = {}  # Cell of side `spacing` -> kept centroids in it
+    Xs = []
+    Ys = []
+    cx, cy = template.center
+    for score, x, y in sorted(hits, reverse=True):
+        X, Y = x0 + x + cx, y0 + y + cy
+        col, row = int(X // spacing), int(Y // spacing)
+        if any(
+            (X - KX) ** 2 + (Y - KY) ** 2 < spacing * spacing
+            for c in (col - 1, col, col + 1)
+            for r in (row - 1, row, row + 1)
+            for KX, KY in grid.get((c, r), ())
+        ):
+            continue
+        grid.setdefault((col, row), []).append((X, Y))
+        Xs.append(X)
+        Ys.append(Y)
+    order = sorted(range(len(Xs)), key=Xs.__getitem__)
+    return [Xs[i] for i in order], [Ys[i] for i in order]
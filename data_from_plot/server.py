@@ -0,0 +1,313 @@
+"""Local JSON-over-HTTP service for digitizing from other programs.
+
+Endpoints, all answering JSON:
+
+- ``GET /health``: queue and cache status.
+- ``POST /images``: upload a PNG as the raw request body. The image is
+  decoded once and cached under its SHA-256, which is returned.
+- ``POST /convert``: ``{"calibration": {...}, "points": [[X, Y], ...]}``,
+  pixel coordinates to data coordinates.
+- ``POST /detect``: ``{"image": sha256}``, the plot area from the axis lines.
+- ``POST /extract``: ``{"image": sha256, "calibration": {...}}``, the
+  curve of the calibration colour, or every coloured curve if it has
+  none. Add ``"detect": true`` to detect the plot area first.
+
+Connections are handed to a fixed pool of worker threads through a
+bounded queue. When the queue is full, new connections are answered
+with 503 and a Retry-After header right away instead of piling up.
+Decoded images are kept in an LRU cache bounded by their total size.
+Only the standard library is used, and nothing in here imports tkinter.
+"""
+
+import hashlib
+import io
+import json
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .calibration import Calibration, parse_calibration
+from .detect import detect_plot_area
+from .extract import extract_curve, extract_series
+from .instrument import metrics
+from .png import read_png
+
+DEFAULT_PORT = 8765
+WORKERS = 4  # Requests handled at the same time
+QUEUE_SIZE = 16  # Connections waiting for a worker before 503s are sent
+CACHE_BYTES = 512 << 20  # Decoded pixel data kept in the image cache
+MAX_UPLOAD = 64 << 20  # Largest accepted request body
+REQUEST_TIMEOUT = 30  # Seconds a worker waits for a slow client
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ImageCache:
+    """Thread-safe LRU of decoded images keyed by content hash."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()  # SHA-256 -> PNGImage
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.images)
+
+    def get(self, digest):
+        with self.lock:
+            image = self.images.get(digest)
+            if image is not None:
+                self.images.move_to_end(digest)
+            return image
+
+    def add(self, digest, image):
+        with self.lock:
+            if digest in self.images:
+                return
+            self.images[digest] = image
+            self.size += len(image.data)
+            # Drop the least recently used images, but never the new one
+            while self.size > self.max_bytes and len(self.images) > 1:
+                _, evicted = self.images.popitem(last=False)
+                self.size -= len(evicted.data)
+
+
+def upload_image(cache, body):
+    """Decode an uploaded PNG unless it is cached. Returns its description."""
+    digest = hashlib.sha256(body).hexdigest()
+    image = cache.get(digest)
+    cached = image is not None
+    if not cached:
+        # Decoded outside the cache lock, so uploads decode in parallel
+        image = read_png(io.BytesIO(body))
+        cache.add(digest, image)
+    return {
+        "image": digest,
+        "width": image.width,
+        "height": image.height,
+        "channels": image.channels,
+        "cached": cached,
+    }
+
+
+def _cached_image(cache, request):
+    image = cache.get(request.get("image"))
+    if image is None:
+        raise HTTPError(404, "Unknown image, upload it to /images first")
+    return image
+
+
+def convert_points(request):
+    calibration = Calibration.from_dict(parse_calibration(request["calibration"]))
+    points = request["points"]
+    xs, ys = calibration.to_data([p[0] for p in points], [p[1] for p in points])
+    return {"points": [[x, y] for x, y in zip(xs, ys)]}
+
+
+def detect_area(cache, request):
+    return {"plot_area": list(detect_plot_area(_cached_image(cache, request)))}
+
+
+def extract_points(cache, request):
+    image = _cached_image(cache, request)
+    detect = request.get("detect", False)
+    calibration = parse_calibration(request["calibration"], not detect)
+    if detect:
+        calibration["plot_area"] = detect_plot_area(image)
+    plot_area = calibration["plot_area"]
+    tolerance = calibration["tolerance"]
+    if calibration["color"] is not None:
+        Xs, Ys = extract_curve(image, plot_area, calibration["color"], tolerance)
+        found = [(tuple(calibration["color"]), Xs, Ys)]
+    else:
+        found = extract_series(image, plot_area, tolerance=tolerance)
+    to_data = Calibration.from_dict(calibration).to_data
+    series = []
+    for color, Xs, Ys in found:
+        xs, ys = to_data(Xs, Ys)
+        series.append({"color": list(color), "x": list(xs), "y": list(ys)})
+    return {"plot_area": list(plot_area), "series": series}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "DataFromPlot"
+    timeout = REQUEST_TIMEOUT
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        server = self.server
+        self._send(
+            200,
+            {
+                "status": "ok",
+                "queued": server.connections.qsize(),
+                "images_cached": len(server.images),
+            },
+        )
+
+    def do_POST(self):
+        images = self.server.images
+        routes = {
+            "/images": lambda body: upload_image(images, body),
+            "/convert": lambda body: convert_points(self._json(body)),
+            "/detect": lambda body: detect_area(images, self._json(body)),
+            "/extract": lambda body: extract_points(images, self._json(body)),
+        }
+        try:
+            route = routes.get(self.path)
+            if route is None:
+                raise HTTPError(404, f"Unknown path {self.path}")
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_UPLOAD:
+                raise HTTPError(413, f"Request body over {MAX_UPLOAD} bytes")
+            body = self.rfile.read(length)
+            with metrics.span("serve " + self.path):
+                response = route(body)
+        except HTTPError as e:
+            self._send(e.status, {"error": str(e)})
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            self._send(400, {"error": f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            # Never leave the client without an answer, e.g. on an overflow
+            self.log_error("Error serving %s:\n%s", self.path, traceback.format_exc())
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send(200, response)
+
+    @staticmethod
+    def _json(body):
+        request = json.loads(body)
+        if not isinstance(request, dict):
+            raise ValueError("The request body must be a JSON object")
+        return request
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# Sent without reading the request when every worker is busy
+_BUSY_BODY = b'{"error": "Server busy, retry later"}'
+_BUSY = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Retry-After: 1\r\n"
+    b"Content-Length: %d\r\n\r\n" % len(_BUSY_BODY)
+) + _BUSY_BODY
+
+
+class DigitizeServer(HTTPServer):
+    """HTTP server handling connections on a bounded pool of threads."""
+
+    def __init__(
+        self, address, workers=WORKERS, queue_size=QUEUE_SIZE, cache_bytes=CACHE_BYTES
+    ):
+        super().__init__(address, _Handler)
+        self.images = ImageCache(cache_bytes)
+        self.connections = queue.Queue(queue_size)
+        self.workers = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        """Queue a connection for the workers, or turn it away if full."""
+        try:
+            self.connections.put_nowait((request, client_address))
+        except queue.Full:
+            metrics.count("serve_rejected")
+            try:
+                # Read what already arrived, so closing doesn't reset the
+                # connection before the client sees the answer
+                request.setblocking(False)
+                while request.recv(1 << 16):
+                    pass
+            except OSError:
+                pass
+            try:
+                request.setblocking(True)
+                request.sendall(_BUSY)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def _work(self):
+        while True:
+            item = self.connections.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except ConnectionError:
+                pass  # The client went away
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for _ in self.workers:
+            self.connections.put(None)
+        for worker in self.workers:
+            worker.join()
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address to listen on (default: 127.0.0.1, this machine only)",
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=DEFAULT_PORT, help="port to listen on"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help=f"requests handled at the same time (default: {WORKERS})",
+    )
+    parser.add_argument(
+        "--queue",
+        type=int,
+        default=QUEUE_SIZE,
+        help=f"waiting requests before new ones get 503 (default: {QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=CACHE_BYTES >> 20,
+        help=f"memory for decoded images in MB (default: {CACHE_BYTES >> 20})",
+    )
+
+
+def main(args):
+    server = DigitizeServer(
+        (args.host, args.port), args.workers, args.queue, args.cache_mb << 20
+    )
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port}, press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping")
+    finally:
+        server.server_close()
+    return 0
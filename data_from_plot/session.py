@@ -0,0 +1,225 @@
+"""Crash-safe session journal and project snapshots.
+
+The journal is an append-only file with one JSON entry per line. It
+records the image, the calibration settings and every change to the
+points, so a session can be rebuilt after a crash by replaying it.
+Entries are buffered and written with one fsync per batch.
+
+A project snapshot is one binary file: a JSON header with the image path,
+its content hash and the calibration, followed by the raw little-endian
+point columns. Loading memory-maps the file and copies each column into
+its array in one go, with no parsing of the points.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+
+PROJECT_MAGIC = b"DFPPROJ1"
+PROJECT_COLUMNS = (("Xs", "d"), ("Ys", "d"), ("series", "i"))
+
+AUTOSAVE_PATH = os.path.join(
+    os.path.expanduser("~"), ".data_from_plot", "autosave.journal"
+)
+
+
+def image_hash(file_path):
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Journal:
+    """Append-only session log with batched fsync."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.pending = []
+        self.file = None
+
+    def start(self, first_entry=None):
+        """Truncate the journal, optionally writing a first entry."""
+        self.close()
+        os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+        self.file = open(self.file_path, "w", encoding="utf-8")
+        self.pending.clear()
+        if first_entry is not None:
+            self.write(first_entry)
+
+    def resume(self):
+        """Keep appending to an existing journal."""
+        self.close()
+        self.file = open(self.file_path, "a", encoding="utf-8")
+
+    def write(self, entry):
+        """Queue an entry; it reaches the disk on the next sync()."""
+        if self.file is not None:
+            self.pending.append(json.dumps(entry, separators=(",", ":")))
+
+    @property
+    def dirty(self):
+        return bool(self.pending)
+
+    def sync(self):
+        """Write the queued entries and fsync them as one batch."""
+        if not self.pending or self.file is None:
+            return
+        self.file.write("\n".join(self.pending) + "\n")
+        self.pending.clear()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def record_points(self, points, event, *args):
+        """PointStore listener writing every change of the points."""
+        if event == "insert":
+            start, stop = args
+            self.write(
+                {
+                    "op": "insert",
+                    "start": start,
+                    "X": points.Xs[start:stop].tolist(),
+                    "Y": points.Ys[start:stop].tolist(),
+                    "series": points.series[start:stop].tolist(),
+                }
+            )
+        elif event == "remove":
+            self.write({"op": "remove", "start": args[0], "stop": args[1]})
+        elif event == "move":
+            self.write({"op": "move", "index": args[0], "new_index": args[1]})
+        elif event == "set":
+            (index,) = args
+            self.write(
+                {
+                    "op": "set",
+                    "index": index,
+                    "X": points.Xs[index],
+                    "Y": points.Ys[index],
+                }
+            )
+
+
+def read_journal(file_path):
+    """Return the entries of a journal, ignoring a torn last line."""
+    entries = []
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # The process died while writing this entry
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def replay_points(entries, points):
+    """Apply the point changes of journal entries to a PointStore.
+
+    Data coordinates are left as NaN, they are recomputed from the
+    calibration afterwards.
+    """
+    nan = float("nan")
+    for entry in entries:
+        op = entry["op"]
+        if op == "insert":
+            n = len(entry["X"])
+            points.insert(
+                entry["start"],
+                entry["X"],
+                entry["Y"],
+                [nan] * n,
+                [nan] * n,
+                entry["series"],
+            )
+        elif op == "remove":
+            points.delete(entry["start"], entry["stop"])
+        elif op == "move":
+            points.move(entry["index"], entry["new_index"])
+        elif op == "set":
+            points.set_point(entry["index"], entry["X"], entry["Y"], nan, nan)
+
+
+def save_project(file_path, image_path, settings, points):
+    """Write a project snapshot; the image is referenced by path and hash.
+
+    Returns the id of the snapshot, which a journal of later changes
+    records so it is never replayed onto a different snapshot.
+    """
+    n = len(points)
+    snapshot = uuid.uuid4().hex
+    header = {
+        "snapshot": snapshot,
+        "image_path": os.path.abspath(image_path),
+        "image_sha256": image_hash(image_path),
+        "calibration": settings,
+        "points": n,
+        "next_series": points.next_series,
+        "columns": [name for name, _ in PROJECT_COLUMNS],
+    }
+    header = json.dumps(header).encode("utf-8")
+    # Pad the header so every column starts 8-byte aligned
+    header += b" " * (-(len(PROJECT_MAGIC) + 4 + len(header)) % 8)
+
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PROJECT_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, typecode in PROJECT_COLUMNS:
+            column = getattr(points, name)
+            if sys.byteorder == "big":
+                column = array(typecode, column)
+                column.byteswap()
+            f.write(column)
+            f.write(bytes(-len(column) * column.itemsize % 8))
+        f.flush()
+        os.fsync(f.fileno())
+    # Replace atomically, so a crash never leaves a half-written project
+    os.replace(tmp_path, file_path)
+    return snapshot
+
+
+def load_project(file_path):
+    """Read a project snapshot.
+
+    Returns (header, columns) with columns a dict of arrays keyed by name.
+    """
+    with open(file_path, "rb") as f:
+        if f.read(len(PROJECT_MAGIC)) != PROJECT_MAGIC:
+            raise ValueError(f"Not a project file: {file_path}")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length))
+        offset = len(PROJECT_MAGIC) + 4 + header_length
+        n = header["points"]
+        columns = {}
+        if not n:
+            for name, typecode in PROJECT_COLUMNS:
+                columns[name] = array(typecode)
+            return header, columns
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for name, typecode in PROJECT_COLUMNS:
+                    column = array(typecode)
+                    size = n * column.itemsize
+                    with view[offset : offset + size] as data:
+                        column.frombytes(data)
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    columns[name] = column
+                    offset += size + (-size % 8)
+    return header, columns
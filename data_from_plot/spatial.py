@@ -0,0 +1,173 @@
+"""Uniform grid over the stored points, for hit-testing and selection."""
+
+from math import floor, hypot
+
+CELL_SIZE = 32  # Side of a grid cell in image pixels
+# Inserting or removing before more points than this renumbers them in
+# place; beyond it the grid is rebuilt once on the next query instead
+MAX_SHIFT = 4096
+
+
+class PointIndex:
+    """Grid of the image pixel coordinates of a PointStore.
+
+    Every cell holds the set of indices of the points inside it. The
+    index listens to the store and is updated incrementally: appended
+    points only touch their own cells, and points behind an insertion or
+    removal are renumbered unless there are too many of them.
+    """
+
+    def __init__(self, points, cell_size=CELL_SIZE):
+        self.points = points
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of point indices
+        self.keys = []  # Cell of every point, in store order
+        self.dirty = True
+        points.listeners.append(self.on_change)
+
+    def _key(self, X, Y):
+        return (floor(X / self.cell_size), floor(Y / self.cell_size))
+
+    def _add(self, start, stop):
+        Xs, Ys, cells = self.points.Xs, self.points.Ys, self.cells
+        keys = [self._key(Xs[i], Ys[i]) for i in range(start, stop)]
+        self.keys[start:start] = keys
+        for i, key in enumerate(keys, start):
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = {i}
+            else:
+                cell.add(i)
+
+    def _discard(self, i):
+        key = self.keys[i]
+        cell = self.cells[key]
+        cell.discard(i)
+        if not cell:
+            del self.cells[key]
+
+    def _shift(self, start, delta):
+        """Add delta to the indices from start on, in the cells holding them."""
+        cells = self.cells
+        for key in set(self.keys[start:]):
+            cells[key] = {i + delta if i >= start else i for i in cells[key]}
+
+    def rebuild(self):
+        self.cells = {}
+        self.keys = []
+        self._add(0, len(self.points))
+        self.dirty = False
+
+    def on_change(self, event, *args):
+        """PointStore listener."""
+        if self.dirty:
+            return  # Rebuilt on the next query anyway
+        if event == "insert":
+            start, stop = args
+            if len(self.keys) - start > MAX_SHIFT:
+                self.dirty = True
+                return
+            self._shift(start, stop - start)
+            self._add(start, stop)
+        elif event == "remove":
+            start, stop = args
+            if len(self.keys) - stop > MAX_SHIFT:
+                self.dirty = True
+                return
+            for i in range(start, stop):
+                self._discard(i)
+            self._shift(stop, start - stop)
+            del self.keys[start:stop]
+        elif event == "move":
+            index, new_index = args
+            if abs(new_index - index) > MAX_SHIFT:
+                self.dirty = True
+                return
+            # The point keeps its cell, the points in between shift by one
+            key = self.keys.pop(index)
+            self.keys.insert(new_index, key)
+            low, high = min(index, new_index), max(index, new_index)
+            step = 1 if new_index < index else -1
+
+            def renumber(i):
+                if i == index:
+                    return new_index
+                return i + step if low <= i <= high else i
+
+            for key in set(self.keys[low : high + 1]):
+                self.cells[key] = {renumber(i) for i in self.cells[key]}
+        elif event == "set":
+            (index,) = args
+            self._discard(index)
+            self.keys[index] = self._key(self.points.Xs[index], self.points.Ys[index])
+            self.cells.setdefault(self.keys[index], set()).add(index)
+        else:
+            self.dirty = True
+
+    def _candidates(self, X0, Y0, X1, Y1):
+        """Indices of the points in the cells overlapping a rectangle."""
+        if self.dirty:
+            self.rebuild()
+        c0, r0 = self._key(X0, Y0)
+        c1, r1 = self._key(X1, Y1)
+        cells = self.cells
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > len(cells):
+            # Fewer occupied cells than cells in the rectangle
+            for (c, r), cell in cells.items():
+                if c0 <= c <= c1 and r0 <= r <= r1:
+                    yield from cell
+            return
+        for c in range(c0, c1 + 1):
+            for r in range(r0, r1 + 1):
+                cell = cells.get((c, r))
+                if cell:
+                    yield from cell
+
+    def nearest(self, X, Y, max_distance):
+        """Index of the point nearest to X, Y within max_distance, or None."""
+        Xs, Ys = self.points.Xs, self.points.Ys
+        best = None
+        best_distance = max_distance
+        for i in self._candidates(
+            X - max_distance, Y - max_distance, X + max_distance, Y + max_distance
+        ):
+            distance = hypot(Xs[i] - X, Ys[i] - Y)
+            if distance <= best_distance:
+                best, best_distance = i, distance
+        return best
+
+    def in_box(self, X0, Y0, X1, Y1, limit=None):
+        """Sorted indices of the points inside a rectangle.
+
+        With a `limit`, the search stops and returns None as soon as more
+        points than that are found.
+        """
+        Xs, Ys = self.points.Xs, self.points.Ys
+        inside = []
+        for i in self._candidates(X0, Y0, X1, Y1):
+            if X0 <= Xs[i] <= X1 and Y0 <= Ys[i] <= Y1:
+                inside.append(i)
+                if limit is not None and len(inside) > limit:
+                    return None
+        inside.sort()
+        return inside
+
+    def in_polygon(self, polygon):
+        """Sorted indices of the points inside a polygon of (X, Y) vertices."""
+        if len(polygon) < 3:
+            return []
+        PXs = [X for X, _ in polygon]
+        PYs = [Y for _, Y in polygon]
+        Xs, Ys = self.points.Xs, self.points.Ys
+        edges = list(zip(polygon, polygon[1:] + polygon[:1]))
+        inside = []
+        for i in self.in_box(min(PXs), min(PYs), max(PXs), max(PYs)):
+            X, Y = Xs[i], Ys[i]
+            # Even-odd rule: count the edges crossed by a ray to the right
+            crossings = 0
+            for (Xa, Ya), (Xb, Yb) in edges:
+                if (Ya > Y) != (Yb > Y) and X < Xa + (Y - Ya) * (Xb - Xa) / (Yb - Ya):
+                    crossings += 1
+            if crossings % 2:
+                inside.append(i)
+        return inside
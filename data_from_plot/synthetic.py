@@ -0,0 +1,158 @@
+"""Synthetic plot images with known curves, for benchmarks.
+
+A generated plot has a black frame around the plot area, a light grey
+grid and a few coloured curves whose exact values are known, so results
+can be checked against the ground truth. Images are written row by row,
+so even 20000 pixel wide plots need little memory.
+"""
+
+from collections import defaultdict
+from math import floor, log10, pi, sin
+
+from .png import write_png
+
+CURVE_COLORS = (
+    (220, 20, 60),
+    (30, 144, 255),
+    (34, 139, 34),
+    (255, 140, 0),
+    (148, 0, 211),
+)
+GRID_COLOR = (210, 210, 210)
+FRAME_COLOR = (0, 0, 0)
+GRID_LINES = 10
+
+# Axis limits per axis type
+X_LIMITS = {"Linear": (0.0, 10.0), "Log10": (1.0, 1e4)}
+Y_LIMITS = {"Linear": (-5.0, 5.0), "Log10": (1e-2, 1e3)}
+
+
+def curve_value(k, u):
+    """Height of curve k in 0..1 of the plot area at u in 0..1 of its width."""
+    return 0.5 + (0.35 - 0.05 * k) * sin(2 * pi * (1 + 0.5 * k) * u + k)
+
+
+def _to_axis(value, axis_type):
+    return log10(value) if axis_type == "Log10" else value
+
+
+def _from_axis(value, axis_type):
+    return 10**value if axis_type == "Log10" else value
+
+
+class SyntheticPlot:
+    """Layout and ground truth of a generated plot image."""
+
+    def __init__(self, width, height, x_axis_type="Linear", y_axis_type="Linear"):
+        self.width = width
+        self.height = height
+        self.x_axis_type = x_axis_type
+        self.y_axis_type = y_axis_type
+        self.x_min, self.x_max = X_LIMITS[x_axis_type]
+        self.y_min, self.y_max = Y_LIMITS[y_axis_type]
+        # The frame sits on the plot area edges, with margins for labels
+        self.plot_area = (
+            width // 8,
+            height // 10,
+            width - width // 16,
+            height - height // 8,
+        )
+        self.line_width = max(1, min(width, height) // 800)
+        self.curve_width = max(2, min(width, height) // 400)
+
+    def calibration(self):
+        """The calibration dictionary matching the image."""
+        return {
+            "plot_area": list(self.plot_area),
+            "x_axis_type": self.x_axis_type,
+            "y_axis_type": self.y_axis_type,
+            "x_min": self.x_min,
+            "x_max": self.x_max,
+            "y_min": self.y_min,
+            "y_max": self.y_max,
+            "x_header": "x",
+            "y_header": "y",
+            "color": list(CURVE_COLORS[0]),
+            "tolerance": 40,
+        }
+
+    def curve_pixel(self, k, X):
+        """Exact pixel row of curve k at pixel column X."""
+        x0, y0, x1, y1 = self.plot_area
+        return y1 - curve_value(k, (X - x0) / (x1 - x0)) * (y1 - y0)
+
+    def truth(self, k, x):
+        """Exact data value of curve k at data coordinate x."""
+        u = (_to_axis(x, self.x_axis_type) - _to_axis(self.x_min, self.x_axis_type)) / (
+            _to_axis(self.x_max, self.x_axis_type)
+            - _to_axis(self.x_min, self.x_axis_type)
+        )
+        low = _to_axis(self.y_min, self.y_axis_type)
+        high = _to_axis(self.y_max, self.y_axis_type)
+        return _from_axis(low + curve_value(k, u) * (high - low), self.y_axis_type)
+
+    def _curve_rows(self, n_curves):
+        """Map of pixel row -> [(X, colour)] of the curve pixels."""
+        x0, _, x1, _ = self.plot_area
+        half = (self.curve_width - 1) / 2
+        rows = defaultdict(list)
+        for k in range(n_curves):
+            color = bytes(CURVE_COLORS[k % len(CURVE_COLORS)])
+            for X in range(x0 + 1, x1):
+                # Cover the curve between the pixel edges, so steep parts
+                # stay connected and each column is centred on the curve
+                a = self.curve_pixel(k, X - 0.5)
+                b = self.curve_pixel(k, X + 0.5)
+                top = floor(min(a, b) - half + 0.5)
+                bottom = floor(max(a, b) + half + 0.5)
+                for Y in range(top, bottom + 1):
+                    rows[Y].append((X, color))
+        return rows
+
+    def rows(self, n_curves):
+        """Yield the RGB rows of the image."""
+        width, height = self.width, self.height
+        x0, y0, x1, y1 = self.plot_area
+        t = self.line_width
+        frame = bytes(FRAME_COLOR)
+        grid = bytes(GRID_COLOR)
+
+        white = bytes([255]) * (3 * width)
+        grid_columns = [x0 + (x1 - x0) * i // GRID_LINES for i in range(1, GRID_LINES)]
+        grid_rows = {y0 + (y1 - y0) * i // GRID_LINES for i in range(1, GRID_LINES)}
+
+        # Rows inside the plot: grid columns, then the vertical frame lines
+        inside = bytearray(white)
+        for X in grid_columns:
+            inside[3 * X : 3 * X + 3] = grid
+        grid_row = bytearray(inside)
+        grid_row[3 * x0 : 3 * x1] = grid * (x1 - x0)
+        for row in (inside, grid_row):
+            for X in range(t):
+                row[3 * (x0 - X) : 3 * (x0 - X) + 3] = frame
+                row[3 * (x1 + X) : 3 * (x1 + X) + 3] = frame
+        frame_row = bytearray(white)
+        frame_row[3 * (x0 - t + 1) : 3 * (x1 + t)] = frame * (x1 - x0 + 2 * t - 1)
+
+        curves = self._curve_rows(n_curves)
+        for Y in range(height):
+            if y0 - t < Y <= y0 or y1 <= Y < y1 + t:
+                yield frame_row
+            elif y0 < Y < y1:
+                row = bytearray(grid_row if Y in grid_rows else inside)
+                for X, color in curves.get(Y, ()):
+                    row[3 * X : 3 * X + 3] = color
+                yield row
+            else:
+                yield white
+
+    def write(self, file_path, n_curves=3, level=1, filter_type=4):
+        # Paeth, like most PNG writers choose for line art
+        write_png(
+            file_path,
+            self.width,
+            self.height,
+            self.rows(n_curves),
+            level=level,
+            filter_type=filter_type,
+        )
@@ -0,0 +1,132 @@
+"""Following one curve from a seed point, column by column.
+
+Extraction by colour alone mixes up curves of the same colour and loses
+curves where they cross others. Tracing starts at a clicked pixel of the
+curve and only looks for it in a small window around where it is
+expected in the next column, so other strokes elsewhere in the column
+are ignored.
+"""
+
+import re
+
+from .extract import _clip_area, _match_table
+
+TRACE_WINDOW = 12  # Rows searched above and below the expected position
+MAX_GAP = 20  # Columns the curve may be missing, e.g. behind a crossing
+CHUNK_SIZE = 256  # Points per chunk yielded by trace_curve
+SLOPE_SMOOTHING = 0.3  # Weight of the newest step in the direction prior
+
+_RUN = re.compile(b"\x01+")
+
+
+def _column_mask(image, X, top, bottom, tables):
+    """0/1 match mask of rows top..bottom of pixel column X."""
+    channels = image.channels
+    row_stride = image.width * channels
+    start = top * row_stride + X * channels
+    stop = start + (bottom - top) * row_stride + 1
+    data = image.data
+    mask = data[start:stop:row_stride].translate(tables[0])
+    if len(tables) > 1 and mask.count(1):
+        bits = int.from_bytes(mask)
+        for c in range(1, len(tables)):
+            column = data[start + c : stop + c : row_stride]
+            bits &= int.from_bytes(column.translate(tables[c]))
+        mask = bits.to_bytes(len(mask))
+    return mask
+
+
+def _nearest_run(mask, offset, expected):
+    """Centre row of the run of set bytes closest to the expected row."""
+    best = None
+    best_distance = None
+    for match in _RUN.finditer(mask):
+        top = offset + match.start()
+        bottom = offset + match.end() - 1
+        distance = max(top - expected, expected - bottom, 0)
+        if best is None or distance < best_distance:
+            best = (top + bottom) / 2
+            best_distance = distance
+    return best
+
+
+def _follow(image, tables, area, X, Y, step, slope, window, max_gap):
+    """Yield (X, Y) of the curve from column X + step onwards, one way."""
+    x0, y0, x1, y1 = area
+    gap = 0
+    while gap <= max_gap:
+        X += step
+        if not x0 <= X <= x1:
+            return
+        # The direction prior: expect the curve to keep its recent slope
+        expected = Y + slope * (gap + 1)
+        reach = window + abs(slope) * (gap + 1)
+        top = max(y0, int(expected - reach))
+        bottom = min(y1, int(expected + reach) + 1)
+        found = None
+        if top <= bottom:
+            found = _nearest_run(
+                _column_mask(image, X, top, bottom, tables), top, expected
+            )
+        if found is None:
+            gap += 1
+            continue
+        slope += SLOPE_SMOOTHING * ((found - Y) / (gap + 1) - slope)
+        Y = found
+        gap = 0
+        yield X, Y
+
+
+def trace_curve(
+    image,
+    plot_area,
+    seed,
+    color,
+    tolerance=40,
+    window=TRACE_WINDOW,
+    max_gap=MAX_GAP,
+    chunk_size=CHUNK_SIZE,
+):
+    """Trace the curve through the seed pixel, yielding chunks of points.
+
+    Pixels match the curve when every RGB channel is within `tolerance` of
+    `color`. In every column the matching run of pixels nearest to the
+    position predicted from the recent slope is taken, searching `window`
+    rows either way. The trace ends at the plot area or after `max_gap`
+    columns without a match.
+
+    Yields (Xs, Ys) lists of at most `chunk_size` points in image pixels:
+    first the seed and the points right of it in increasing X, then the
+    points left of it in decreasing X. Raises ValueError if the curve
+    colour is not found near the seed.
+    """
+    x0, y0, x1, y1 = area = _clip_area(image, plot_area)
+    X, Y = int(seed[0]), seed[1]
+    if not (x0 <= X <= x1 and y0 <= Y <= y1):
+        raise ValueError("The seed point is outside the plot area")
+    n_colors = 3 if image.channels >= 3 else 1
+    tables = [_match_table(color[c], tolerance) for c in range(n_colors)]
+
+    top = max(y0, int(Y) - window)
+    bottom = min(y1, int(Y) + window)
+    Y = _nearest_run(_column_mask(image, X, top, bottom, tables), top, Y)
+    if Y is None:
+        raise ValueError("No pixels of the curve colour near the seed point")
+
+    slopes = []
+    for step in (1, -1):
+        # Leftwards, start from the slope found right of the seed
+        slope = -slopes[0] if slopes else 0.0
+        Xs, Ys = ([X], [Y]) if step == 1 else ([], [])
+        for X_next, Y_next in _follow(
+            image, tables, area, X, Y, step, slope, window, max_gap
+        ):
+            if step == 1 and not slopes:
+                slopes.append((Y_next - Y) / (X_next - X))
+            Xs.append(X_next)
+            Ys.append(Y_next)
+            if len(Xs) >= chunk_size:
+                yield Xs, Ys
+                Xs, Ys = [], []
+        if Xs:
+            yield Xs, Ys
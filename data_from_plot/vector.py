@@ -0,0 +1,572 @@
+"""Reading the paths of vector figures (SVG and PDF).
+
+Plots exported from matplotlib, gnuplot and the like store every curve
+as a path with exact vertices, so no pixels need to be found at all.
+Paths are read in a y-down coordinate system like image pixels: SVG
+user units as they are, PDF points with y negated.
+
+SVG files are parsed incrementally with iterparse, clearing elements once
+read. PDF files are memory-mapped and every content stream is inflated
+and scanned on its own, so only one stream is held in memory at a time.
+Images, fonts and other non-content streams are skipped.
+
+SVG <use> elements are drawn where they refer to a single shape defined
+before them, which is how matplotlib writes scatter markers. References
+to groups, symbols and later elements are ignored. Bézier curves and
+arcs are reduced to the chords between their end points.
+
+For display, the paths are scaled to fit a size and drawn into a
+PNGImage, so the image view, plot area selection and detection work on
+vector figures unchanged. The vertices themselves stay exact. The file
+is parsed once into flat arrays of doubles, 16 bytes per vertex.
+"""
+
+import mmap
+import re
+import zlib
+from array import array
+from collections import namedtuple
+from math import cos, radians, sin, tan
+from xml.etree.ElementTree import iterparse
+
+from .png import PNGImage
+
+VECTOR_EXTENSIONS = (".svg", ".pdf")
+SNAP_DISTANCE = 8  # Screen pixels a selected plot area edge snaps to an axis line
+AXIS_ALIGNED_TOLERANCE = 1e-6  # Relative deviation of a "straight" segment
+
+VectorPath = namedtuple("VectorPath", ("color", "Xs", "Ys"))
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# Named colours commonly used by plotting programs
+NAMED_COLORS = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "red": (255, 0, 0),
+    "green": (0, 128, 0),
+    "blue": (0, 0, 255),
+    "gray": (128, 128, 128),
+    "grey": (128, 128, 128),
+    "orange": (255, 165, 0),
+    "purple": (128, 0, 128),
+    "magenta": (255, 0, 255),
+    "cyan": (0, 255, 255),
+    "yellow": (255, 255, 0),
+}
+
+
+def _multiply(m, n):
+    """Affine matrix m applied after n, both as (a, b, c, d, e, f)."""
+    a, b, c, d, e, f = n
+    A, B, C, D, E, F = m
+    return (
+        A * a + C * b,
+        B * a + D * b,
+        A * c + C * d,
+        B * c + D * d,
+        A * e + C * f + E,
+        B * e + D * f + F,
+    )
+
+
+def _apply(m, Xs, Ys):
+    a, b, c, d, e, f = m
+    return (
+        array("d", (a * x + c * y + e for x, y in zip(Xs, Ys))),
+        array("d", (b * x + d * y + f for x, y in zip(Xs, Ys))),
+    )
+
+
+# SVG
+
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_PATH_TOKEN = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]|" + _NUMBER)
+_NUMBERS = re.compile(_NUMBER)
+_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7}
+# Elements whose children are not drawn where they are defined
+_HIDDEN = {"defs", "clipPath", "mask", "marker", "symbol", "pattern"}
+_XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def _svg_transform(text):
+    m = IDENTITY
+    for name, args in _TRANSFORM.findall(text):
+        v = [float(a) for a in _NUMBERS.findall(args)]
+        if name == "matrix" and len(v) == 6:
+            t = tuple(v)
+        elif name == "translate":
+            t = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale":
+            t = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate":
+            r = radians(v[0])
+            t = (cos(r), sin(r), -sin(r), cos(r), 0.0, 0.0)
+            if len(v) == 3:
+                t = _multiply(
+                    (1.0, 0.0, 0.0, 1.0, v[1], v[2]),
+                    _multiply(t, (1.0, 0.0, 0.0, 1.0, -v[1], -v[2])),
+                )
+        elif name == "skewX":
+            t = (1.0, 0.0, tan(radians(v[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY":
+            t = (1.0, tan(radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        m = _multiply(m, t)  # Later transforms apply first
+    return m
+
+
+def parse_color(text):
+    """(r, g, b) of an SVG colour, or None for "none" and unknown values."""
+    text = text.strip().lower()
+    if text.startswith("#"):
+        digits = text[1:]
+        if len(digits) == 3:
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) == 6:
+            try:
+                return tuple(int(digits[i : i + 2], 16) for i in (0, 2, 4))
+            except ValueError:
+                return None
+        return None
+    if text.startswith("rgb("):
+        values = _NUMBERS.findall(text)
+        if len(values) == 3:
+            scale = 2.55 if "%" in text else 1
+            return tuple(min(255, round(float(v) * scale)) for v in values)
+        return None
+    return NAMED_COLORS.get(text)
+
+
+def _svg_style(attrib, inherited):
+    """Stroke and fill of an element, given those of its parent."""
+    style = dict(inherited)
+    for key in ("stroke", "fill"):
+        if key in attrib:
+            style[key] = attrib[key]
+    for declaration in attrib.get("style", "").split(";"):
+        key, _, value = declaration.partition(":")
+        key = key.strip()
+        if key in ("stroke", "fill"):
+            style[key] = value.strip()
+    return style
+
+
+def _path_vertices(d):
+    """Vertices of SVG path data: segment end points, curves as chords."""
+    Xs = array("d")
+    Ys = array("d")
+    x = y = 0.0
+    start_x = start_y = 0.0
+    command = None
+    args = []
+    for token in _PATH_TOKEN.findall(d):
+        if token.isalpha():
+            command = token
+            args = []
+            if command in "Zz":
+                x, y = start_x, start_y
+                Xs.append(x)
+                Ys.append(y)
+            continue
+        if command is None or command in "Zz":
+            continue
+        args.append(float(token))
+        upper = command.upper()
+        if len(args) < _ARITY[upper]:
+            continue
+        relative = command.islower()
+        if upper == "H":
+            x = args[0] + (x if relative else 0.0)
+        elif upper == "V":
+            y = args[0] + (y if relative else 0.0)
+        else:
+            # The end point is the last pair of every segment type
+            dx, dy = (x, y) if relative else (0.0, 0.0)
+            x, y = args[-2] + dx, args[-1] + dy
+        if upper == "M":
+            start_x, start_y = x, y
+            # Further pairs after a moveto are linetos
+            command = "l" if relative else "L"
+        Xs.append(x)
+        Ys.append(y)
+        args = []
+    return Xs, Ys
+
+
+def _svg_number(attrib, key):
+    values = _NUMBERS.findall(attrib.get(key, "0"))
+    return float(values[0]) if values else 0.0
+
+
+def _svg_shape(name, attrib):
+    """Vertices of a basic SVG shape element."""
+
+    def number(key):
+        return _svg_number(attrib, key)
+
+    if name == "path":
+        return _path_vertices(attrib.get("d", ""))
+    if name in ("polyline", "polygon"):
+        values = [float(v) for v in _NUMBERS.findall(attrib.get("points", ""))]
+        Xs, Ys = array("d", values[0::2]), array("d", values[1::2])
+        if name == "polygon" and len(Xs):
+            Xs.append(Xs[0])
+            Ys.append(Ys[0])
+        return Xs, Ys
+    if name == "line":
+        return (
+            array("d", (number("x1"), number("x2"))),
+            array("d", (number("y1"), number("y2"))),
+        )
+    if name == "rect":
+        x, y, w, h = number("x"), number("y"), number("width"), number("height")
+        return (
+            array("d", (x, x + w, x + w, x, x)),
+            array("d", (y, y, y + h, y + h, y)),
+        )
+    return None
+
+
+def read_svg_paths(file_path):
+    """Yield the drawn paths of an SVG file as VectorPaths."""
+    stack = [(IDENTITY, {"stroke": "none", "fill": "black"}, False)]
+    definitions = {}  # id -> (vertices, style attributes) of shapes for <use>
+    for event, element in iterparse(file_path, events=("start", "end")):
+        name = element.tag.rpartition("}")[2]
+        attrib = element.attrib
+        if event == "start":
+            matrix, style, hidden = stack[-1]
+            transform = attrib.get("transform")
+            if transform:
+                matrix = _multiply(matrix, _svg_transform(transform))
+            stack.append((matrix, _svg_style(attrib, style), hidden or name in _HIDDEN))
+            continue
+        matrix, style, hidden = stack.pop()
+        vertices = None
+        if "id" in attrib:
+            vertices = _svg_shape(name, attrib)
+            if vertices is not None:
+                keys = ("transform", "stroke", "fill", "style")
+                shape = {key: attrib[key] for key in keys if key in attrib}
+                definitions[attrib["id"]] = (vertices, shape)
+        if hidden:
+            vertices = None
+        elif name == "use":
+            href = attrib.get(_XLINK_HREF) or attrib.get("href", "")
+            definition = definitions.get(href[1:]) if href[:1] == "#" else None
+            if definition is not None:
+                vertices, shape = definition
+                # The shape is drawn at x, y in the coordinates of <use>
+                offset = (_svg_number(attrib, "x"), _svg_number(attrib, "y"))
+                matrix = _multiply(matrix, (1.0, 0.0, 0.0, 1.0, *offset))
+                if "transform" in shape:
+                    matrix = _multiply(matrix, _svg_transform(shape["transform"]))
+                style = _svg_style(shape, style)
+        elif vertices is None:
+            vertices = _svg_shape(name, attrib)
+        if vertices is not None and len(vertices[0]):
+            color = parse_color(style["stroke"])
+            if color is None:
+                color = parse_color(style["fill"])
+            if color is not None:
+                yield VectorPath(color, *_apply(matrix, *vertices))
+        if name != "svg":
+            element.clear()  # Keep memory bounded on large files
+
+
+# PDF
+
+_STREAM = re.compile(rb">>\s*stream\r?\n")
+# A direct length, not a reference like "/Length 12 0 R"
+_LENGTH = re.compile(rb"/Length\s+(\d+)(?!\d|\s+\d+\s+R)")
+# Streams that never hold drawing operators
+_SKIPPED_STREAM = re.compile(
+    rb"/Subtype\s*/(?:Image|Type1C|CIDFontType0C|OpenType|XML)"
+    rb"|/Type\s*/(?:XRef|ObjStm|Metadata|EmbeddedFile)"
+    rb"|/Length[123]\b"  # Embedded fonts
+)
+_UNSUPPORTED_FILTER = re.compile(
+    rb"/(?:DCT|JPX|JBIG2|CCITTFax|LZW|RunLength|ASCII85|ASCIIHex)Decode"
+)
+_PDF_TOKEN = re.compile(
+    rb"\((?:\\.|[^\\)])*\)"  # Strings, skipped with their contents
+    rb"|<<|>>|<[0-9A-Fa-f\s]*>|/[^\s/\[\]()<>{}%]*"
+    rb"|[-+]?(?:\d+\.?\d*|\.\d+)"
+    rb"|[A-Za-z'\"*]+\d?\*?|[\[\]{}]|%[^\r\n]*"
+)
+_PAINT = {
+    b"S": "stroke",
+    b"s": "stroke",
+    b"f": "fill",
+    b"F": "fill",
+    b"f*": "fill",
+    b"B": "stroke",
+    b"B*": "stroke",
+    b"b": "stroke",
+    b"b*": "stroke",
+}
+# Colour operators and their number of operands, 0 for "all of them"
+_STROKE_COLORS = {b"RG": 3, b"G": 1, b"K": 4, b"SC": 0, b"SCN": 0}
+_FILL_COLORS = {b"rg": 3, b"g": 1, b"k": 4, b"sc": 0, b"scn": 0}
+
+
+def _pdf_streams(data):
+    """Yield the decoded content streams of a PDF, one at a time."""
+    for match in _STREAM.finditer(data):
+        start = match.end()
+        head = data[max(0, data.rfind(b"obj", 0, match.start())) : match.start()]
+        length = _LENGTH.search(head)
+        if length is not None:
+            stop = start + int(length.group(1))
+        else:
+            stop = data.find(b"endstream", start)
+            if stop < 0:
+                return
+        if _SKIPPED_STREAM.search(head) or _UNSUPPORTED_FILTER.search(head):
+            continue
+        raw = data[start:stop]
+        if b"/FlateDecode" in head:
+            try:
+                yield zlib.decompressobj().decompress(raw)
+            except zlib.error:
+                continue
+        else:
+            yield raw
+
+
+def _rgb(values):
+    if len(values) == 1:
+        return (round(values[0] * 255),) * 3
+    if len(values) == 3:
+        return tuple(round(v * 255) for v in values)
+    if len(values) == 4:
+        c, m, y, k = values
+        return tuple(round(255 * (1 - v) * (1 - k)) for v in (c, m, y))
+    return None
+
+
+def _content_paths(content):
+    """Yield the painted paths of one PDF content stream."""
+    matrix = IDENTITY
+    stroke = fill = (0, 0, 0)
+    saved = []
+    operands = []
+    Xs = array("d")
+    Ys = array("d")
+    start = None
+    for match in _PDF_TOKEN.finditer(content):
+        token = match.group()
+        first = token[:1]
+        if first.isdigit() or first in b"-+.":
+            operands.append(float(token))
+            continue
+        if first in b"(<[]{}/%":
+            if first not in b"/":
+                operands.clear()
+            continue
+        op = token
+        if op in (b"m", b"l") and len(operands) >= 2:
+            if op == b"m":
+                start = operands[-2], operands[-1]
+            Xs.append(operands[-2])
+            Ys.append(operands[-1])
+        elif op in (b"c", b"v", b"y") and len(operands) >= 4:
+            Xs.append(operands[-2])
+            Ys.append(operands[-1])
+        elif op == b"re" and len(operands) >= 4:
+            x, y, w, h = operands[-4:]
+            Xs.extend((x, x + w, x + w, x, x))
+            Ys.extend((y, y, y + h, y + h, y))
+        elif op == b"h" and start is not None:
+            Xs.append(start[0])
+            Ys.append(start[1])
+        elif op in _PAINT or op == b"n":
+            if op != b"n" and len(Xs):
+                color = stroke if _PAINT[op] == "stroke" else fill
+                # Flip y, PDF coordinates grow upwards
+                flip = _multiply((1.0, 0.0, 0.0, -1.0, 0.0, 0.0), matrix)
+                yield VectorPath(color, *_apply(flip, Xs, Ys))
+            Xs = array("d")
+            Ys = array("d")
+            start = None
+        elif op == b"cm" and len(operands) >= 6:
+            matrix = _multiply(matrix, tuple(operands[-6:]))
+        elif op == b"q":
+            saved.append((matrix, stroke, fill))
+        elif op == b"Q" and saved:
+            matrix, stroke, fill = saved.pop()
+        elif op in _STROKE_COLORS:
+            stroke = _rgb(operands[-_STROKE_COLORS[op] :]) or stroke
+        elif op in _FILL_COLORS:
+            fill = _rgb(operands[-_FILL_COLORS[op] :]) or fill
+        operands.clear()
+
+
+def read_pdf_paths(file_path):
+    """Yield the painted paths of a PDF file as VectorPaths."""
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for content in _pdf_streams(data):
+                yield from _content_paths(content)
+
+
+def read_vector_paths(file_path):
+    """Yield the paths of an SVG or PDF file as VectorPaths."""
+    if file_path.lower().endswith(".pdf"):
+        return read_pdf_paths(file_path)
+    return read_svg_paths(file_path)
+
+
+# Using the paths
+
+
+class FittedPaths:
+    """The paths of a vector file in pixels of an image, see fit_paths.
+
+    The vertices of all paths are stored back to back in two flat arrays
+    of doubles, next to the colours and the index of the first vertex of
+    every path. Iterating yields the paths as VectorPaths.
+    """
+
+    def __init__(self):
+        self.colors = array("B")  # r, g, b of every path
+        self.starts = array("Q", [0])  # First vertex of every path, and the end
+        self.Xs = array("d")
+        self.Ys = array("d")
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __iter__(self):
+        colors, starts, Xs, Ys = self.colors, self.starts, self.Xs, self.Ys
+        for k in range(len(self)):
+            start, stop = starts[k], starts[k + 1]
+            color = tuple(colors[3 * k : 3 * k + 3])
+            yield VectorPath(color, Xs[start:stop], Ys[start:stop])
+
+    @property
+    def nbytes(self):
+        return sum(
+            len(a) * a.itemsize for a in (self.colors, self.starts, self.Xs, self.Ys)
+        )
+
+    def append(self, path):
+        self.colors.extend(path.color)
+        self.Xs.extend(path.Xs)
+        self.Ys.extend(path.Ys)
+        self.starts.append(len(self.Xs))
+
+    def transform(self, matrix):
+        """Apply an affine matrix to every vertex."""
+        self.Xs, self.Ys = _apply(matrix, self.Xs, self.Ys)
+
+
+def fit_paths(file_path, max_width, max_height):
+    """Scale and shift the paths of a file to pixels of an image fitting a size.
+
+    Returns the FittedPaths and the size (width, height) of that image.
+    """
+    paths = FittedPaths()
+    for path in read_vector_paths(file_path):
+        paths.append(path)
+    if not len(paths):
+        raise ValueError("The file contains no drawn paths")
+    x0, x1 = min(paths.Xs), max(paths.Xs)
+    y0, y1 = min(paths.Ys), max(paths.Ys)
+    scale = min(
+        (max_width - 1) / max(x1 - x0, 1e-9), (max_height - 1) / max(y1 - y0, 1e-9)
+    )
+    paths.transform((scale, 0.0, 0.0, scale, -x0 * scale, -y0 * scale))
+    width = max(1, int((x1 - x0) * scale) + 1)
+    height = max(1, int((y1 - y0) * scale) + 1)
+    return paths, (width, height)
+
+
+def rasterize(paths, width, height):
+    """Draw paths as one pixel wide lines on a white RGB PNGImage."""
+    data = bytearray(b"\xff" * (width * height * 3))
+    for path in paths:
+        pixel = bytes(path.color)
+        points = list(zip(path.Xs, path.Ys))
+        for (xa, ya), (xb, yb) in zip(points, points[1:] or points):
+            steps = max(1, int(max(abs(xb - xa), abs(yb - ya))))
+            for k in range(steps + 1):
+                x = int(xa + (xb - xa) * k / steps)
+                y = int(ya + (yb - ya) * k / steps)
+                if 0 <= x < width and 0 <= y < height:
+                    offset = (y * width + x) * 3
+                    data[offset : offset + 3] = pixel
+    return PNGImage(width, height, 3, data)
+
+
+def _segments(path):
+    points = list(zip(path.Xs, path.Ys))
+    return zip(points, points[1:])
+
+
+def _axis_aligned(path):
+    """Whether every segment of a path is horizontal or vertical."""
+    for (xa, ya), (xb, yb) in _segments(path):
+        dx, dy = abs(xb - xa), abs(yb - ya)
+        if min(dx, dy) > AXIS_ALIGNED_TOLERANCE * max(dx, dy):
+            return False
+    return True
+
+
+def snap_plot_area(paths, plot_area, max_distance=SNAP_DISTANCE):
+    """Move the edges of a plot area onto nearby axis lines of the paths.
+
+    Frames are drawn as one rectangle or as four separate lines, so every
+    edge snaps on its own to the nearest horizontal or vertical segment.
+    """
+    vertical = []  # x of vertical segments
+    horizontal = []  # y of horizontal segments
+    for path in paths:
+        for (xa, ya), (xb, yb) in _segments(path):
+            if xa == xb and ya != yb:
+                vertical.append(xa)
+            elif ya == yb and xa != xb:
+                horizontal.append(ya)
+
+    def snap(value, candidates):
+        nearest = min(candidates, key=lambda c: abs(c - value), default=None)
+        if nearest is None or abs(nearest - value) > max_distance:
+            return value
+        return nearest
+
+    x0, y0, x1, y1 = plot_area
+    return (
+        snap(x0, vertical),
+        snap(y0, horizontal),
+        snap(x1, vertical),
+        snap(y1, horizontal),
+    )
+
+
+def vector_curves(paths, plot_area, color=None, tolerance=40):
+    """The vertices of curves inside a plot area, as (color, Xs, Ys).
+
+    With a colour, every path within `tolerance` of it on each channel is
+    a curve. Without one, every path that isn't made of horizontal and
+    vertical lines only, like frames, ticks and grid lines, is a curve.
+    """
+    x0, y0, x1, y1 = plot_area
+    curves = []
+    for path in paths:
+        if color is not None:
+            if any(abs(a - b) > tolerance for a, b in zip(path.color, color)):
+                continue
+        elif _axis_aligned(path):
+            continue
+        Xs = array("d")
+        Ys = array("d")
+        for X, Y in zip(path.Xs, path.Ys):
+            if x0 <= X <= x1 and y0 <= Y <= y1:
+                Xs.append(X)
+                Ys.append(Y)
+        if len(Xs) > 1:
+            curves.append((path.color, Xs, Ys))
+    return curves
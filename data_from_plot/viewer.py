@@ -0,0 +1,181 @@
+"""Zoomable, pannable tiled image view on a Tk canvas."""
+
+import tkinter as tk
+from collections import OrderedDict
+from math import ceil
+
+from .instrument import metrics
+from .pyramid import ImagePyramid
+
+TILE_SIZE = 256
+CACHE_SIZE = 192  # Tiles kept as PhotoImages, about 37 MB at 256x256
+ZOOM_STEP = 1.25
+MAX_ZOOM = 16.0
+
+
+class TiledImageView:
+    """Draw an image as tiles sampled from an ImagePyramid.
+
+    Canvas coordinates are original image pixels multiplied by `zoom`, and
+    the canvas scroll region covers the whole zoomed image. Only tiles
+    that intersect the visible window are materialized, and PhotoImages
+    are kept in an LRU cache so panning back does not resample them.
+    """
+
+    def __init__(self, canvas, image, on_change=None, pyramid=None):
+        self.canvas = canvas
+        # A pyramid may have been built ahead of time on a worker thread
+        self.pyramid = pyramid or ImagePyramid(image)
+        self.width = image.width
+        self.height = image.height
+        self.on_change = on_change  # Called after each zoom or pan redraw
+        self.zoom = 1.0
+        self.min_zoom = 1.0
+        self.tiles = OrderedDict()  # (zoom, tx, ty) -> PhotoImage
+        self.items = {}  # (zoom, tx, ty) -> canvas item on display
+        self.redraw_pending = None
+
+    def fit(self, max_width, max_height):
+        """Zoom so the whole image fits in the given size, never enlarging."""
+        self.zoom = min(1.0, max_width / self.width, max_height / self.height)
+        # Allow zooming out a little beyond the fit, but not to nothing
+        self.min_zoom = min(self.zoom, max(64 / max(self.width, self.height), 1e-3))
+        self.display_width = max(1, round(self.width * self.zoom))
+        self.display_height = max(1, round(self.height * self.zoom))
+        self.canvas.config(width=self.display_width, height=self.display_height)
+        self._update_scroll_region()
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.schedule_redraw()
+
+    def bind_navigation(self):
+        """Zoom with the mouse wheel, pan by dragging with the middle or right button."""
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", self.on_wheel)
+        self.canvas.bind("<Button-5>", self.on_wheel)
+        for button in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{button}>", self.start_pan)
+            self.canvas.bind(f"<B{button}-Motion>", self.pan)
+
+    def close(self):
+        """Remove all tiles from the canvas and drop the cache."""
+        if self.redraw_pending is not None:
+            self.canvas.after_cancel(self.redraw_pending)
+            self.redraw_pending = None
+        self.canvas.delete("tile")
+        self.items.clear()
+        self.tiles.clear()
+
+    def event_to_image(self, event):
+        """Original image pixel coordinates under a mouse event."""
+        return (
+            self.canvas.canvasx(event.x) / self.zoom,
+            self.canvas.canvasy(event.y) / self.zoom,
+        )
+
+    def event_to_canvas(self, event):
+        return self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+
+    def image_to_canvas(self, X, Y):
+        return X * self.zoom, Y * self.zoom
+
+    def on_wheel(self, event):
+        if event.num == 5 or event.delta < 0:
+            factor = 1 / ZOOM_STEP
+        else:
+            factor = ZOOM_STEP
+        self.zoom_at(factor, event.x, event.y)
+
+    def zoom_at(self, factor, x, y):
+        """Change the zoom, keeping the image point under widget (x, y) fixed."""
+        zoom = min(MAX_ZOOM, max(self.min_zoom, self.zoom * factor))
+        if zoom == self.zoom:
+            return
+        X, Y = self.canvas.canvasx(x) / self.zoom, self.canvas.canvasy(y) / self.zoom
+        self.zoom = zoom
+        width, height = self._update_scroll_region()
+        self.canvas.xview_moveto((X * zoom - x) / width)
+        self.canvas.yview_moveto((Y * zoom - y) / height)
+        self.schedule_redraw()
+
+    def start_pan(self, event):
+        self.canvas.scan_mark(event.x, event.y)
+
+    def pan(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.schedule_redraw()
+
+    def _update_scroll_region(self):
+        width = max(1, ceil(self.width * self.zoom))
+        height = max(1, ceil(self.height * self.zoom))
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        return width, height
+
+    def schedule_redraw(self):
+        # Coalesce bursts of wheel and drag events into one redraw
+        if self.redraw_pending is None:
+            self.redraw_pending = self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        """Show the tiles in view and drop those that scrolled away."""
+        self.redraw_pending = None
+        with metrics.span("draw_tiles"):
+            self._draw_tiles()
+        if self.on_change is not None:
+            self.on_change()
+
+    def _draw_tiles(self):
+        zoom = self.zoom
+        full_width = ceil(self.width * zoom)
+        full_height = ceil(self.height * zoom)
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        right = left + max(self.canvas.winfo_width(), self.display_width)
+        bottom = top + max(self.canvas.winfo_height(), self.display_height)
+
+        columns = range(
+            max(0, int(left // TILE_SIZE)), ceil(min(right, full_width) / TILE_SIZE)
+        )
+        rows = range(
+            max(0, int(top // TILE_SIZE)), ceil(min(bottom, full_height) / TILE_SIZE)
+        )
+        visible = {(zoom, tx, ty) for ty in rows for tx in columns}
+
+        for key in list(self.items):
+            if key not in visible:
+                self.canvas.delete(self.items.pop(key))
+        # Tiles on display are the most recently used, so never evicted
+        for key in self.items:
+            self.tiles.move_to_end(key)
+        for key in visible:
+            if key not in self.items:
+                _, tx, ty = key
+                self.items[key] = self.canvas.create_image(
+                    tx * TILE_SIZE,
+                    ty * TILE_SIZE,
+                    anchor="nw",
+                    image=self._tile(key, full_width, full_height),
+                    tags=("tile",),
+                )
+                # Keep markers and the plot area above the image
+                self.canvas.tag_lower(self.items[key])
+
+    def _tile(self, key, full_width, full_height):
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            metrics.count("tile_cache_hits")
+            return tile
+        metrics.count("tiles_rendered")
+        zoom, tx, ty = key
+        x0 = tx * TILE_SIZE
+        y0 = ty * TILE_SIZE
+        width = min(TILE_SIZE, full_width - x0)
+        height = min(TILE_SIZE, full_height - y0)
+        tile = tk.PhotoImage(
+            master=self.canvas, data=self.pyramid.tile(zoom, x0, y0, width, height)
+        )
+        self.tiles[key] = tile
+        while len(self.tiles) > CACHE_SIZE:
+            self.tiles.popitem(last=False)
+        return tile
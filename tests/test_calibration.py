@@ -0,0 +1,48 @@
+from array import array
+
+import pytest
+
+from data_from_plot.calibration import Calibration, parse_calibration
+
+
+def test_linear():
+    calibration = Calibration((100, 50, 500, 350), 0, 10, -5, 5)
+    xs, ys = calibration.to_data([100, 300, 500], [350, 200, 50])
+    assert isinstance(xs, array) and isinstance(ys, array)
+    assert list(xs) == pytest.approx([0, 5, 10])
+    assert list(ys) == pytest.approx([-5, 0, 5])
+    assert calibration.point_to_data(300, 200) == pytest.approx((5, 0))
+
+
+def test_log():
+    calibration = Calibration((0, 0, 300, 200), 1, 1000, 0.01, 1, "Log10", "Log10")
+    xs, ys = calibration.to_data([0, 100, 300], [200, 100, 0])
+    assert list(xs) == pytest.approx([1, 10, 1000])
+    assert list(ys) == pytest.approx([0.01, 0.1, 1])
+
+
+@pytest.mark.parametrize("axis_types", (("Linear", "Linear"), ("Log10", "Linear")))
+def test_round_trip(axis_types):
+    calibration = Calibration((20, 10, 620, 410), 1, 100, -2, 3, *axis_types)
+    Xs = [20.0, 77.5, 400.25, 620.0]
+    Ys = [410.0, 10.0, 123.5, 300.0]
+    xs, ys = calibration.to_data(Xs, Ys)
+    back_Xs, back_Ys = calibration.to_pixel(xs, ys)
+    assert list(back_Xs) == pytest.approx(Xs)
+    assert list(back_Ys) == pytest.approx(Ys)
+    for X, Y, x, y in zip(Xs, Ys, xs, ys):
+        assert calibration.point_to_data(X, Y) == pytest.approx((x, y))
+        assert calibration.point_to_pixel(x, y) == pytest.approx((X, Y))
+
+
+def test_from_dict():
+    settings = parse_calibration({"plot_area": [0, 0, 10, 10], "x_max": "2"})
+    calibration = Calibration.from_dict(settings)
+    assert calibration.point_to_data(5, 5) == pytest.approx((1, 0.5))
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        Calibration((10, 10, 10, 50), 0, 1, 0, 1)
+    with pytest.raises(ValueError):
+        parse_calibration({"x_min": 0})
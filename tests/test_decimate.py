@@ -0,0 +1,45 @@
+import random
+
+from data_from_plot.decimate import lttb, simplify_points, tolerance_band
+from data_from_plot.points import MANUAL_SERIES
+
+
+def test_tolerance_band_bound():
+    rng = random.Random(0)
+    xs = [i + rng.random() / 2 for i in range(500)]
+    ys = [rng.uniform(-5, 5) for _ in xs]
+    for tolerance in (0.0, 0.5, 3.0):
+        keep = tolerance_band(xs, ys, tolerance)
+        assert keep[0] == 0 and keep[-1] == len(xs) - 1
+        for a, b in zip(keep, keep[1:]):
+            slope = (ys[b] - ys[a]) / (xs[b] - xs[a])
+            for i in range(a + 1, b):
+                distance = abs(ys[i] - ys[a] - slope * (xs[i] - xs[a]))
+                assert distance <= tolerance + 1e-9
+
+
+def test_tolerance_band_line():
+    xs = list(range(100))
+    ys = [2 * x + 1 for x in xs]
+    assert tolerance_band(xs, ys, 0.01) == [0, 99]
+
+
+def test_tolerance_band_vertical_step():
+    assert tolerance_band([0, 1, 1, 2], [0, 0, 5, 5], 0.1) == [0, 1, 2, 3]
+
+
+def test_simplify_keeps_clicked_points():
+    xs = [0, 1, 2, 3, 10, 11, 12]
+    ys = [0, 0, 0, 0, 1, 1, 1]
+    series = [1, 1, 1, 1, MANUAL_SERIES, MANUAL_SERIES, MANUAL_SERIES]
+    Xs, Ys, kept = simplify_points(xs, ys, series, 0.5)
+    assert list(Xs) == [0, 3, 10, 11, 12]
+    assert list(kept) == [1, 1] + [MANUAL_SERIES] * 3
+
+
+def test_lttb_keeps_ends():
+    xs = list(range(1000))
+    ys = [x % 7 for x in xs]
+    indices = lttb(xs, ys, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
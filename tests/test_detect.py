@@ -0,0 +1,21 @@
+import pytest
+
+from data_from_plot.detect import detect_plot_area
+from data_from_plot.png import PNGImage, read_png
+from data_from_plot.synthetic import SyntheticPlot
+
+
+@pytest.mark.parametrize("size", ((400, 300), (900, 500)))
+def test_synthetic_frame(tmp_path, size):
+    plot = SyntheticPlot(*size)
+    path = tmp_path / "plot.png"
+    plot.write(str(path))
+    x0, y0, x1, y1 = detect_plot_area(read_png(str(path)))
+    for found, expected in zip((x0, y0, x1, y1), plot.plot_area):
+        assert abs(found - expected) <= plot.line_width
+
+
+def test_blank_image():
+    image = PNGImage(50, 40, 1, bytearray(b"\xff" * 2000))
+    with pytest.raises(ValueError):
+        detect_plot_area(image)
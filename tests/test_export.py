@@ -0,0 +1,70 @@
+import ast
+import csv
+import math
+import struct
+from array import array
+
+import pytest
+
+from data_from_plot.export import point_columns, write_columns
+
+
+def _read_npy(path):
+    data = path.read_bytes()
+    assert data[:8] == b"\x93NUMPY\x01\x00"
+    (header_length,) = struct.unpack("<H", data[8:10])
+    header = ast.literal_eval(data[10 : 10 + header_length].decode("latin1"))
+    assert (10 + header_length) % 64 == 0
+    values = array("d")
+    values.frombytes(data[10 + header_length :])
+    return header, values
+
+
+def _same(values, expected):
+    return all(
+        (math.isnan(a) and math.isnan(b)) or a == b for a, b in zip(values, expected)
+    ) and len(values) == len(expected)
+
+
+COLUMNS = [array("d", [1.0, 2.5, -3.0]), array("d", [0.125, 1e300])]
+ROWS = [1.0, 0.125, 2.5, 1e300, -3.0, math.nan]
+
+
+def test_csv(tmp_path):
+    path = tmp_path / "points.csv"
+    progress = []
+    write_columns(str(path), COLUMNS, ["x", "y"], lambda *p: progress.append(p))
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["x", "y"], ["1.0", "0.125"], ["2.5", "1e+300"], ["-3.0", ""]]
+    assert progress[-1] == (3, 3)
+
+
+def test_npy(tmp_path):
+    path = tmp_path / "points.npy"
+    write_columns(str(path), COLUMNS, ["x", "y"])
+    header, values = _read_npy(path)
+    assert header == {"descr": "<f8", "fortran_order": False, "shape": (3, 2)}
+    assert _same(values, ROWS)
+
+
+def test_f64(tmp_path):
+    path = tmp_path / "points.F64"
+    write_columns(str(path), COLUMNS, ["x", "y"])
+    values = array("d")
+    values.frombytes(path.read_bytes())
+    assert _same(values, ROWS)
+
+
+@pytest.mark.parametrize("split", (True, False))
+def test_point_columns(split):
+    xs = array("d", [1, 2, 3, 4])
+    ys = array("d", [5, 6, 7, 8])
+    series = array("i", [1, 1, 2, 1])
+    columns, headers = point_columns(xs, ys, series, "t", "v", split_series=split)
+    if split:
+        assert headers == ["t_1", "v_1", "t_2", "v_2"]
+        assert [list(c) for c in columns] == [[1, 2, 4], [5, 6, 8], [3], [7]]
+    else:
+        assert headers == ["t", "v"]
+        assert columns == [xs, ys]
@@ -0,0 +1,169 @@
+import io
+import random
+import struct
+import zlib
+
+import pytest
+
+from data_from_plot.png import read_png, write_png
+
+
+def _noise_rows(width, height, channels, seed=0):
+    rng = random.Random(seed)
+    # Flat runs and noise, so both ways of unfiltering are used
+    rows = []
+    for y in range(height):
+        if y % 3 == 0:
+            row = bytes([255]) * (width * channels)
+        else:
+            row = bytes(rng.randrange(256) for _ in range(width * channels))
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("filter_type", range(5))
+@pytest.mark.parametrize("channels", (1, 2, 3, 4))
+def test_filter_round_trip(tmp_path, filter_type, channels):
+    rows = _noise_rows(37, 23, channels)
+    path = tmp_path / "image.png"
+    write_png(path, 37, 23, rows, channels=channels, filter_type=filter_type)
+    image = read_png(path)
+    assert (image.width, image.height, image.channels) == (37, 23, channels)
+    assert bytes(image.data) == b"".join(rows)
+
+
+@pytest.mark.parametrize("filter_type", (3, 4))
+def test_dense_rows(tmp_path, filter_type):
+    rng = random.Random(1)
+    rows = [bytes(rng.randrange(256) for _ in range(300)) for _ in range(10)]
+    path = tmp_path / "noise.png"
+    write_png(path, 100, 10, rows, filter_type=filter_type)
+    assert bytes(read_png(path).data) == b"".join(rows)
+
+
+@pytest.mark.parametrize("filter_type", (3, 4))
+@pytest.mark.parametrize("channels", (1, 3, 4))
+def test_sparse_rows(tmp_path, filter_type, channels):
+    # Line art: white rows with a few coloured pixels, unfiltered run by run
+    rng = random.Random(2)
+    rows = []
+    for y in range(40):
+        row = bytearray(b"\xff" * (80 * channels))
+        for _ in range(rng.randrange(6)):
+            X = rng.randrange(80)
+            row[X * channels : (X + 1) * channels] = bytes(
+                rng.randrange(256) for _ in range(channels)
+            )
+        rows.append(bytes(row))
+    path = tmp_path / "sparse.png"
+    write_png(path, 80, 40, rows, channels=channels, filter_type=filter_type)
+    assert bytes(read_png(path).data) == b"".join(rows)
+
+
+def test_not_a_png():
+    with pytest.raises(ValueError, match="^Not a PNG file$"):
+        read_png(io.BytesIO(b"GIF89a" + bytes(100)))
+
+
+def test_corrupt_image_data(tmp_path):
+    path = tmp_path / "image.png"
+    write_png(path, 37, 23, _noise_rows(37, 23, 3))
+    data = bytearray(path.read_bytes())
+    start = data.index(b"IDAT") + 4
+    data[start : start + 8] = b"\xff" * 8
+    with pytest.raises(ValueError, match="Corrupt PNG image data"):
+        read_png(io.BytesIO(bytes(data)))
+
+
+def test_truncated_header():
+    header = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x04IHDR\x00\x00\x00\x01"
+    with pytest.raises(ValueError):
+        read_png(io.BytesIO(header + bytes(4) + b"\x00\x00\x00\x00IDAT"))
+
+
+def _encode(width, height, bit_depth, color_type, lines, chunks=()):
+    """A PNG of raw scanlines, for the formats write_png doesn't produce."""
+
+    def chunk(chunk_type, data):
+        crc = zlib.crc32(data, zlib.crc32(chunk_type))
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)
+    raw = b"".join(b"\x00" + line for line in lines)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", ihdr)
+        + b"".join(chunk(t, d) for t, d in chunks)
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _pack(values, bit_depth):
+    """Pack samples of bit_depth < 8 into bytes, padding the last one."""
+    per_byte = 8 // bit_depth
+    values = list(values) + [0] * (-len(values) % per_byte)
+    return bytes(
+        sum(
+            v << (8 - bit_depth * (k + 1))
+            for k, v in enumerate(values[i : i + per_byte])
+        )
+        for i in range(0, len(values), per_byte)
+    )
+
+
+@pytest.mark.parametrize("bit_depth", (1, 2, 4, 8, 16))
+def test_greyscale_bit_depths(bit_depth):
+    rng = random.Random(bit_depth)
+    width, height = 13, 5
+    top = (1 << bit_depth) - 1
+    samples = [[rng.randrange(top + 1) for _ in range(width)] for _ in range(height)]
+    if bit_depth == 16:
+        lines = [b"".join(v.to_bytes(2) for v in row) for row in samples]
+        expected = [bytes(v >> 8 for v in row) for row in samples]
+    else:
+        lines = [
+            bytes(row) if bit_depth == 8 else _pack(row, bit_depth) for row in samples
+        ]
+        expected = [bytes(v * (255 // top) for v in row) for row in samples]
+    image = read_png(io.BytesIO(_encode(width, height, bit_depth, 0, lines)))
+    assert (image.width, image.height, image.channels) == (width, height, 1)
+    assert bytes(image.data) == b"".join(expected)
+
+
+@pytest.mark.parametrize("bit_depth", (1, 2, 4, 8))
+@pytest.mark.parametrize("transparent", (False, True))
+def test_palette(bit_depth, transparent):
+    rng = random.Random(bit_depth)
+    width, height = 11, 4
+    entries = 1 << bit_depth if bit_depth < 8 else 40
+    palette = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(entries)]
+    alpha = bytes(rng.randrange(256) for _ in range(entries // 2))
+    chunks = [(b"PLTE", b"".join(bytes(c) for c in palette))]
+    if transparent:
+        chunks.append((b"tRNS", alpha))
+    indices = [[rng.randrange(entries) for _ in range(width)] for _ in range(height)]
+    lines = [bytes(row) if bit_depth == 8 else _pack(row, bit_depth) for row in indices]
+    data = _encode(width, height, bit_depth, 3, lines, chunks)
+    image = read_png(io.BytesIO(data))
+    expected = bytearray()
+    for row in indices:
+        for i in row:
+            expected += bytes(palette[i])
+            if transparent:
+                expected.append(alpha[i] if i < len(alpha) else 255)
+    assert image.channels == (4 if transparent else 3)
+    assert bytes(image.data) == bytes(expected)
+
+
+@pytest.mark.parametrize("color_type, channels", ((2, 3), (4, 2), (6, 4)))
+def test_16_bit_colour(color_type, channels):
+    rng = random.Random(color_type)
+    width, height = 9, 4
+    samples = [
+        [rng.randrange(1 << 16) for _ in range(width * channels)] for _ in range(height)
+    ]
+    lines = [b"".join(v.to_bytes(2) for v in row) for row in samples]
+    image = read_png(io.BytesIO(_encode(width, height, 16, color_type, lines)))
+    assert image.channels == channels
+    assert bytes(image.data) == b"".join(bytes(v >> 8 for v in row) for row in samples)
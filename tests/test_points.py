@@ -0,0 +1,80 @@
+import pytest
+
+from data_from_plot.points import MANUAL_SERIES, PointStore
+
+
+def _snapshot(points):
+    return [list(column) for column in points._columns()]
+
+
+def _store(n=10):
+    points = PointStore()
+    for i in range(n):
+        points.append(i, 2 * i, i / 10, i / 5)
+    return points
+
+
+def test_undo_redo():
+    points = _store(3)
+    points.reset(points._columns())  # Keep the points, drop their history
+    events = []
+    points.listeners.append(lambda *event: events.append(event))
+    states = [_snapshot(points)]
+    series = points.new_series()
+    points.extend([10, 11], [20, 22], [1.0, 1.1], [2.0, 2.2], series)
+    states.append(_snapshot(points))
+    points.set_point(0, 5, 6, 0.5, 0.6)
+    states.append(_snapshot(points))
+    points.move(4, 1)
+    states.append(_snapshot(points))
+    points.delete(2, 4)
+    states.append(_snapshot(points))
+    assert points.series.tolist() == [MANUAL_SERIES, series, series]
+
+    for state in reversed(states[:-1]):
+        assert points.undo()
+        assert _snapshot(points) == state
+    assert not points.undo()
+    for state in states[1:]:
+        assert points.redo()
+        assert _snapshot(points) == state
+    assert not points.redo()
+    assert ("move", 4, 1) in events and ("move", 1, 4) in events
+
+
+def test_new_edit_drops_redo():
+    points = _store(3)
+    points.delete(0)
+    points.undo()
+    points.append(9, 9, 9, 9)
+    assert not points.redo()
+    assert len(points) == 4
+
+
+def test_delete_indices():
+    points = _store(10)
+    before = _snapshot(points)
+    points.delete_indices([7, 1, 2, 3, 9, 2])
+    assert points.Xs.tolist() == [0, 4, 5, 6, 8]
+    assert len(points.undo_log) == 11  # One operation for the whole selection
+    assert points.undo()
+    assert _snapshot(points) == before
+    assert points.redo()
+    assert points.Xs.tolist() == [0, 4, 5, 6, 8]
+
+
+def test_delete_indices_out_of_range():
+    points = _store(3)
+    with pytest.raises(IndexError):
+        points.delete_indices([1, 3])
+    assert len(points) == 3
+
+
+def test_clear_and_reset():
+    points = _store(4)
+    points.clear()
+    assert len(points) == 0
+    points.undo()
+    assert points.Xs.tolist() == [0, 1, 2, 3]
+    points.reset()
+    assert len(points) == 0 and not points.undo()
@@ -0,0 +1,49 @@
+from data_from_plot.png import write_png
+from data_from_plot.prefetch import ImageLoader
+
+
+def _images(tmp_path, n, size=20):
+    paths = []
+    for k in range(n):
+        path = str(tmp_path / f"image_{k}.png")
+        write_png(path, size, size, [bytes([k * 40]) * (size * 3)] * size)
+        paths.append(path)
+    return paths
+
+
+def _drain(loader):
+    # One worker runs the decodes in order, and their callbacks before the next
+    loader.executor.submit(lambda: None).result()
+
+
+def _cached(loader):
+    return sorted(path for path, _ in loader.cache)
+
+
+def test_cache_is_bounded_by_decoded_bytes(tmp_path):
+    paths = _images(tmp_path, 4)  # 1200 bytes each
+    loader = ImageLoader(100, 100, max_bytes=2500)
+    try:
+        current = loader.get(paths[0])
+        loader.prefetch(paths[1:])
+        _drain(loader)
+        # The images furthest ahead are dropped first
+        assert _cached(loader) == paths[:2]
+        assert current.result().image.width == 20
+    finally:
+        loader.close()
+
+
+def test_current_image_is_kept(tmp_path):
+    paths = _images(tmp_path, 2)
+    loader = ImageLoader(100, 100, max_bytes=100)
+    try:
+        loader.get(paths[0])
+        loader.prefetch(paths[1:])
+        _drain(loader)
+        assert _cached(loader) == paths[:1]
+        loader.get(paths[1])
+        _drain(loader)
+        assert _cached(loader) == paths[1:]
+    finally:
+        loader.close()
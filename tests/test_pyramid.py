@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from data_from_plot.png import PNGImage
+from data_from_plot.pyramid import ImagePyramid
+
+
+def _pixels(tile):
+    return tile.split(b"\n", 1)[1]
+
+
+def _random_image(width, height, channels, seed=0):
+    rng = random.Random(seed)
+    data = bytearray(
+        rng.choice((0, 255, rng.randrange(256)))
+        for _ in range(width * height * channels)
+    )
+    return PNGImage(width, height, channels, data)
+
+
+def test_level_zero_is_the_image():
+    image = _random_image(40, 30, 4)
+    assert ImagePyramid(image).level(0) is image
+
+
+@pytest.mark.parametrize("zoom", (1, 0.4, 0.2, 1.25, 3))
+def test_grey_and_alpha_tiles_match_rgb(zoom):
+    grey = _random_image(41, 29, 1)
+    rgb = PNGImage(41, 29, 3, bytearray(v for v in grey.data for _ in range(3)))
+    # Fully transparent pixels are white, other alpha is ignored
+    alpha = bytearray()
+    expected = bytearray()
+    for i, v in enumerate(grey.data):
+        a = (0, 128, 255)[i % 3]
+        alpha += bytes((v, v, v, a))
+        expected += bytes((255, 255, 255) if a == 0 else (v, v, v))
+    rgba = PNGImage(41, 29, 4, alpha)
+    transparent = PNGImage(41, 29, 3, expected)
+    width = max(1, int(41 * zoom)) - 3
+    height = max(1, int(29 * zoom)) - 2
+    for image, reference in ((grey, rgb), (rgba, transparent)):
+        tile = ImagePyramid(image).tile(zoom, 3, 2, width, height)
+        assert tile == ImagePyramid(reference).tile(zoom, 3, 2, width, height)
+        assert len(_pixels(tile)) == width * height * 3
@@ -0,0 +1,38 @@
+from data_from_plot.png import PNGImage
+from data_from_plot.scatter import detect_markers, marker_template
+
+
+def _page(width, height, markers):
+    data = bytearray(b"\xff" * (width * height * 3))
+    for cx, cy, color in markers:
+        for dx in range(-3, 4):
+            for dy in range(-3, 4):
+                if dx * dx + dy * dy <= 10:
+                    i = ((cy + dy) * width + cx + dx) * 3
+                    data[i : i + 3] = bytes(color)
+    # A black frame line through the plot, not a marker
+    i = 50 * width * 3
+    data[i : i + width * 3] = b"\x00" * (width * 3)
+    return PNGImage(width, height, 3, data)
+
+
+def test_detect_markers():
+    red, blue = (255, 0, 0), (0, 0, 255)
+    markers = [(20, 20, red), (31, 22, red), (120, 80, red), (60, 90, blue)]
+    image = _page(160, 120, markers)
+    template = marker_template(image, 21, 19)
+    assert template.color == red
+    Xs, Ys = detect_markers(image, (0, 0, 159, 119), template)
+    assert [(round(X), round(Y)) for X, Y in zip(Xs, Ys)] == [
+        (20, 20),
+        (31, 22),
+        (120, 80),
+    ]
+
+
+def test_plot_area_limits_markers():
+    red = (255, 0, 0)
+    image = _page(160, 120, [(20, 20, red), (120, 80, red)])
+    template = marker_template(image, 20, 20)
+    Xs, Ys = detect_markers(image, (60, 30, 159, 119), template)
+    assert [(round(X), round(Y)) for X, Y in zip(Xs, Ys)] == [(120, 80)]
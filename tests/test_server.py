@@ -0,0 +1,126 @@
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from data_from_plot.png import write_png
+from data_from_plot.server import DigitizeServer
+
+
+@pytest.fixture
+def server():
+    server = DigitizeServer(("127.0.0.1", 0), workers=1, queue_size=1)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _post(server, path, body):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        connection.request("POST", path, body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 10
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_upload_and_convert(server, tmp_path):
+    path = tmp_path / "plot.png"
+    write_png(path, 4, 3, [b"\xff" * 12] * 3)
+    status, answer = _post(server, "/images", path.read_bytes())
+    assert status == 200
+    assert (answer["width"], answer["height"], answer["cached"]) == (4, 3, False)
+    status, answer = _post(server, "/images", path.read_bytes())
+    assert answer["cached"]
+    request = {"calibration": {"plot_area": [0, 0, 10, 10]}, "points": [[5, 5]]}
+    status, answer = _post(server, "/convert", json.dumps(request).encode())
+    assert (status, answer) == (200, {"points": [[0.5, 0.5]]})
+
+
+@pytest.mark.parametrize(
+    "path, body, status",
+    (
+        ("/images", b"GIF89a, not a PNG", 400),
+        ("/images", b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR\x00", 400),
+        ("/convert", b"{not json", 400),
+        ("/convert", b"[1, 2]", 400),
+        ("/convert", b'{"points": [[1, 2]]}', 400),
+        ("/extract", b'{"image": "0", "calibration": {}}', 404),
+    ),
+)
+def test_bad_requests(server, path, body, status):
+    answer_status, answer = _post(server, path, body)
+    assert answer_status == status
+    assert "BytesIO" not in answer["error"]
+
+
+def test_corrupt_image_data(server, tmp_path):
+    path = tmp_path / "plot.png"
+    write_png(path, 40, 30, [bytes(range(120))] * 30)
+    data = bytearray(path.read_bytes())
+    start = data.index(b"IDAT") + 4
+    data[start : start + 8] = b"\xff" * 8
+    status, answer = _post(server, "/images", bytes(data))
+    assert status == 400
+    assert "Corrupt PNG image data" in answer["error"]
+
+
+def test_unknown_path(server):
+    assert _post(server, "/nowhere", b"")[0] == 404
+
+
+def test_busy(server):
+    address = server.server_address[:2]
+    # The only worker waits for the request line of a silent client, and a
+    # second silent client fills the queue
+    connections = server.connections
+    idle = [socket.create_connection(address)]
+    # Queued once, and taken by the worker
+    _wait_for(lambda: connections.unfinished_tasks == 1 and not connections.qsize())
+    idle.append(socket.create_connection(address))
+    _wait_for(lambda: connections.qsize() == 1)
+    try:
+        # Answered right away, without reading a request
+        with socket.create_connection(address, timeout=10) as busy:
+            response = b""
+            while block := busy.recv(1 << 16):
+                response += block
+        head, _, body = response.partition(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.0 503 ")
+        assert b"Retry-After: 1" in head
+        assert json.loads(body) == {"error": "Server busy, retry later"}
+    finally:
+        for connection in idle:
+            connection.close()
+
+
+def test_server_error(server):
+    # 10 ** y overflows for a point far outside a Log10 axis
+    request = {
+        "calibration": {
+            "plot_area": [0, 0, 10, 10],
+            "y_axis_type": "Log10",
+            "y_min": 1,
+            "y_max": 1e300,
+        },
+        "points": [[5, -1e6]],
+    }
+    status, answer = _post(server, "/convert", json.dumps(request).encode())
+    assert status == 500
+    assert answer["error"].startswith("OverflowError")
+    # The worker keeps serving
+    assert _post(server, "/nowhere", b"")[0] == 404
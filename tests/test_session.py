@@ -0,0 +1,36 @@
+from functools import partial
+
+from data_from_plot.points import PointStore
+from data_from_plot.session import Journal, read_journal, replay_points
+
+
+def test_replay_points(tmp_path):
+    path = tmp_path / "session.journal"
+    journal = Journal(str(path))
+    journal.start({"op": "image", "path": "plot.png"})
+    points = PointStore()
+    points.listeners.append(partial(journal.record_points, points))
+
+    points.append(1, 2, 0, 0)
+    points.extend([3, 4, 5], [6, 7, 8], [0] * 3, [0] * 3, points.new_series())
+    points.set_point(0, 1.5, 2.5, 0, 0)
+    points.move(3, 0)
+    points.delete_indices([1, 3])
+    points.undo()
+    points.delete(1)
+    journal.close()
+
+    entries = read_journal(str(path))
+    assert entries[0] == {"op": "image", "path": "plot.png"}
+    replayed = PointStore()
+    replay_points(entries[1:], replayed)
+    assert replayed.Xs == points.Xs
+    assert replayed.Ys == points.Ys
+    assert replayed.series == points.series
+
+
+def test_torn_last_line(tmp_path):
+    path = tmp_path / "session.journal"
+    path.write_text('{"op": "remove", "start": 0, "stop": 1}\n{"op": "ins')
+    assert read_journal(str(path)) == [{"op": "remove", "start": 0, "stop": 1}]
+    assert read_journal(str(tmp_path / "missing.journal")) == []
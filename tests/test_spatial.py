@@ -0,0 +1,86 @@
+import random
+from math import hypot
+
+from data_from_plot.points import PointStore
+from data_from_plot.spatial import PointIndex
+
+
+def _brute_box(points, X0, Y0, X1, Y1):
+    return [
+        i
+        for i, (X, Y) in enumerate(zip(points.Xs, points.Ys))
+        if X0 <= X <= X1 and Y0 <= Y <= Y1
+    ]
+
+
+def _brute_nearest(points, X, Y, max_distance):
+    distances = [
+        (hypot(PX - X, PY - Y), i)
+        for i, (PX, PY) in enumerate(zip(points.Xs, points.Ys))
+    ]
+    distance, i = min(distances, default=(None, None))
+    return i if distance is not None and distance <= max_distance else None
+
+
+def _check(points, index, rng):
+    for _ in range(20):
+        X0, Y0 = rng.uniform(-20, 400), rng.uniform(-20, 400)
+        box = (X0, Y0, X0 + rng.uniform(0, 150), Y0 + rng.uniform(0, 150))
+        assert index.in_box(*box) == _brute_box(points, *box)
+        X, Y = rng.uniform(0, 400), rng.uniform(0, 400)
+        nearest = index.nearest(X, Y, 25)
+        expected = _brute_nearest(points, X, Y, 25)
+        if nearest != expected:
+            # Ties are allowed to go either way
+            assert hypot(points.Xs[nearest] - X, points.Ys[nearest] - Y) == hypot(
+                points.Xs[expected] - X, points.Ys[expected] - Y
+            )
+
+
+def test_incremental_updates():
+    rng = random.Random(0)
+    points = PointStore()
+    index = PointIndex(points)
+
+    def coordinates(n):
+        Xs = [rng.uniform(0, 400) for _ in range(n)]
+        Ys = [rng.uniform(0, 400) for _ in range(n)]
+        return Xs, Ys, Xs, Ys
+
+    points.extend(*coordinates(200))
+    _check(points, index, rng)
+    assert not index.dirty
+    for step in range(60):
+        choice = step % 6
+        n = len(points)
+        if choice == 0:
+            points.append(rng.uniform(0, 400), rng.uniform(0, 400), 0, 0)
+        elif choice == 1:
+            start = rng.randrange(n)
+            points.insert(start, *coordinates(3), [1, 1, 1])
+        elif choice == 2:
+            start = rng.randrange(n - 5)
+            points.delete(start, start + rng.randrange(1, 5))
+        elif choice == 3:
+            points.move(rng.randrange(n), rng.randrange(n))
+        elif choice == 4:
+            X, Y = rng.uniform(0, 400), rng.uniform(0, 400)
+            points.set_point(rng.randrange(n), X, Y, X, Y)
+        else:
+            points.delete_indices(rng.sample(range(n), 7))
+        _check(points, index, rng)
+        assert not index.dirty
+    while points.undo():
+        _check(points, index, rng)
+    assert len(points) == 0
+
+
+def test_in_box_limit():
+    points = PointStore()
+    Xs = [float(i % 50) for i in range(1000)]
+    Ys = [float(i // 50) for i in range(1000)]
+    points.extend(Xs, Ys, Xs, Ys)
+    index = PointIndex(points)
+    assert index.in_box(0, 0, 49, 19, limit=200) is None
+    assert index.in_box(0, 0, 9, 9, limit=200) == _brute_box(points, 0, 0, 9, 9)
+    assert len(index.in_box(0, 0, 49, 3, limit=200)) == 200
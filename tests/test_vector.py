@@ -0,0 +1,55 @@
+from data_from_plot.vector import fit_paths, rasterize, snap_plot_area, vector_curves
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100">
+  <rect x="10" y="10" width="180" height="80" fill="none" stroke="black"/>
+  <polyline points="10,90 100,50 190,10" fill="none" stroke="#ff0000"/>
+</svg>
+"""
+
+
+def test_fit_and_rasterize(tmp_path):
+    path = tmp_path / "figure.svg"
+    path.write_text(SVG)
+    paths, (width, height) = fit_paths(str(path), 361, 361)
+    assert (width, height) == (361, 161)
+    image = rasterize(paths, width, height)
+    assert (image.width, image.height) == (361, 161)
+    red = (80 * width + 180) * 3
+    assert bytes(image.data[red : red + 3]) == b"\xff\x00\x00"
+    # The paths can be used more than once
+    assert [p.color for p in paths] == [(0, 0, 0), (255, 0, 0)]
+    ((color, Xs, Ys),) = vector_curves(paths, (0, 0, width - 1, height - 1))
+    assert color == (255, 0, 0)
+    assert (list(Xs), list(Ys)) == ([0.0, 180.0, 360.0], [160.0, 80.0, 0.0])
+    assert snap_plot_area(paths, (3, 2, 355, 158)) == (0.0, 0.0, 360.0, 160.0)
+
+
+MARKERS = """<svg xmlns="http://www.w3.org/2000/svg"
+     xmlns:xlink="http://www.w3.org/1999/xlink" width="100" height="100">
+  <defs>
+    <path id="m0" d="M 0 -2 L 2 0 L 0 2 L -2 0 z" style="stroke: #1f77b4"/>
+  </defs>
+  <rect x="0" y="0" width="100" height="100" fill="none" stroke="black"/>
+  <g transform="translate(10 0)">
+    <use xlink:href="#m0" x="20" y="30" style="fill: #1f77b4"/>
+    <use href="#m0" x="60" y="70"/>
+    <use xlink:href="#missing" x="5" y="5"/>
+  </g>
+</svg>
+"""
+
+
+def test_use_elements(tmp_path):
+    path = tmp_path / "markers.svg"
+    path.write_text(MARKERS)
+    paths, size = fit_paths(str(path), 101, 101)
+    assert size == (101, 101)
+    frame, first, second = paths
+    assert frame.color == (0, 0, 0)
+    assert first.color == second.color == (31, 119, 180)
+    assert (list(first.Xs), list(first.Ys)) == (
+        [30.0, 32.0, 30.0, 28.0, 30.0],
+        [28.0, 30.0, 32.0, 30.0, 28.0],
+    )
+    assert (second.Xs[0], second.Ys[0]) == (70.0, 68.0)
+    assert paths.nbytes == 3 * 3 + 4 * 8 + 2 * 15 * 8